@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+스크래퍼 튜닝 값 자동 탐색
+사용법:
+- python3 autotune.py                                  # 라이브 사이트, 샘플 20개
+- python3 autotune.py --sample 40 --memory-mb 6144     # 메모리 상한 지정
+- python3 autotune.py --url-template "http://127.0.0.1:8080/futures/{symbol}"  # 로컬 스탠드인 서버 (standin_lbank.py)
+"""
+
+import argparse
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import psutil
+
+from lbank_monitor import LBankPriceMonitor
+from log_setup import setup_logging
+from scraper_config import CONFIG_FILE, ScraperConfig
+from symbol_health import SymbolHealthTracker
+
+# 탐색 공간 (좌표 하강: 한 번에 한 파라미터씩 바꿔가며 최고 값을 유지)
+SEARCH_SPACE = {
+    "browser_workers": [4, 6, 8, 10, 12, 16],
+    "js_render_wait": [2.0, 3.0, 4.0, 6.0, 8.0],
+    "page_settle_wait": [0.0, 1.0, 2.0],
+    "cloudflare_check_wait": [1.0, 2.0, 3.0],
+    "batch_size": [20, 40, 80],
+    "batch_pause": [0.0, 1.0, 3.0],
+}
+
+logger = logging.getLogger(__name__)
+
+
+class MemorySampler:
+    """트라이얼 동안 이 프로세스 + 자식(geckodriver/Firefox) RSS 최대값을 기록"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> float:
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / 1024 / 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, self._sample())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_trial(config: ScraperConfig, tickers: List[Dict]) -> Dict:
+    """Scrape the sample once with a config and measure throughput and memory
+
+    Same work as a collection cycle: the batched main pass, then the deferred retries of its failures
+    (collect_cycle itself is not used because it would overwrite lbank_funding.json with the sample).
+    """
+    monitor = LBankPriceMonitor(config)
+    monitor.health = SymbolHealthTracker(path=None)  # 트라이얼 실패로 격리 목록을 오염시키지 않음
+    monitor.read_blacklist()
+
+    successes = 0
+    start = time.time()
+    with MemorySampler() as memory:
+        try:
+            for i in range(0, len(tickers), config.batch_size):
+                batch = tickers[i:i + config.batch_size]
+                successes += len(monitor.process_ticker_batch(batch, i // config.batch_size + 1))
+                if i + config.batch_size < len(tickers):
+                    time.sleep(config.batch_pause)
+            # 메인 패스에서 지연 큐로 넘어간 실패를 실제 사이클처럼 재시도 (시간과 성공 모두 점수에 반영)
+            successes += len(monitor.run_deferred_retries())
+        finally:
+            for session in monitor.cf_sessions.values():
+                session.close()
+            monitor.close_browser_sessions()
+            if monitor.pipeline:
+                monitor.pipeline.close()
+    duration = time.time() - start
+
+    return {
+        "successes": successes,
+        "success_rate": successes / len(tickers) if tickers else 0,
+        "duration": round(duration, 2),
+        "symbols_per_second": round(successes / duration, 4) if duration > 0 else 0,
+        "peak_memory_mb": round(memory.peak_mb, 1)
+    }
+
+
+def score(result: Dict, memory_mb: float, min_success_rate: float) -> float:
+    """Successful symbols per second; configs over the memory ceiling or too flaky score zero"""
+    if result["peak_memory_mb"] > memory_mb or result["success_rate"] < min_success_rate:
+        return 0.0
+    return result["symbols_per_second"]
+
+
+def autotune(base: ScraperConfig, tickers: List[Dict], memory_mb: float,
+             min_success_rate: float, rounds: int) -> Optional[Dict]:
+    """Coordinate-descent search over SEARCH_SPACE starting from the current config"""
+    tried: Dict[tuple, Dict] = {}
+
+    def evaluate(config: ScraperConfig) -> Dict:
+        key = tuple(getattr(config, name) for name in SEARCH_SPACE)
+        if key not in tried:
+            logger.info(f"🔧 Trial: {dict(zip(SEARCH_SPACE, key))}")
+            result = run_trial(config, tickers)
+            result["score"] = score(result, memory_mb, min_success_rate)
+            logger.info(f"🔧 Result: {result}")
+            tried[key] = result
+        return tried[key]
+
+    best_config = base
+    best = evaluate(base)
+    for round_num in range(1, rounds + 1):
+        improved = False
+        for name, values in SEARCH_SPACE.items():
+            for value in values:
+                if value == getattr(best_config, name):
+                    continue
+                candidate = best_config.replace(**{name: value})
+                result = evaluate(candidate)
+                if result["score"] > best["score"]:
+                    best_config, best, improved = candidate, result, True
+        logger.info(f"Round {round_num}: best score {best['score']} symbols/s")
+        if not improved:
+            break
+
+    if best["score"] <= 0:
+        return None
+    return {"config": best_config, "result": best, "trials": len(tried)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LBank 스크래퍼 튜닝 값 자동 탐색")
+    parser.add_argument("--sample", type=int, default=20, help="트라이얼에 사용할 심볼 수")
+    parser.add_argument("--memory-mb", type=float, default=4096, help="브라우저 포함 메모리 상한 (MB)")
+    parser.add_argument("--min-success-rate", type=float, default=0.9, help="허용 최소 성공률")
+    parser.add_argument("--rounds", type=int, default=2, help="좌표 하강 반복 횟수")
+    parser.add_argument("--url-template", help="선물 페이지 URL 템플릿 (로컬 스탠드인 서버용)")
+    parser.add_argument("--output", default=CONFIG_FILE, help="결과를 저장할 설정 파일")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    setup_logging()
+    base = ScraperConfig.load(args.output)
+    if args.url_template:
+        base = base.replace(futures_url_template=args.url_template, persist_sessions=False)
+
+    monitor = LBankPriceMonitor(base)
+    tickers = [t for t in (monitor.read_tickers_from_file() or []) if t.get('symbol')]
+    if not tickers:
+        logger.error("No tickers found")
+        return
+    random.Random(args.seed).shuffle(tickers)
+    sample = tickers[:args.sample]
+
+    outcome = autotune(base, sample, args.memory_mb, args.min_success_rate, args.rounds)
+    if not outcome:
+        logger.error("❌ No configuration met the memory ceiling and success rate")
+        return
+
+    # 탐색한 값만 파일 값 위에 저장 (스탠드인 URL, persist_sessions=False, 환경 변수 값은 남기지 않음)
+    tuned = ScraperConfig.load(args.output, environ=False).replace(
+        **{name: getattr(outcome["config"], name) for name in SEARCH_SPACE})
+    tuned.save(args.output, metadata={
+        "tuned_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "sample_size": len(sample),
+        "memory_ceiling_mb": args.memory_mb,
+        "trials": outcome["trials"],
+        "url_template": args.url_template,
+        "result": outcome["result"]
+    })
+    logger.info(f"✅ Saved tuned profile to {args.output}: {outcome['result']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+페이지 추출 방식 비교 (페이지 안 JS vs 전체 page_source 전송 후 파싱)
+사용법:
+- python3 bench_extract.py                             # 라이브 사이트, 샘플 10개
+- python3 bench_extract.py --sample 30 --seed 7
+- python3 bench_extract.py --url-template "http://127.0.0.1:8080/futures/{symbol}"  # 로컬 스탠드인 서버
+"""
+
+import argparse
+import random
+import time
+
+from lbank_monitor import LBankPriceMonitor
+from log_setup import setup_logging
+
+MODES = ("page_source", "script")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LBank 페이지 추출 방식 비교")
+    parser.add_argument("--sample", type=int, default=10, help="비교할 심볼 수")
+    parser.add_argument("--url-template", help="선물 페이지 URL 템플릿 (로컬 스탠드인 서버용)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    setup_logging()
+    monitor = LBankPriceMonitor()
+    if args.url_template:
+        monitor.futures_url_template = args.url_template
+    tickers = monitor.select_tickers()
+    symbols = random.Random(args.seed).sample([t['symbol'] for t in tickers],
+                                              min(args.sample, len(tickers)))
+
+    # 같은 심볼을 두 방식으로 번갈아 수집 (순서 편향을 줄이려고 심볼마다 순서를 바꿈)
+    totals = {mode: 0.0 for mode in MODES}
+    mismatches = []
+    try:
+        for i, symbol in enumerate(symbols):
+            rates = {}
+            for mode in (MODES if i % 2 == 0 else reversed(MODES)):
+                monitor.extraction = mode
+                start = time.time()
+                record = monitor.get_funding_rate_from_web(symbol)
+                totals[mode] += time.time() - start
+                rates[mode] = record.rate if record else None
+            if rates["page_source"] != rates["script"]:
+                mismatches.append((symbol, rates))
+    finally:
+        monitor.close_browser_sessions()
+
+    print(f"\n📄 {len(symbols)} symbols")
+    for mode in MODES:
+        stats = monitor.extract_stats[mode]
+        pages = stats["pages"] or 1
+        print(f"  {mode:<12} {stats['bytes'] / pages / 1024:9.1f} KiB/page  "
+              f"extract {stats['seconds'] / pages:5.2f}s/page  end-to-end {totals[mode] / len(symbols):5.2f}s/symbol")
+    print(f"  rate mismatches: {len(mismatches)} {mismatches[:5]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+펀딩 레이트 레코드 표현별 메모리 / 변환 비용 측정
+사용법:
+- python3 bench_records.py                  # 심볼 1,000개 기준
+- python3 bench_records.py --count 5000 --repeat 20
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from funding_record import FundingBatch, FundingRecord
+
+
+def sample_dicts(count: int, seed: int = 42) -> List[Dict]:
+    """Funding file entries in the old string-heavy shape (what scrapes used to produce)"""
+    rng = random.Random(seed)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    items = []
+    for i in range(count):
+        remaining = rng.randrange(8 * 3600)
+        items.append({
+            "symbol": f"coin{i}_usdt",
+            "funding_rate": f"{rng.uniform(-0.05, 0.05):+.4f}%",
+            "countdown": f"/{remaining // 3600:02d}:{remaining % 3600 // 60:02d}:{remaining % 60:02d}",
+            "timestamp": now
+        })
+    return items
+
+
+def measure_memory(build: Callable[[], object]) -> int:
+    """Bytes still allocated by the object build() returns"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return after - before
+
+
+def measure_time(fn: Callable[[], object], repeat: int) -> float:
+    """Best of repeat runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="펀딩 레이트 레코드 메모리 / 변환 비용 측정")
+    parser.add_argument("--count", type=int, default=1000, help="레코드 수")
+    parser.add_argument("--repeat", type=int, default=10, help="변환 측정 반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    items = sample_dicts(args.count)
+    records = [FundingRecord.from_dict(item) for item in items]
+    # 심볼 문자열은 intern 테이블에 이미 들어가 있으므로 레코드 측정에는 포함되지 않음
+    memory = {
+        "dict (file shape)": measure_memory(lambda: [record.to_dict() for record in records]),
+        "FundingRecord (__slots__)": measure_memory(lambda: [FundingRecord.from_dict(item) for item in items]),
+        "FundingBatch (arrays)": measure_memory(lambda: FundingBatch(records)),
+    }
+    per_thousand = 1000 / args.count
+    print(f"📦 Memory per 1,000 records ({args.count} measured)")
+    for name, size in memory.items():
+        print(f"  {name:<28} {size * per_thousand / 1024:8.1f} KiB")
+
+    batch = FundingBatch(records)
+    timings = {
+        "dict -> FundingRecord": lambda: [FundingRecord.from_dict(item) for item in items],
+        "FundingRecord -> dict": lambda: [record.to_dict() for record in records],
+        "FundingRecord -> batch": lambda: FundingBatch(records),
+        "batch -> FundingRecord": lambda: list(batch),
+    }
+    print(f"\n⚡ Conversion cost (best of {args.repeat})")
+    for name, fn in timings.items():
+        seconds = measure_time(fn, args.repeat)
+        print(f"  {name:<28} {seconds * 1e3:8.2f} ms  ({seconds / args.count * 1e6:.2f} µs/record)")
+
+
+if __name__ == "__main__":
+    main()
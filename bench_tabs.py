@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+브라우저 병렬화 방식 비교 (스레드마다 드라이버 1개 vs 적은 수의 브라우저 x 탭 여러 개) — 초당 페이지 / 메모리 GB
+사용법:
+- python3 bench_tabs.py                                  # 라이브 사이트, 샘플 40개, 드라이버 10개 vs 브라우저 2개 x 탭 5개
+- python3 bench_tabs.py --threads 10 --browsers 2 --tabs 8 --sample 80
+- python3 bench_tabs.py --url-template "http://127.0.0.1:8080/futures/{symbol}"  # 로컬 스탠드인 서버
+
+메모리는 이 프로세스의 자식 프로세스(geckodriver, Firefox 및 콘텐츠 프로세스) PSS 합계의 최댓값 (PSS가 없으면 RSS)
+"""
+
+import argparse
+import dataclasses
+import random
+import threading
+import time
+
+import psutil
+
+from lbank_monitor import LBankPriceMonitor
+from log_setup import setup_logging
+from scraper_config import ScraperConfig
+
+
+def browser_memory_mb() -> float:
+    """Total PSS (RSS where PSS is unavailable) of every child process, in MB"""
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            info = child.memory_full_info()
+            total += getattr(info, "pss", info.rss)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / 1024 / 1024
+
+
+class MemorySampler:
+    """측정 동안 자식 프로세스 메모리를 주기적으로 기록 (최댓값/평균)"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append(browser_memory_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak(self) -> float:
+        return max(self.samples, default=0.0)
+
+    @property
+    def mean(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+
+def run_mode(name: str, config: ScraperConfig, symbols, url_template: str = None) -> dict:
+    monitor = LBankPriceMonitor(config)
+    if url_template:
+        monitor.futures_url_template = url_template
+    ok = 0
+    start = time.time()
+    with MemorySampler() as memory:
+        try:
+            results = monitor.tab_results(symbols) if config.tabs_per_browser > 1 else monitor.browser_results(symbols)
+            for _, record, _, _ in results:
+                ok += record is not None
+        finally:
+            monitor.close_browser_sessions()
+    elapsed = time.time() - start
+    pages_per_second = ok / elapsed if elapsed > 0 else 0.0
+    peak_gb = memory.peak / 1024
+    return {
+        "name": name, "ok": ok, "elapsed": elapsed, "pages_per_second": pages_per_second,
+        "peak_mb": memory.peak, "mean_mb": memory.mean,
+        "per_gb": pages_per_second / peak_gb if peak_gb else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="드라이버-스레드 방식 vs 멀티탭 방식 처리량/메모리 비교")
+    parser.add_argument("--sample", type=int, default=40, help="모드마다 수집할 심볼 수")
+    parser.add_argument("--threads", type=int, default=10, help="드라이버-스레드 방식의 드라이버 수")
+    parser.add_argument("--browsers", type=int, default=2, help="멀티탭 방식의 브라우저 수")
+    parser.add_argument("--tabs", type=int, default=5, help="브라우저당 탭 수")
+    parser.add_argument("--url-template", help="선물 페이지 URL 템플릿 (로컬 스탠드인 서버용)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    setup_logging()
+    base = ScraperConfig.load()
+    tickers = LBankPriceMonitor(base).select_tickers()
+    symbols = random.Random(args.seed).sample([t['symbol'] for t in tickers], min(args.sample, len(tickers)))
+
+    # 두 방식 모두 페이지 안 추출로 맞춤 (멀티탭은 항상 페이지 안에서 값을 확인)
+    modes = [
+        (f"threads {args.threads}x1", dataclasses.replace(base, browser_workers=args.threads, tabs_per_browser=1,
+                                                         extraction="script")),
+        (f"tabs {args.browsers}x{args.tabs}", dataclasses.replace(base, browser_workers=args.browsers,
+                                                                 tabs_per_browser=args.tabs, extraction="script")),
+    ]
+    reports = [run_mode(name, config, symbols, args.url_template) for name, config in modes]
+
+    print(f"\n🗂️ {len(symbols)} symbols per mode")
+    for r in reports:
+        print(f"  {r['name']:<14} {r['ok']:3d} ok in {r['elapsed']:6.1f}s  {r['pages_per_second']:5.2f} pages/s  "
+              f"memory peak {r['peak_mb']:7.0f} MB (mean {r['mean_mb']:.0f})  {r['per_gb']:5.2f} pages/s/GB")
+    if reports[0]["per_gb"]:
+        print(f"  tabs vs threads: {reports[1]['per_gb'] / reports[0]['per_gb']:.2f}x pages/s per GB")
+
+
+if __name__ == "__main__":
+    main()
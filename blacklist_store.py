@@ -0,0 +1,196 @@
+import fcntl
+import fnmatch
+import json
+import os
+import re
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+BLACKLIST_FILE = "blacklist.json"
+BLACKLIST_DESCRIPTION = "LBank 펀딩 레이트 수집에서 제외할 티커들의 블랙리스트"
+REGEX_PREFIX = "re:"
+GLOB_CHARS = set("*?[")
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_entry(entry: str) -> str:
+    """Lower-case plain symbols and globs; regex rules are kept verbatim"""
+    entry = entry.strip()
+    if entry.startswith(REGEX_PREFIX):
+        return entry
+    return entry.lower()
+
+
+def validate_entry(entry: str):
+    """Raise ValueError if a re: rule does not compile (so a bad rule never reaches the file)"""
+    if entry.startswith(REGEX_PREFIX):
+        try:
+            re.compile(entry[len(REGEX_PREFIX):])
+        except re.error as e:
+            raise ValueError(f"invalid regex rule {entry!r}: {e}") from None
+
+
+class BlacklistMatcher:
+    """정확한 심볼 + glob(`1000*`) + 정규식(`re:...`) 규칙을 한 번에 컴파일한 매처"""
+
+    def __init__(self, entries: Iterable[str] = ()):
+        self.entries: List[str] = []
+        self.exact = set()
+        patterns = []
+        for entry in entries:
+            entry = normalize_entry(entry)
+            if not entry:
+                continue
+            if entry.startswith(REGEX_PREFIX):
+                try:
+                    validate_entry(entry)
+                except ValueError as e:
+                    # 손으로 고친 파일의 잘못된 규칙 하나 때문에 나머지 블랙리스트를 잃지 않도록 건너뜀
+                    logger.error(f"Skipping blacklist entry: {e}")
+                    continue
+                self.entries.append(entry)
+                patterns.append(entry[len(REGEX_PREFIX):])
+                continue
+            self.entries.append(entry)
+            if GLOB_CHARS & set(entry):
+                patterns.append(fnmatch.translate(entry))
+            else:
+                self.exact.add(entry)
+        self.pattern = None
+        self.patterns = []
+        if patterns:
+            try:
+                self.pattern = re.compile("|".join(f"(?:{p})" for p in patterns))
+            except re.error:
+                # 규칙끼리 충돌 (예: 같은 이름의 그룹): 규칙마다 따로 검사
+                self.patterns = [re.compile(p) for p in patterns]
+
+    def __contains__(self, symbol) -> bool:
+        if not symbol:
+            return False
+        if symbol in self.exact:
+            return True
+        if self.pattern:
+            return bool(self.pattern.fullmatch(symbol))
+        return any(pattern.fullmatch(symbol) for pattern in self.patterns)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def rule_count(self) -> int:
+        return len(self.entries) - len(self.exact)
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool = True):
+    """Advisory lock on a sidecar file so readers never see a half-written update"""
+    with open(f"{path}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_entries(path: str) -> List[str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('blacklist', [])
+    except FileNotFoundError:
+        return []
+
+
+def _write_entries(path: str, entries: List[str]):
+    data = {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "description": BLACKLIST_DESCRIPTION,
+        "blacklist": entries
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_entries(path: str = BLACKLIST_FILE) -> List[str]:
+    """Read blacklist entries under a shared lock"""
+    with file_lock(path, exclusive=False):
+        return _read_entries(path)
+
+
+def load_matcher(path: str = BLACKLIST_FILE) -> BlacklistMatcher:
+    return BlacklistMatcher(load_entries(path))
+
+
+def update_entries(update: Callable[[List[str]], List[str]], path: str = BLACKLIST_FILE) -> List[str]:
+    """Read-modify-write the blacklist atomically (exclusive lock + temp file + rename); ValueError on an invalid rule"""
+    with file_lock(path):
+        current = _read_entries(path)
+        entries = update(list(current))
+        # 새로 들어온 규칙만 검사 (이미 파일에 있는 잘못된 규칙은 remove로 지울 수 있어야 함)
+        for entry in set(entries) - set(current):
+            validate_entry(entry)
+        _write_entries(path, entries)
+        return entries
+
+
+class BlacklistWatcher:
+    """블랙리스트 파일 변경을 감시해서 실행 중인 수집기에 즉시 반영"""
+
+    def __init__(self, path: str = BLACKLIST_FILE, on_change: Optional[Callable] = None,
+                 interval: float = 2.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.matcher = BlacklistMatcher()
+        self._signature = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.reload()
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size, stat.st_ino
+        except FileNotFoundError:
+            return None
+
+    def reload(self) -> bool:
+        """Reload the matcher if the file changed since the last check"""
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return False
+        try:
+            matcher = load_matcher(self.path)
+        except Exception as e:
+            logger.error(f"Error reloading blacklist: {e}")
+            return False
+        self._signature = signature
+        self.matcher = matcher
+        logger.info(f"📋 Loaded {len(matcher)} blacklist entries ({matcher.rule_count} pattern rules)")
+        if self.on_change:
+            self.on_change(matcher)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.reload()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="blacklist-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
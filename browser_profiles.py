@@ -0,0 +1,133 @@
+import json
+import os
+import queue
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+CLEARANCE_COOKIE = "cf_clearance"
+
+
+class BrowserProfileStore:
+    """워커 슬롯별로 Firefox 프로필과 쿠키를 디스크에 유지 (사이클/재시작 간 재사용)"""
+
+    def __init__(self, root: str = "browser_profiles", slots: int = 10):
+        self.root = root
+        self.slots = slots
+        self.stats_file = os.path.join(root, "stats.json")
+        self.free_slots = queue.Queue()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(root, exist_ok=True)
+        self.stats = self._load_stats()
+
+    def _load_stats(self) -> Dict:
+        """Load challenge counters persisted by previous runs"""
+        stats = {"challenge_hit": 0, "challenge_avoided": 0, "cookies_saved": 0}
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                stats.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"Error reading profile stats: {e}")
+        return stats
+
+    def save_stats(self):
+        """Persist challenge counters"""
+        with self.lock:
+            self._write_json(self.stats_file, self.stats)
+
+    def _write_json(self, path: str, data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def slot_dir(self, slot: int) -> str:
+        path = os.path.join(self.root, f"slot_{slot}")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def profile_dir(self, slot: int) -> str:
+        """Firefox profile directory for a worker slot"""
+        path = os.path.join(self.slot_dir(slot), "profile")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def cookie_file(self, slot: int) -> str:
+        return os.path.join(self.slot_dir(slot), "cookies.json")
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a slot so no two browsers share a profile directory"""
+        slot = self.free_slots.get()
+        try:
+            yield slot
+        finally:
+            self.free_slots.put(slot)
+
+    def load_cookies(self, slot: int) -> Tuple[List[Dict], Optional[str]]:
+        """Return unexpired cookies and the user agent they were issued to"""
+        try:
+            with open(self.cookie_file(slot), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return [], None
+        except Exception as e:
+            self.logger.warning(f"Error reading cookies for slot {slot}: {e}")
+            return [], None
+
+        now = time.time()
+        cookies = [c for c in data.get("cookies", []) if c.get("expiry", now + 1) > now]
+        return cookies, data.get("user_agent")
+
+    def save_cookies(self, slot: int, cookies: List[Dict], user_agent: Optional[str] = None):
+        """Store a slot's cookies with their expiry times"""
+        data = {
+            "saved_at": int(time.time()),
+            "user_agent": user_agent,
+            "cookies": cookies
+        }
+        self._write_json(self.cookie_file(slot), data)
+        with self.lock:
+            self.stats["cookies_saved"] += 1
+
+    def clearance_expiry(self, slot: int) -> Optional[int]:
+        """Expiry (epoch seconds) of the slot's cf_clearance cookie, if still valid"""
+        cookies, _ = self.load_cookies(slot)
+        for cookie in cookies:
+            if cookie.get("name") == CLEARANCE_COOKIE:
+                return cookie.get("expiry")
+        return None
+
+    def best_clearance(self) -> Optional[Tuple[List[Dict], str]]:
+        """Pick the slot whose clearance lives longest, for seeding HTTP sessions"""
+        best = None
+        best_expiry = 0
+        for slot in range(self.slots):
+            expiry = self.clearance_expiry(slot)
+            if expiry and expiry > best_expiry:
+                cookies, user_agent = self.load_cookies(slot)
+                if user_agent:
+                    best, best_expiry = (cookies, user_agent), expiry
+        return best
+
+    def record_challenge(self, challenged: bool):
+        """Count whether a page load hit the Cloudflare challenge path"""
+        with self.lock:
+            if challenged:
+                self.stats["challenge_hit"] += 1
+            else:
+                self.stats["challenge_avoided"] += 1
+
+    def summary(self) -> str:
+        hit = self.stats["challenge_hit"]
+        avoided = self.stats["challenge_avoided"]
+        total = hit + avoided
+        rate = (avoided / total) * 100 if total else 0
+        return f"challenge avoided {avoided}/{total} ({rate:.1f}%), cookies saved {self.stats['cookies_saved']}"
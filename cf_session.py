@@ -0,0 +1,163 @@
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from log_setup import SAMPLED
+
+CHALLENGE_TITLES = ("Just a moment", "Checking your browser")
+CHALLENGE_MARKERS = ("cf-browser-verification", "challenge-platform", "cf_chl_opt")
+
+
+def is_cloudflare_challenge(text: str) -> bool:
+    """Check whether a page title or body is a Cloudflare challenge page"""
+    if not text:
+        return False
+    return any(marker in text for marker in CHALLENGE_TITLES + CHALLENGE_MARKERS)
+
+
+def is_challenge_response(resp: requests.Response) -> bool:
+    """Check whether an HTTP response was answered by the Cloudflare challenge"""
+    if resp.status_code in (403, 503) and resp.headers.get("Server", "").lower().startswith("cloudflare"):
+        return True
+    if resp.status_code in (403, 429, 503):
+        return is_cloudflare_challenge(resp.text[:4096])
+    return False
+
+
+class CloudflareSession:
+    """Cloudflare clearance를 브라우저 한 번으로 얻고, 이후 요청은 풀링된 HTTP 세션으로 처리"""
+
+    def __init__(self, browser_factory: Callable, base_url: str = "https://www.lbank.com",
+                 pool_size: int = 50, timeout: int = 10, challenge_timeout: int = 30,
+                 max_refreshes: int = 2, proxy: Optional[str] = None):
+        self.browser_factory = browser_factory  # setup_selenium 같은 드라이버 생성 함수
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.challenge_timeout = challenge_timeout
+        self.max_refreshes = max_refreshes
+        self.proxy = proxy  # clearance는 IP에 묶이므로 브라우저와 같은 프록시로 요청
+        self.session: Optional[requests.Session] = None
+        self.user_agent: Optional[str] = None
+        self.cookies: List[Dict] = []
+        self.generation = 0  # clearance를 새로 받을 때마다 증가
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "challenges": 0, "refreshes": 0, "errors": 0}
+        self.logger = logging.getLogger(__name__)
+
+    def _build_session(self, cookies: List[Dict], user_agent: str) -> requests.Session:
+        """Build a pooled requests session carrying the browser's clearance"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if self.proxy:
+            session.proxies.update({"http": self.proxy, "https": self.proxy})
+        session.headers.update({
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+        for cookie in cookies:
+            session.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain"), path=cookie.get("path", "/")
+            )
+        return session
+
+    def seed(self, cookies: List[Dict], user_agent: str):
+        """Start from a clearance persisted by an earlier browser session"""
+        with self.lock:
+            self.cookies = cookies
+            self.user_agent = user_agent
+            self.session = self._build_session(cookies, user_agent)
+            self.generation += 1
+        self.logger.info("Seeded HTTP session with persisted Cloudflare clearance")
+
+    def _count(self, name: str):
+        with self.lock:
+            self.stats[name] += 1
+
+    def refresh_clearance(self, seen_generation: Optional[int] = None) -> bool:
+        """Solve the challenge in a browser and export its cookies and user agent"""
+        with self.lock:
+            # 다른 스레드가 이미 갱신했으면 다시 브라우저를 띄우지 않음
+            # (첫 요청이 동시에 몰려도 clearance는 한 번만 받음)
+            if seen_generation is None and self.session is not None:
+                return True
+            if seen_generation is not None and seen_generation != self.generation:
+                return True
+
+            driver = None
+            try:
+                self.logger.info("Harvesting Cloudflare clearance with browser session...")
+                driver = self.browser_factory()
+                driver.get(self.base_url)
+
+                deadline = time.time() + self.challenge_timeout
+                while is_cloudflare_challenge(driver.title) and time.time() < deadline:
+                    time.sleep(1)
+                if is_cloudflare_challenge(driver.title):
+                    self.logger.warning("Cloudflare challenge was not solved in time")
+                    return False
+
+                self.cookies = driver.get_cookies()
+                self.user_agent = driver.execute_script("return navigator.userAgent")
+                self.session = self._build_session(self.cookies, self.user_agent)
+                self.generation += 1
+                self.stats["refreshes"] += 1
+
+                names = [c["name"] for c in self.cookies]
+                self.logger.info(f"Clearance refreshed (generation {self.generation}, cookies: {names})")
+                return True
+            except Exception as e:
+                self.logger.error(f"Error refreshing Cloudflare clearance: {e}")
+                return False
+            finally:
+                if driver:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+
+    def get(self, url: str, **kwargs) -> Optional[requests.Response]:
+        """GET through the pooled session, falling back to the browser when challenged"""
+        kwargs.setdefault("timeout", self.timeout)
+
+        for _ in range(self.max_refreshes + 1):
+            if self.session is None and not self.refresh_clearance():
+                return None
+
+            with self.lock:
+                session, generation = self.session, self.generation
+                self.stats["requests"] += 1
+            if session is None:
+                # 다른 스레드가 close()함
+                return None
+            try:
+                resp = session.get(url, **kwargs)
+            except requests.RequestException as e:
+                self._count("errors")
+                self.logger.warning(f"HTTP fetch failed for {url}: {e}")
+                return None
+
+            if not is_challenge_response(resp):
+                return resp
+
+            # challenge가 다시 나타나면 브라우저로 clearance 갱신
+            self._count("challenges")
+            self.logger.info(f"Cloudflare challenge reappeared for {url}, refreshing clearance", extra=SAMPLED)
+            if not self.refresh_clearance(generation):
+                return None
+
+        return None
+
+    def close(self):
+        """Close pooled connections"""
+        if self.session:
+            self.session.close()
+            self.session = None
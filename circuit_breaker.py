@@ -0,0 +1,169 @@
+import heapq
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+_breakers: Dict[str, "CircuitBreaker"] = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """호스트 단위 차단기: 최근 오류/challenge 비율이 높으면 모든 페이지 로드를 잠시 멈춤"""
+
+    def __init__(self, host: str, window: float = 60.0, failure_rate: float = 0.5,
+                 min_requests: int = 10, cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.host = host
+        self.window = window              # 비율 계산 구간 (초)
+        self.failure_rate = failure_rate  # 이 비율 이상이면 차단
+        self.min_requests = min_requests  # 표본이 적을 때는 차단하지 않음
+        self.cooldown = cooldown          # 첫 차단 시간, 연속 차단 시 2배씩
+        self.max_cooldown = max_cooldown
+        self.state = "closed"             # closed -> open -> half_open -> closed/open
+        self.open_until = 0.0
+        self.trips = 0                    # 연속 차단 횟수 (닫히면 초기화)
+        self._events = deque()            # (시각, 실패 여부)
+        self._failures = 0
+        self._probing = False
+        self._cond = threading.Condition()
+        self.stats = {"requests": 0, "failures": 0, "opened": 0, "waits": 0, "wait_seconds": 0.0}
+
+    def _prune(self, now: float):
+        while self._events and self._events[0][0] < now - self.window:
+            _, failed = self._events.popleft()
+            self._failures -= failed
+
+    def _open(self, now: float):
+        self.trips += 1
+        cooldown = min(self.cooldown * 2 ** (self.trips - 1), self.max_cooldown)
+        self.state = "open"
+        self.open_until = now + cooldown
+        self._probing = False
+        self._events.clear()
+        self._failures = 0
+        self.stats["opened"] += 1
+        logger.warning(f"⛔ {self.host} circuit open for {cooldown:.0f}s (trip {self.trips})")
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait until a request may go out; False if the circuit stayed open past timeout"""
+        start = time.time()
+        waited = allowed = False
+        with self._cond:
+            while True:
+                now = time.time()
+                if self.state == "open" and now >= self.open_until:
+                    self.state = "half_open"
+                if self.state == "closed" or (self.state == "half_open" and not self._probing):
+                    # half-open 상태에서는 한 요청만 통과시켜 회복 여부를 확인
+                    self._probing = self.state == "half_open"
+                    allowed = True
+                    break
+                if timeout is not None and now - start >= timeout:
+                    break
+                waited = True
+                wait = self.open_until - now if self.state == "open" else 1.0
+                if timeout is not None:
+                    wait = min(wait, start + timeout - now)
+                self._cond.wait(max(wait, 0.01))
+            if waited:
+                self.stats["waits"] += 1
+                self.stats["wait_seconds"] += time.time() - start
+            return allowed
+
+    def record(self, ok: bool):
+        """Report a request outcome (a challenge page counts as a failure)"""
+        now = time.time()
+        with self._cond:
+            self.stats["requests"] += 1
+            self.stats["failures"] += not ok
+            if self.state == "half_open" and self._probing:
+                self._probing = False
+                if ok:
+                    self.state = "closed"
+                    self.trips = 0
+                    logger.info(f"✅ {self.host} circuit closed")
+                else:
+                    self._open(now)
+                self._cond.notify_all()
+                return
+            if self.state != "closed":
+                return  # 차단 전에 나간 요청의 늦은 결과
+            self._events.append((now, not ok))
+            self._failures += not ok
+            self._prune(now)
+            if len(self._events) >= self.min_requests and self._failures / len(self._events) >= self.failure_rate:
+                self._open(now)
+
+    def summary(self) -> str:
+        return (f"{self.host} {self.state}, {self.stats['opened']} trips, "
+                f"{self.stats['failures']}/{self.stats['requests']} failed, "
+                f"waited {self.stats['wait_seconds']:.0f}s")
+
+
+def breaker_for(url: str, **settings) -> CircuitBreaker:
+    """Shared breaker for the URL's host (settings apply when it is first created)"""
+    host = urlparse(url).netloc or url
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host, **settings)
+        return breaker
+
+
+def all_breakers() -> Dict[str, CircuitBreaker]:
+    """Every breaker created so far, keyed by host"""
+    with _breakers_lock:
+        return dict(_breakers)
+
+
+class DeferredRetryQueue:
+    """실패한 심볼을 메인 패스가 끝난 뒤 지터가 있는 지수 백오프로 다시 시도하기 위한 큐"""
+
+    def __init__(self, base_delay: float = 3.0, max_delay: float = 60.0, max_attempts: int = 2):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts  # 첫 시도를 포함한 총 시도 횟수
+        self._heap: List[Tuple[float, str, int]] = []  # (재시도 가능 시각, 심볼, 지금까지 시도 횟수)
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def delay(self, attempts: int) -> float:
+        # 지수 증가 + 지터 (같은 시각에 몰려서 재시도하지 않도록 절반~전체 사이에서 무작위)
+        delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+        return random.uniform(delay / 2, delay)
+
+    def push(self, symbol: str, attempts: int) -> bool:
+        """Schedule another attempt; False once the symbol has used all its attempts"""
+        if attempts >= self.max_attempts:
+            return False
+        with self.lock:
+            heapq.heappush(self._heap, (time.time() + self.delay(attempts), symbol, attempts))
+        return True
+
+    def pop_ready(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Symbols whose backoff has elapsed, with their attempt counts"""
+        now = time.time()
+        ready = []
+        with self.lock:
+            while self._heap and self._heap[0][0] <= now and (limit is None or len(ready) < limit):
+                _, symbol, attempts = heapq.heappop(self._heap)
+                ready.append((symbol, attempts))
+        return ready
+
+    def drain(self) -> List[str]:
+        """Remove and return every queued symbol"""
+        with self.lock:
+            symbols = [symbol for _, symbol, _ in sorted(self._heap)]
+            self._heap.clear()
+        return symbols
+
+    def next_ready_in(self) -> Optional[float]:
+        with self.lock:
+            return max(0.0, self._heap[0][0] - time.time()) if self._heap else None
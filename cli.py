@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+통합 CLI (무거운 의존성은 해당 하위 명령에서만 로드)
+사용법:
+- python3 cli.py collect lbank [--hybrid] [--symbols btc_usdt eth_usdt]
+- python3 cli.py collect mexc
+- python3 cli.py compare
+- python3 cli.py notify                      # 마지막 비교 결과를 텔레그램으로 전송
+- python3 cli.py blacklist list              # manage_blacklist.py 명령 그대로
+- python3 cli.py tickers refresh
+- python3 cli.py daemon                      # main.py 데몬
+- python3 cli.py startup                     # 하위 명령별 콜드 스타트 시간 측정
+- python3 cli.py --timing <command>          # 실행 후 로드/실행 시간 출력
+- python3 cli.py --profile <command>         # 사이클별 프로파일을 profiles/에 저장 (실행 중에는 kill -USR1 로 켜고 끄기)
+"""
+
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import importlib
+import json
+import subprocess
+import sys
+
+# 하위 명령별로 실제로 필요한 모듈 (콜드 스타트 측정에도 사용)
+COMMAND_MODULES = {
+    "collect lbank": ["lbank_monitor"],
+    "collect mexc": ["mexc_monitor"],
+    "compare": ["main"],
+    "notify": ["telegram_sender"],
+    "blacklist": ["manage_blacklist"],
+    "tickers refresh": ["lbank_monitor"],
+    "daemon": ["main", "exchange_adapters", "lbank_monitor", "mexc_monitor", "mexc_stream", "telegram_sender"],
+}
+
+
+def cmd_collect_lbank(args):
+    from lbank_monitor import LBankPriceMonitor
+    from log_setup import setup_logging
+
+    setup_logging()
+    monitor = LBankPriceMonitor()
+    if args.hybrid:
+        monitor.fetch_mode = "hybrid"
+    monitor.monitor_loop(args.symbols)
+
+
+def cmd_collect_mexc(args):
+    from mexc_monitor import MEXCMonitor
+    from log_setup import setup_logging
+
+    setup_logging()
+    MEXCMonitor().monitor_funding_rates()
+
+
+def cmd_compare(args):
+    from main import compare_funding_rates
+    from log_setup import setup_logging
+    from profiler import get_profiler
+
+    setup_logging()
+    with get_profiler().cycle("compare"):
+        results = compare_funding_rates()
+    if results is None:
+        return 1
+    print(f"Compared {len(results)} symbols with a cross-exchange spread over the threshold")
+
+
+def cmd_notify(args):
+    from telegram_sender import TelegramSender
+    from log_setup import setup_logging
+    from profiler import get_profiler
+
+    setup_logging()
+    try:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            comparisons = json.load(f).get('comparisons', [])
+    except Exception as e:
+        print(f"❌ 비교 결과 읽기 오류: {e}")
+        return 1
+    with get_profiler().cycle("notify"):
+        TelegramSender().send_comparison_results(comparisons)
+
+
+def cmd_blacklist(args):
+    import manage_blacklist
+
+    sys.argv = ["manage_blacklist.py"] + args.blacklist_args
+    manage_blacklist.main()
+
+
+def cmd_tickers_refresh(args):
+    from lbank_monitor import LBankPriceMonitor
+    from log_setup import setup_logging
+
+    setup_logging()
+    monitor = LBankPriceMonitor()
+    tickers = monitor.get_all_tickers()
+    if not tickers:
+        print("❌ 티커를 가져오지 못했습니다.")
+        return 1
+    monitor.save_tickers(tickers)
+
+
+def cmd_daemon(args):
+    import main
+
+    main.main()
+
+
+def cmd_startup(args):
+    """Measure cold start of every subcommand in a fresh interpreter"""
+    print("⏱️  하위 명령별 콜드 스타트 (새 프로세스, 모듈 로드까지):")
+    for command in COMMAND_MODULES:
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, __file__, "--startup-only", *command.split()],
+            capture_output=True, text=True
+        )
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            error = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+            print(f"  {command:<16} 실패: {error}")
+        else:
+            print(f"  {command:<16} {elapsed * 1000:7.0f} ms  ({proc.stdout.strip()})")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="LBank 펀딩 모니터 통합 CLI")
+    parser.add_argument("--timing", action="store_true", help="로드/실행 시간 출력")
+    parser.add_argument("--profile", action="store_true", help="cProfile/스레드 샘플/할당 리포트를 profiles/에 저장")
+    parser.add_argument("--startup-only", action="store_true", help=argparse.SUPPRESS)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    collect = sub.add_parser("collect", help="펀딩 레이트 수집")
+    collect_sub = collect.add_subparsers(dest="exchange", required=True)
+    lbank = collect_sub.add_parser("lbank")
+    lbank.add_argument("--hybrid", action="store_true", help="clearance 공유 HTTP 수집")
+    lbank.add_argument("--symbols", nargs="+", help="일부 심볼만 수집")
+    lbank.set_defaults(func=cmd_collect_lbank, key="collect lbank")
+    mexc = collect_sub.add_parser("mexc")
+    mexc.set_defaults(func=cmd_collect_mexc, key="collect mexc")
+
+    compare = sub.add_parser("compare", help="거래소 간 펀딩 레이트 비교")
+    compare.set_defaults(func=cmd_compare, key="compare")
+
+    notify = sub.add_parser("notify", help="마지막 비교 결과 전송")
+    notify.add_argument("--file", default="funding_comparison.json")
+    notify.set_defaults(func=cmd_notify, key="notify")
+
+    blacklist = sub.add_parser("blacklist", help="블랙리스트/격리 관리")
+    blacklist.add_argument("blacklist_args", nargs=argparse.REMAINDER)
+    blacklist.set_defaults(func=cmd_blacklist, key="blacklist")
+
+    tickers = sub.add_parser("tickers", help="티커 목록 관리")
+    tickers_sub = tickers.add_subparsers(dest="action", required=True)
+    refresh = tickers_sub.add_parser("refresh")
+    refresh.set_defaults(func=cmd_tickers_refresh, key="tickers refresh")
+
+    daemon = sub.add_parser("daemon", help="정산 시각 기반 데몬 실행")
+    daemon.set_defaults(func=cmd_daemon, key="daemon")
+
+    startup = sub.add_parser("startup", help="하위 명령별 콜드 스타트 측정")
+    startup.set_defaults(func=cmd_startup, key="startup")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+
+    if args.startup_only:
+        # 하위 명령이 실제로 로드하는 모듈만 import 하고 종료
+        for module in COMMAND_MODULES.get(args.key, []):
+            importlib.import_module(module)
+        print(f"ready in {(time.perf_counter() - _START) * 1000:.0f} ms, {len(sys.modules)} modules")
+        return 0
+
+    if args.profile:
+        from profiler import get_profiler
+
+        get_profiler().enabled = True
+    ready = time.perf_counter()
+    code = args.func(args) or 0
+    if args.timing:
+        print(f"⏱️  {args.key}: startup {(ready - _START) * 1000:.0f} ms, "
+              f"run {(time.perf_counter() - ready):.2f} s", file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+여러 워커 프로세스/호스트로 LBank 수집을 분산
+사용법:
+- python3 distributed.py coordinator --deadline 1500   # 작업 발행 + 결과 병합 (사이클 1회)
+- python3 distributed.py worker                        # 작업을 가져와 자체 드라이버 풀로 수집
+- python3 distributed.py worker --exit-when-idle       # 남은 작업이 없으면 종료
+- python3 distributed.py status                        # 살아있는 워커 보기
+- python3 distributed.py serve --listen 0.0.0.0:8766 --token <토큰>      # 큐 호스트: 다른 호스트 워커용 큐 서버
+- python3 distributed.py worker --queue http://<큐 호스트>:8766 --token <토큰>  # 다른 호스트의 워커
+
+큐 파일(SQLite)은 코디네이터가 도는 한 호스트의 로컬 디스크에만 둡니다.
+공유 볼륨(NFS/SMB)으로 같은 파일을 여러 호스트에서 열면 WAL/잠금이 동작하지 않아 큐가 깨지거나 임대가 사라집니다.
+같은 호스트의 워커는 --db로 파일을 직접, 다른 호스트의 워커는 serve로 띄운 큐 서버에 --queue로 접속합니다.
+"""
+
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from lbank_monitor import LBankPriceMonitor
+from log_setup import setup_logging
+from work_queue import QUEUE_FILE, QUEUE_PORT, QueueServer, RemoteWorkQueue, WorkQueue, make_worker_id
+
+logger = logging.getLogger(__name__)
+
+
+class Coordinator:
+    """심볼 작업을 발행하고, 죽은 워커의 작업을 재할당하며, 마감 시각에 결과를 병합"""
+
+    def __init__(self, queue: WorkQueue, monitor: LBankPriceMonitor = None,
+                 heartbeat_timeout: float = 60, poll_interval: float = 5):
+        self.queue = queue
+        self.monitor = monitor or LBankPriceMonitor()
+        self.heartbeat_timeout = heartbeat_timeout
+        self.poll_interval = poll_interval
+
+    def run_cycle(self, deadline_seconds: float, symbols: list = None) -> list:
+        tickers = self.monitor.select_tickers(symbols)
+        if not tickers:
+            return []
+
+        deadline = time.time() + deadline_seconds
+        cycle_id = self.queue.publish_cycle([t['symbol'] for t in tickers], deadline)
+        logger.info(f"📤 Published cycle {cycle_id}: {len(tickers)} tasks, deadline in {deadline_seconds:.0f}s")
+
+        while time.time() < deadline:
+            requeued = self.queue.requeue_dead(self.heartbeat_timeout)
+            if requeued:
+                logger.warning(f"♻️ Re-queued {requeued} tasks from dead workers")
+
+            counts = self.queue.cycle_counts(cycle_id)
+            remaining = counts.get('pending', 0) + counts.get('leased', 0)
+            workers = len(self.queue.live_workers(self.heartbeat_timeout))
+            logger.info(f"Cycle {cycle_id}: {counts} ({workers} live workers)")
+            if remaining == 0:
+                break
+            time.sleep(self.poll_interval)
+
+        expired = self.queue.close_cycle(cycle_id)
+        if expired:
+            logger.warning(f"⏰ Deadline reached, {len(expired)} tasks not collected")
+
+        results = self.queue.results(cycle_id)
+        for symbol, error in self.queue.failures(cycle_id).items():
+            self.monitor.health.record_failure(symbol, error or "failed on worker")
+        for item in results:
+            self.monitor.health.record_success(item.symbol)
+        self.monitor.health.save()
+
+        if results:
+            self.monitor.merge_funding_rates(results)
+        logger.info(f"🎉 Cycle {cycle_id} merged {len(results)}/{len(tickers)} funding rates")
+        self.queue.purge()
+        return results
+
+
+class Worker:
+    """큐에서 작업을 가져와 자체 브라우저 풀로 수집하고 결과와 하트비트를 보고"""
+
+    def __init__(self, queue: WorkQueue, worker_id: str = None, monitor: LBankPriceMonitor = None,
+                 heartbeat_interval: float = 10, idle_sleep: float = 5):
+        self.queue = queue
+        self.worker_id = worker_id or make_worker_id()
+        self.monitor = monitor or LBankPriceMonitor()
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_sleep = idle_sleep
+        self.stop_event = threading.Event()
+
+    def _heartbeat_loop(self):
+        while not self.stop_event.wait(self.heartbeat_interval):
+            try:
+                self.queue.heartbeat(self.worker_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat failed: {e}")
+
+    def _run_task(self, task: dict):
+        try:
+            result = self.monitor.get_funding_rate_from_web(task['symbol'])
+        except Exception as e:
+            result, error = None, str(e)
+        else:
+            error = "funding rate not found"
+        try:
+            if result:
+                reported = self.queue.complete(task['id'], self.worker_id, result)
+            else:
+                reported = self.queue.fail(task['id'], self.worker_id, error)
+            if not reported:
+                logger.warning(f"Lease on {task['symbol']} was reassigned before this report, dropped")
+        except Exception as e:
+            # 보고하지 못한 임대는 하트비트가 끊기면 코디네이터가 재할당
+            logger.warning(f"Could not report {task['symbol']}: {e}")
+
+    def run(self, exit_when_idle: bool = False):
+        self.queue.heartbeat(self.worker_id)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        slots = self.monitor.browser_workers
+        self.monitor.read_blacklist()
+        self.monitor.blacklist_watcher.start()
+        logger.info(f"👷 Worker {self.worker_id} started with {slots} browser slots")
+
+        try:
+            with ThreadPoolExecutor(max_workers=slots) as executor:
+                running = set()
+                while not self.stop_event.is_set():
+                    # 빈 슬롯만큼만 가져와서 다른 워커와 작업을 나눔
+                    free = slots - len(running)
+                    try:
+                        tasks = self.queue.lease(self.worker_id, free) if free > 0 else []
+                    except Exception as e:
+                        # 원격 큐 서버가 잠시 내려가도 워커는 계속 대기
+                        logger.warning(f"Lease failed: {e}")
+                        tasks = []
+                    running.update(executor.submit(self._run_task, task) for task in tasks)
+
+                    if not running:
+                        if exit_when_idle:
+                            break
+                        time.sleep(self.idle_sleep)
+                        continue
+                    _, running = wait(running, timeout=self.idle_sleep, return_when=FIRST_COMPLETED)
+        except KeyboardInterrupt:
+            logger.info("Worker stopped by user")
+        finally:
+            self.stop_event.set()
+            self.monitor.close_browser_sessions()
+            self.monitor.blacklist_watcher.stop()
+            logger.info(f"Worker {self.worker_id} stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분산 LBank 펀딩 레이트 수집")
+    parser.add_argument("role", choices=["coordinator", "worker", "status", "serve"])
+    parser.add_argument("--db", default=QUEUE_FILE, help="작업 큐 SQLite 파일 (로컬 디스크)")
+    parser.add_argument("--queue", help="다른 호스트의 큐 서버 URL (예: http://10.0.0.5:8766)")
+    parser.add_argument("--listen", default=f"127.0.0.1:{QUEUE_PORT}", help="serve: 큐 서버 주소")
+    parser.add_argument("--token", help="큐 서버 토큰 (serve와 원격 워커에 같은 값)")
+    parser.add_argument("--deadline", type=float, default=1500, help="사이클 마감 (초)")
+    parser.add_argument("--heartbeat-timeout", type=float, default=60)
+    parser.add_argument("--worker-id")
+    parser.add_argument("--exit-when-idle", action="store_true")
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.queue:
+        if args.role not in ("worker", "status"):
+            parser.error("--queue는 worker/status에서만 사용 (코디네이터와 serve는 큐 호스트에서 --db로)")
+        queue = RemoteWorkQueue(args.queue, token=args.token)
+    else:
+        queue = WorkQueue(args.db)
+
+    if args.role == "serve":
+        host, _, port = args.listen.rpartition(":")
+        server = QueueServer(queue, host or "127.0.0.1", int(port), token=args.token)
+        server.start()
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            server.stop()
+    elif args.role == "coordinator":
+        Coordinator(queue, heartbeat_timeout=args.heartbeat_timeout).run_cycle(args.deadline)
+    elif args.role == "worker":
+        Worker(queue, worker_id=args.worker_id).run(exit_when_idle=args.exit_when_idle)
+    else:
+        for worker in queue.live_workers(args.heartbeat_timeout):
+            print(f"  {worker['worker_id']} (pid {worker['pid']}): {worker['tasks_done']} tasks done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from funding_matrix import FUNDING_FILES
+from funding_record import DEFAULT_INTERVAL, FundingRecord, read_funding_file, submit_funding_file
+
+class ExchangeAdapter(ABC):
+    """거래소 어댑터 공통 인터페이스 (심볼 목록, 펀딩 수집, 심볼 정규화, 정산 주기)"""
+
+    name = ""
+    quote = "USDT"
+
+    def __init__(self, timeout: float = 10):
+        self.timeout = timeout
+        self.funding_file = FUNDING_FILES.get(self.name, f"{self.name}_funding.json")
+        self._latest: Dict[str, FundingRecord] = {}
+        self.logger = logging.getLogger(f"{__name__}.{self.name}")
+
+    @property
+    def latest(self) -> Dict[str, FundingRecord]:
+        """Latest record per canonical symbol (no network)"""
+        return self._latest
+
+    def to_canonical(self, native: str) -> str:
+        """Exchange symbol -> canonical 'btc_usdt'"""
+        return native.lower()
+
+    def to_native(self, symbol: str) -> str:
+        return symbol.upper()
+
+    @abstractmethod
+    def fetch_funding(self, symbols: Optional[List[str]] = None,
+                      deadline: Optional[float] = None) -> List[FundingRecord]:
+        """Fetch current funding records (network); deadline is an epoch time the scrapers try to finish by"""
+
+    def list_symbols(self) -> List[str]:
+        if not self.latest:
+            self.collect()
+        return sorted(self.latest)
+
+    def funding_interval(self, symbol: str) -> int:
+        record = self.latest.get(symbol)
+        return record.interval if record else DEFAULT_INTERVAL
+
+    def _get_json(self, url: str, params: Dict = None):
+        resp = requests.get(url, params=params, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def collect(self, symbols: Optional[List[str]] = None,
+                deadline: Optional[float] = None) -> List[FundingRecord]:
+        """Fetch, merge into the latest table and save; errors are logged, not raised"""
+        try:
+            records = self.fetch_funding(symbols, deadline)
+        except Exception as e:
+            self.logger.error(f"Error fetching {self.name} funding rates: {e}")
+            return []
+        # API 거래소는 어차피 전체를 받아오므로 부분 수집 요청이어도 모두 병합
+        for record in records:
+            self.latest[record.symbol] = record
+        if records:
+            self.save()
+        self.logger.info(f"Collected {len(records)} {self.name} funding rates")
+        return records
+
+    def load(self):
+        """Warm the latest table from the funding file"""
+        try:
+            for record in read_funding_file(self.funding_file):
+                self.latest[record.symbol] = record
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.error(f"Error loading {self.funding_file}: {e}")
+
+    def save(self):
+        submit_funding_file(self.funding_file, self.latest.values())
+
+
+class LBankAdapter(ExchangeAdapter):
+    """기존 브라우저 스크래퍼(LBankPriceMonitor)를 그대로 사용"""
+
+    name = "lbank"
+
+    def __init__(self, monitor=None, timeout: float = 10):
+        super().__init__(timeout)
+        if monitor is None:
+            from lbank_monitor import LBankPriceMonitor
+            monitor = LBankPriceMonitor()
+        self.monitor = monitor
+
+    @property
+    def latest(self) -> Dict[str, FundingRecord]:
+        return self.monitor.latest_rates  # 모니터가 병합/저장까지 담당
+
+    def list_symbols(self) -> List[str]:
+        return [t['symbol'] for t in self.monitor.read_tickers_from_file() or [] if t.get('symbol')]
+
+    def fetch_funding(self, symbols: Optional[List[str]] = None,
+                      deadline: Optional[float] = None) -> List[FundingRecord]:
+        return self.monitor.monitor_loop(symbols, deadline)
+
+    def load(self):
+        self.monitor.load_latest_rates()
+
+    def save(self):
+        pass  # monitor_loop -> merge_funding_rates 에서 이미 저장
+
+
+class MexcAdapter(ExchangeAdapter):
+    """MEXCMonitor 스냅샷 (스트림이 연결되어 있으면 네트워크 없이 읽음)"""
+
+    name = "mexc"
+
+    def __init__(self, monitor=None, timeout: float = 10):
+        super().__init__(timeout)
+        if monitor is None:
+            from mexc_monitor import MEXCMonitor
+            monitor = MEXCMonitor()
+        self.monitor = monitor
+
+    def fetch_funding(self, symbols: Optional[List[str]] = None,
+                      deadline: Optional[float] = None) -> List[FundingRecord]:
+        return self.monitor.get_funding_records() or []
+
+    def save(self):
+        # 가격 컬럼까지 포함한 전체 스냅샷을 저장 (같은 파일 형식이라 load는 공통 코드 사용)
+        funding_rates = self.monitor.get_funding_rates()
+        if funding_rates:
+            self.monitor.save_funding_rates(funding_rates)
+
+
+class BinanceAdapter(ExchangeAdapter):
+    name = "binance"
+    base_url = "https://fapi.binance.com"
+
+    def to_canonical(self, native: str) -> str:
+        return f"{native[:-len(self.quote)]}_{self.quote}".lower()
+
+    def to_native(self, symbol: str) -> str:
+        return symbol.replace("_", "").upper()
+
+    def fetch_funding(self, symbols: Optional[List[str]] = None,
+                      deadline: Optional[float] = None) -> List[FundingRecord]:
+        premium = self._get_json(f"{self.base_url}/fapi/v1/premiumIndex")
+        # fundingInfo에는 기본(8h)과 다른 주기를 가진 심볼만 나옴
+        intervals = {item["symbol"]: int(item["fundingIntervalHours"]) * 3600
+                     for item in self._get_json(f"{self.base_url}/fapi/v1/fundingInfo")}
+        return [
+            FundingRecord(self.to_canonical(item["symbol"]), float(item["lastFundingRate"]) * 100,
+                          next_settle_ms=int(item.get("nextFundingTime") or 0),
+                          interval=intervals.get(item["symbol"], DEFAULT_INTERVAL))
+            for item in premium
+            if item["symbol"].endswith(self.quote) and item.get("lastFundingRate") not in (None, "")
+        ]
+
+
+class BybitAdapter(ExchangeAdapter):
+    name = "bybit"
+    base_url = "https://api.bybit.com"
+
+    def to_canonical(self, native: str) -> str:
+        return f"{native[:-len(self.quote)]}_{self.quote}".lower()
+
+    def to_native(self, symbol: str) -> str:
+        return symbol.replace("_", "").upper()
+
+    def _intervals(self) -> Dict[str, int]:
+        intervals, cursor = {}, ""
+        while True:
+            result = self._get_json(f"{self.base_url}/v5/market/instruments-info",
+                                    {"category": "linear", "limit": 1000, "cursor": cursor})["result"]
+            for item in result["list"]:
+                # fundingInterval은 분 단위
+                intervals[item["symbol"]] = int(item.get("fundingInterval") or 480) * 60
+            cursor = result.get("nextPageCursor")
+            if not cursor:
+                return intervals
+
+    def fetch_funding(self, symbols: Optional[List[str]] = None,
+                      deadline: Optional[float] = None) -> List[FundingRecord]:
+        tickers = self._get_json(f"{self.base_url}/v5/market/tickers", {"category": "linear"})["result"]["list"]
+        intervals = self._intervals()
+        return [
+            FundingRecord(self.to_canonical(item["symbol"]), float(item["fundingRate"]) * 100,
+                          next_settle_ms=int(item.get("nextFundingTime") or 0),
+                          interval=intervals.get(item["symbol"], DEFAULT_INTERVAL))
+            for item in tickers
+            if item["symbol"].endswith(self.quote) and item.get("fundingRate")
+        ]
+
+
+class GateAdapter(ExchangeAdapter):
+    name = "gate"
+    base_url = "https://api.gateio.ws/api/v4"
+
+    def fetch_funding(self, symbols: Optional[List[str]] = None,
+                      deadline: Optional[float] = None) -> List[FundingRecord]:
+        contracts = self._get_json(f"{self.base_url}/futures/usdt/contracts")
+        return [
+            FundingRecord(self.to_canonical(item["name"]), float(item["funding_rate"]) * 100,
+                          next_settle_ms=int(item.get("funding_next_apply") or 0) * 1000,
+                          interval=int(item.get("funding_interval") or DEFAULT_INTERVAL))
+            for item in contracts
+            if not item.get("in_delisting")
+        ]
+
+
+ADAPTERS = {cls.name: cls for cls in (LBankAdapter, MexcAdapter, BinanceAdapter, BybitAdapter, GateAdapter)}
+
+
+class FundingCollector:
+    """여러 거래소 어댑터를 동시에 수집하고 최신 값 테이블을 모아서 제공"""
+
+    def __init__(self, adapters: Dict[str, ExchangeAdapter]):
+        self.adapters = adapters
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def create(cls, names: List[str] = None, **instances) -> "FundingCollector":
+        """Build adapters by name; pass ready instances (e.g. lbank=LBankAdapter(monitor)) to reuse them"""
+        adapters = {}
+        for name in names or ADAPTERS:
+            adapters[name] = instances.get(name) or ADAPTERS[name]()
+        return cls(adapters)
+
+    def load(self):
+        for adapter in self.adapters.values():
+            adapter.load()
+
+    def collect(self, exchanges=None, symbols: Optional[List[str]] = None,
+                deadline: Optional[float] = None) -> Dict[str, List[FundingRecord]]:
+        """Collect the requested exchanges concurrently; returns {exchange: records}"""
+        names = [name for name in self.adapters if exchanges is None or name in exchanges]
+        if not names:
+            return {}
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            futures = {name: executor.submit(self.adapters[name].collect, symbols, deadline) for name in names}
+            results = {name: future.result() for name, future in futures.items()}
+        counts = ", ".join(f"{name} {len(records)}" for name, records in results.items())
+        self.logger.info(f"📊 Collected {counts} in {time.time() - start:.1f}s")
+        return results
+
+    def latest(self) -> Dict[str, Dict[str, FundingRecord]]:
+        return {name: dict(adapter.latest) for name, adapter in self.adapters.items()}
@@ -1,146 +1,78 @@
-import requests
-import json
 import time
 from datetime import datetime
-from typing import Dict, List, Tuple
-import pandas as pd
-from dataclasses import dataclass
+from typing import Dict, List
 
-@dataclass
-class ExchangeData:
-    symbol: str
-    price: float
-    funding_rate: str  # 문자열로 변경 (퍼센트 표시 포함)
-    countdown: str     # 펀딩 주기 추가
-    timestamp: str
-
-class LBankPriceMonitor:
-    def __init__(self):
-        self.filename = "lbank_funding.json"  # 변경된 파일명
-
-    def get_funding_data(self) -> Dict:
-        """Get LBank funding rates and countdowns"""
-        try:
-            with open(self.filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get("funding_rates", [])
-        except Exception as e:
-            print(f"[LBank] Error reading funding data: {e}")
-        return []
-
-class MexcPriceMonitor:
-    def __init__(self):
-        self.filename = "mexc_prices.json"
-
-    def get_funding_data(self) -> Dict:
-        """Get MEXC funding rates"""
-        try:
-            with open(self.filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get("prices", [])
-        except Exception as e:
-            print(f"[MEXC] Error reading funding data: {e}")
-        return []
+from funding_matrix import FUNDING_FILES, compare_matrix, load_latest_rates
+from funding_record import FundingRecord
+from profiler import get_profiler
+from read_api import load_latest_rates_from_api
+from spread_index import SpreadIndex
+from write_behind import encode_csv, get_writer
 
 class ExchangeComparator:
-    def __init__(self):
-        self.lbank = LBankPriceMonitor()
-        self.mexc = MexcPriceMonitor()
+    def __init__(self, files: Dict[str, str] = None):
+        # 거래소별 어댑터가 저장한 파일을 읽음 (거래소 추가는 FUNDING_FILES 한 줄)
+        self.files = files or FUNDING_FILES
         self.comparison_file = "exchange_comparison.csv"
-
-    def collect_data(self) -> Tuple[List[ExchangeData], List[ExchangeData]]:
-        """Collect data from both exchanges"""
-        lbank_data = []
-        mexc_data = []
-
-        # Get LBank data
-        lbank_funding = self.lbank.get_funding_data()
-        for item in lbank_funding:
-            symbol = item.get("symbol", "")
-            if symbol.endswith("_usdt"):  # Only consider USDT pairs
-                lbank_data.append(ExchangeData(
-                    symbol=symbol,
-                    price=0.0,  # 가격 정보는 필요 없음
-                    funding_rate=item.get("funding_rate", "0%"),
-                    countdown=item.get("countdown", "N/A"),
-                    timestamp=item.get("timestamp", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                ))
-
-        # Get MEXC data
-        mexc_funding = self.mexc.get_funding_data()
-        for item in mexc_funding:
-            symbol = item.get("symbol", "")
-            if symbol.endswith("_usdt"):  # Only consider USDT pairs
-                # MEXC의 펀딩비를 퍼센트 형태로 변환
-                funding_rate = float(item.get("fundingRate", 0)) * 100
-                mexc_data.append(ExchangeData(
-                    symbol=symbol,
-                    price=0.0,  # 가격 정보는 필요 없음
-                    funding_rate=f"{funding_rate:.4f}%",
-                    countdown="8h",  # MEXC는 8시간 주기
-                    timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                ))
-
-        return lbank_data, mexc_data
+        self.index = SpreadIndex()
+        # 데몬이 떠 있으면 파일 대신 로컬 API에서 읽음 (ETag로 바뀌지 않은 응답은 재파싱하지 않음)
+        self.use_api = files is None
+        self.etags = {}
+
+    def build_rows(self, latest: Dict[str, Dict[str, FundingRecord]], results: List[Dict]) -> List[Dict]:
+        """One CSV row per symbol: max/min venue, spread, then each exchange's rate and countdown"""
+        exchanges = sorted(latest)
+        rows = []
+        for result in results:
+            symbol = result['symbol']
+            row = {
+                'symbol': symbol,
+                'max_exchange': result['max_exchange'],
+                'max_rate': f"{result['max_rate']:.4f}%",
+                'min_exchange': result['min_exchange'],
+                'min_rate': f"{result['min_rate']:.4f}%",
+                'funding_rate_diff': round(result['spread'], 6)
+            }
+            for exchange in exchanges:
+                record = latest[exchange].get(symbol)
+                rate = result['rates'].get(exchange)
+                row[f'funding_rate_{exchange}'] = f"{rate:.4f}%" if rate is not None else "N/A"
+                row[f'countdown_{exchange}'] = record.countdown() if record else "N/A"
+            rows.append(row)
+        return rows
 
     def compare_exchanges(self):
-        """Compare funding rates and periods between exchanges"""
-        lbank_data, mexc_data = self.collect_data()
+        """Compare funding rates and periods across every exchange"""
+        latest = (load_latest_rates_from_api(self.etags) if self.use_api else None) or load_latest_rates(self.files)
+        # 두 거래소 이상에 상장된 심볼 전체 (차이가 큰 순서대로)
+        self.index.rebuild(compare_matrix(latest, threshold=0.0))
+        rows = self.build_rows(latest, self.index.ranked())
 
-        # Create DataFrames
-        lbank_df = pd.DataFrame([vars(d) for d in lbank_data])
-        mexc_df = pd.DataFrame([vars(d) for d in mexc_data])
-
-        # Merge DataFrames on symbol
-        comparison_df = pd.merge(
-            lbank_df, 
-            mexc_df, 
-            on='symbol', 
-            suffixes=('_lbank', '_mexc'),
-            how='outer'  # 양쪽 데이터 모두 포함
-        )
-
-        # 펀딩비 비교
-        comparison_df['funding_rate_diff'] = comparison_df.apply(
-            lambda x: self._calculate_funding_rate_diff(x['funding_rate_lbank'], x['funding_rate_mexc']),
-            axis=1
-        )
-
-        # 정렬 (펀딩비 차이가 큰 순서대로)
-        comparison_df = comparison_df.sort_values('funding_rate_diff', ascending=False)
-
-        # Save to CSV
-        comparison_df.to_csv(self.comparison_file, index=False)
-        print(f"Comparison data saved to {self.comparison_file}")
+        # Save to CSV (백그라운드 쓰기, 60초 주기 안에 여러 번 요청되면 마지막 것만 기록)
+        fieldnames = list(rows[0]) if rows else ['symbol', 'funding_rate_diff']
+        get_writer().submit(self.comparison_file, rows, lambda rows: encode_csv(rows, fieldnames))
+        print(f"Comparison data queued for {self.comparison_file}")
 
         # Print summary
-        print("\nExchange Comparison Summary:")
-        print(comparison_df[['symbol', 'funding_rate_lbank', 'funding_rate_mexc', 
-                           'funding_rate_diff', 'countdown_lbank', 'countdown_mexc']].to_string())
-
-    def _calculate_funding_rate_diff(self, lbank_rate: str, mexc_rate: str) -> float:
-        """Calculate the difference between funding rates"""
-        try:
-            # 퍼센트 기호 제거하고 숫자로 변환
-            lbank_value = float(lbank_rate.strip('%+')) if lbank_rate != "N/A" else 0
-            mexc_value = float(mexc_rate.strip('%+')) if mexc_rate != "N/A" else 0
-            return abs(lbank_value - mexc_value)
-        except:
-            return 0.0
+        print(f"\nExchange Comparison Summary ({', '.join(sorted(latest))}):")
+        for row in rows:
+            print(f"{row['symbol']:<20} {row['max_exchange']:>8} {row['max_rate']:>10} "
+                  f"{row['min_exchange']:>8} {row['min_rate']:>10}  diff {row['funding_rate_diff']:.4f}")
 
     def monitor_loop(self):
         """Continuously monitor and compare exchanges"""
         print("Starting exchange comparison monitoring...")
         print("Press Ctrl+C to stop...")
-        
+
         while True:
             try:
                 current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 print(f"\n[{current_time}] Collecting and comparing data...")
-                
-                self.compare_exchanges()
+
+                with get_profiler().cycle("exchange_comparison"):
+                    self.compare_exchanges()
                 time.sleep(60)  # 1분 간격으로 업데이트
-                
+
             except KeyboardInterrupt:
                 print("\nMonitoring stopped by user")
                 break
@@ -150,7 +82,8 @@ class ExchangeComparator:
 
 def main():
     comparator = ExchangeComparator()
+    get_profiler().install_signal()
     comparator.monitor_loop()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,111 @@
+import logging
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from funding_record import FundingRecord, read_funding_file
+
+# 거래소별 최신 펀딩 레이트 파일 (어댑터가 수집 후 저장, 비교는 네트워크 없이 파일만 읽음)
+FUNDING_FILES = {
+    "lbank": "lbank_funding.json",
+    "mexc": "mexc_funding.json",
+    "binance": "binance_funding.json",
+    "bybit": "bybit_funding.json",
+    "gate": "gate_funding.json",
+}
+
+# 퍼센트 단위 최소 차이 (기존 LBank/MEXC 비교와 같은 값)
+DEFAULT_THRESHOLD = 0.001
+
+logger = logging.getLogger(__name__)
+
+
+def load_latest_rates(files: Dict[str, str] = None) -> Dict[str, Dict[str, FundingRecord]]:
+    """Read every exchange's funding file into {exchange: {symbol: record}}"""
+    latest = {}
+    for exchange, path in (files or FUNDING_FILES).items():
+        try:
+            batch = read_funding_file(path)
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            logger.error(f"Error reading {path}: {e}")
+            continue
+        latest[exchange] = {record.symbol: record for record in batch}
+    return latest
+
+
+def build_matrix(latest: Dict[str, Dict[str, FundingRecord]]) -> Tuple[List[str], List[str], np.ndarray]:
+    """Symbol x exchange matrix of funding rates (NaN where a venue does not list the symbol)"""
+    exchanges = sorted(latest)
+    symbols = sorted(set().union(*(latest[name].keys() for name in exchanges))) if exchanges else []
+    row = {symbol: i for i, symbol in enumerate(symbols)}
+
+    matrix = np.full((len(symbols), len(exchanges)), np.nan)
+    for j, exchange in enumerate(exchanges):
+        for symbol, record in latest[exchange].items():
+            matrix[row[symbol], j] = record.rate
+    return symbols, exchanges, matrix
+
+
+def compare_matrix(latest: Dict[str, Dict[str, FundingRecord]], threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Max/min venue and spread for every symbol listed on two or more exchanges, widest first"""
+    symbols, exchanges, matrix = build_matrix(latest)
+    if not symbols:
+        return []
+
+    # 모든 심볼을 한 번에 계산 (거래소 쌍별 반복 없음)
+    listed = ~np.isnan(matrix)
+    rows = np.flatnonzero(listed.sum(axis=1) >= 2)
+    sub = matrix[rows]
+    hi_idx = np.where(listed[rows], sub, -np.inf).argmax(axis=1)
+    # 최저값은 뒤에서부터 찾아서 모두 같은 값일 때 최고/최저가 다른 거래소가 되도록
+    lo_idx = len(exchanges) - 1 - np.where(listed[rows], sub, np.inf)[:, ::-1].argmin(axis=1)
+    picked = np.arange(len(rows))
+    hi, lo = sub[picked, hi_idx], sub[picked, lo_idx]
+    spread = hi - lo
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    results = []
+    for k in np.argsort(-spread, kind="stable"):
+        if spread[k] < threshold:
+            break
+        i = rows[k]
+        results.append({
+            'symbol': symbols[i],
+            'max_exchange': exchanges[hi_idx[k]],
+            'max_rate': float(hi[k]),
+            'min_exchange': exchanges[lo_idx[k]],
+            'min_rate': float(lo[k]),
+            'spread': float(spread[k]),
+            'rates': {exchanges[j]: float(matrix[i, j]) for j in np.flatnonzero(listed[i])},
+            'timestamp': timestamp
+        })
+    return results
+
+
+def symbol_spread(latest: Dict[str, Dict[str, FundingRecord]], symbol: str) -> Optional[Dict]:
+    """Same result as compare_matrix for a single symbol (per-symbol streaming updates)"""
+    rates = {}
+    for exchange in sorted(latest):
+        record = latest[exchange].get(symbol)
+        rate = record.rate if record else float("nan")
+        if not math.isnan(rate):
+            rates[exchange] = rate
+    if len(rates) < 2:
+        return None
+
+    max_exchange = max(rates, key=rates.get)
+    min_exchange = min(reversed(list(rates)), key=rates.get)
+    return {
+        'symbol': symbol,
+        'max_exchange': max_exchange,
+        'max_rate': rates[max_exchange],
+        'min_exchange': min_exchange,
+        'min_rate': rates[min_exchange],
+        'spread': rates[max_exchange] - rates[min_exchange],
+        'rates': rates,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
@@ -0,0 +1,206 @@
+import json
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from write_behind import encode_json, get_writer, write_atomic
+
+DEFAULT_INTERVAL = 8 * 3600
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 심볼 문자열은 한 번만 저장하고 레코드는 정수 id만 가짐
+_symbols: List[str] = []
+_symbol_ids: Dict[str, int] = {}
+_symbols_lock = threading.Lock()
+
+
+def symbol_id(name: str) -> int:
+    sid = _symbol_ids.get(name)
+    if sid is None:
+        with _symbols_lock:
+            sid = _symbol_ids.get(name)
+            if sid is None:
+                sid = _symbol_ids[name] = len(_symbols)
+                _symbols.append(name)
+    return sid
+
+
+def symbol_name(sid: int) -> str:
+    return _symbols[sid]
+
+
+def parse_rate(value) -> float:
+    """Funding rate in percent from a float or page text like '+0.0019%' (NaN if unparseable)"""
+    if isinstance(value, str):
+        value = value.replace('%', '').replace('+', '').strip()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def parse_countdown(countdown: str) -> Optional[int]:
+    """Convert a countdown like '/05:17:42' or '05:17' into seconds"""
+    if not countdown:
+        return None
+    text = countdown.strip().lstrip('/').strip()
+    parts = text.split(':')
+    try:
+        values = [int(p) for p in parts]
+    except ValueError:
+        return None
+    if len(values) == 3:
+        h, m, s = values
+    elif len(values) == 2:
+        h, m, s = 0, values[0], values[1]
+    else:
+        return None
+    return h * 3600 + m * 60 + s
+
+
+def format_countdown(seconds: int) -> str:
+    seconds = max(0, int(seconds))
+    return f"/{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def format_timestamp(ts_ns: int) -> str:
+    return datetime.fromtimestamp(ts_ns / 1e9).strftime(TIMESTAMP_FORMAT)
+
+
+def parse_timestamp_ns(value) -> int:
+    if isinstance(value, (int, float)):
+        return int(value * 1e9) if value < 1e12 else int(value)
+    try:
+        return int(datetime.strptime(value, TIMESTAMP_FORMAT).timestamp() * 1e9)
+    except (TypeError, ValueError):
+        return time.time_ns()
+
+
+class FundingRecord:
+    """펀딩 레이트 1건 (퍼센트 float, epoch ns, 심볼 id, 다음 정산 epoch ms); 문자열은 출력할 때만 만듦"""
+
+    __slots__ = ("symbol_id", "rate", "ts_ns", "next_settle_ms", "interval")
+
+    def __init__(self, symbol, rate: float, ts_ns: Optional[int] = None,
+                 next_settle_ms: int = 0, interval: int = DEFAULT_INTERVAL):
+        self.symbol_id = symbol if isinstance(symbol, int) else symbol_id(symbol)
+        self.rate = float(rate)
+        self.ts_ns = ts_ns or time.time_ns()
+        self.next_settle_ms = int(next_settle_ms or 0)  # 0 = 알 수 없음
+        self.interval = int(interval or DEFAULT_INTERVAL)
+
+    @classmethod
+    def from_countdown(cls, symbol, rate: float, countdown: str,
+                       ts_ns: Optional[int] = None, interval: int = DEFAULT_INTERVAL) -> "FundingRecord":
+        """Record for a page that shows time-to-settlement rather than a settlement time"""
+        ts_ns = ts_ns or time.time_ns()
+        remaining = parse_countdown(countdown)
+        next_settle_ms = ts_ns // 1_000_000 + remaining * 1000 if remaining is not None else 0
+        return cls(symbol, rate, ts_ns, next_settle_ms, interval)
+
+    @property
+    def symbol(self) -> str:
+        return _symbols[self.symbol_id]
+
+    def __reduce__(self):
+        # 심볼 id는 프로세스마다 다르므로 이름으로 전달 (파싱 프로세스 풀 -> 메인 프로세스)
+        return (FundingRecord, (self.symbol, self.rate, self.ts_ns, self.next_settle_ms, self.interval))
+
+    def countdown(self, now_ns: Optional[int] = None) -> str:
+        """'/HH:MM:SS' until settlement as of now (or a given time); interval if unknown"""
+        if not self.next_settle_ms:
+            return f"{self.interval // 3600}h"
+        now_ns = time.time_ns() if now_ns is None else now_ns
+        return format_countdown(self.next_settle_ms / 1000 - now_ns / 1e9)
+
+    def to_dict(self) -> Dict:
+        """JSON shape of the funding files (countdown as seen at collection time)"""
+        return {
+            "symbol": self.symbol,
+            "funding_rate": round(self.rate, 6),
+            "countdown": self.countdown(self.ts_ns),
+            "next_settle_time": self.next_settle_ms,
+            "funding_interval": self.interval,
+            "timestamp": format_timestamp(self.ts_ns)
+        }
+
+    @classmethod
+    def from_dict(cls, item: Dict) -> "FundingRecord":
+        """Read a funding file entry (also older files with '%' strings and countdown only)"""
+        ts_ns = parse_timestamp_ns(item.get("timestamp"))
+        interval = item.get("funding_interval") or DEFAULT_INTERVAL
+        rate = parse_rate(item.get("funding_rate"))
+        if item.get("next_settle_time"):
+            return cls(item["symbol"], rate, ts_ns, item["next_settle_time"], interval)
+        return cls.from_countdown(item["symbol"], rate, item.get("countdown"), ts_ns, interval)
+
+    def __repr__(self) -> str:
+        return f"FundingRecord({self.symbol!r}, {self.rate}, ts_ns={self.ts_ns}, next_settle_ms={self.next_settle_ms})"
+
+
+class FundingBatch:
+    """FundingRecord 여러 건을 컬럼형 배열로 보관 (대량 캐시/저장용)"""
+
+    def __init__(self, records: Iterable[FundingRecord] = ()):
+        self.symbol_ids = array('i')
+        self.rates = array('d')
+        self.ts_ns = array('q')
+        self.next_settle_ms = array('q')
+        self.intervals = array('i')
+        for record in records:
+            self.append(record)
+
+    def append(self, record: FundingRecord):
+        self.symbol_ids.append(record.symbol_id)
+        self.rates.append(record.rate)
+        self.ts_ns.append(record.ts_ns)
+        self.next_settle_ms.append(record.next_settle_ms)
+        self.intervals.append(record.interval)
+
+    def __len__(self) -> int:
+        return len(self.symbol_ids)
+
+    def __getitem__(self, i: int) -> FundingRecord:
+        return FundingRecord(self.symbol_ids[i], self.rates[i], self.ts_ns[i],
+                             self.next_settle_ms[i], self.intervals[i])
+
+    def __iter__(self) -> Iterator[FundingRecord]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_dicts(self) -> List[Dict]:
+        return [record.to_dict() for record in self]
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[Dict]) -> "FundingBatch":
+        return cls(FundingRecord.from_dict(item) for item in items if item.get("symbol"))
+
+
+def encode_funding_file(records: Iterable, pretty: bool = False) -> bytes:
+    """Render records (FundingRecord or already formatted dicts) in the shared file shape"""
+    return encode_json({
+        "timestamp": datetime.now().strftime(TIMESTAMP_FORMAT),
+        "funding_rates": [r.to_dict() if isinstance(r, FundingRecord) else r for r in records]
+    }, pretty)
+
+
+def write_funding_file(path: str, records: Iterable, pretty: bool = False) -> int:
+    """Write a funding file synchronously (atomic); the daemon uses submit_funding_file"""
+    records = list(records)
+    write_atomic(path, encode_funding_file(records, pretty))
+    return len(records)
+
+
+def submit_funding_file(path: str, records: Iterable) -> int:
+    """Hand a snapshot to the write-behind thread and return immediately"""
+    records = list(records)  # 레코드는 불변이므로 리스트 복사만으로 스냅샷
+    get_writer().submit(path, records, encode_funding_file)
+    return len(records)
+
+
+def read_funding_file(path: str) -> FundingBatch:
+    """Read a funding file into a batch (raises FileNotFoundError if missing)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return FundingBatch.from_dicts(json.load(f).get("funding_rates", []))
@@ -2,23 +2,197 @@ import requests
 import json
 import time
 from datetime import datetime
-from typing import Dict, Optional, List
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.firefox.service import Service
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, List, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 import threading
 import logging
 import gc
+import math
 import os
+import queue
+import sys
 import psutil
+from cf_session import CloudflareSession, is_cloudflare_challenge
+from circuit_breaker import CircuitBreaker, DeferredRetryQueue, breaker_for
+from pipeline import CollectionPipeline
+from priority import SymbolPrioritizer
+from proxy_pool import Proxy, ProxyPool, firefox_proxy_preferences
+from profiler import get_profiler
+from browser_profiles import BrowserProfileStore
+from symbol_health import SymbolHealthTracker
+from blacklist_store import BlacklistMatcher, BlacklistWatcher
+from log_setup import SAMPLED, setup_logging, with_symbol_context
+from scraper_config import ScraperConfig
+from tab_harvest import WAIT, TabHarvester
+from contextlib import contextmanager
+from funding_record import FundingRecord, parse_rate, read_funding_file, submit_funding_file, write_funding_file
+
+logger = logging.getLogger(__name__)
+
+# 페이지 안에서 펀딩 레이트/카운트다운만 찾아 작은 객체로 반환 (parse_funding_html과 같은 순서의 대체 경로)
+_FIND_FUNDING_JS = """
+const text = el => (el && el.textContent || '').trim();
+const isRate = t => t.includes('%') && /\d/.test(t);
+function extract() {
+    const spans = Array.from(document.getElementsByTagName('span'));
+    const nextSpan = el => spans[spans.indexOf(el) + 1] || null;
+    for (const span of document.querySelectorAll('span.warning_color')) {
+        if (isRate(text(span))) {
+            const next = nextSpan(span);
+            return {funding_rate: text(span), countdown: text(next).includes(':') ? text(next) : 'Not found',
+                    method: 'warning_color'};
+        }
+    }
+    for (const div of document.querySelectorAll('div.funding-rate')) {
+        const span = div.querySelector('span.warning_color');
+        if (span && isRate(text(span))) {
+            const countdown = div.querySelector('span.countdown') || nextSpan(span);
+            return {funding_rate: text(span), countdown: text(countdown) || 'Not found', method: 'funding-rate'};
+        }
+    }
+    for (const span of spans) {
+        const t = text(span);
+        if (isRate(t) && (t.includes('+') || t.includes('-'))) {
+            const next = nextSpan(span);
+            return {funding_rate: t, countdown: text(next).includes(':') ? text(next) : 'Not found',
+                    method: 'signed-percent'};
+        }
+    }
+    return null;
+}
+"""
+
+# arguments[0]: 값이 나타날 때까지 페이지 안에서 기다릴 최대 시간 (ms)
+EXTRACT_FUNDING_JS = """
+const timeoutMs = arguments[0];
+const done = arguments[arguments.length - 1];
+""" + _FIND_FUNDING_JS + """
+const start = Date.now();
+(function poll() {
+    const found = extract();
+    if (found || Date.now() - start >= timeoutMs) {
+        done(found);
+    } else {
+        setTimeout(poll, 200);
+    }
+})();
+"""
+
+# 멀티탭 모드: 기다리지 않고 지금 상태만 반환 (제목은 challenge 판별용)
+PROBE_FUNDING_JS = _FIND_FUNDING_JS + """
+return {title: document.title, found: extract()};
+"""
+
+
+def parse_funding_extract(symbol: str, data: Optional[Dict]) -> Optional[FundingRecord]:
+    """Build a record from the object EXTRACT_FUNDING_JS returns"""
+    if not data:
+        return None
+    rate = parse_rate(data.get('funding_rate'))
+    if math.isnan(rate):
+        return None
+    return FundingRecord.from_countdown(symbol, rate, data.get('countdown'))
+
+
+def parse_funding_json(symbol: str, payload) -> Optional[FundingRecord]:
+    """Extract funding rate from the futures page's backing JSON payload"""
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "fundingRate" in node:
+                # API는 소수(0.0001)로 제공하므로 페이지와 같은 퍼센트 단위로 변환
+                next_time = node.get("nextFundingTime") or node.get("nextFeeTime")
+                return FundingRecord(symbol, float(node["fundingRate"]) * 100,
+                                     next_settle_ms=int(next_time or 0))
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+
+def parse_funding_html(symbol: str, html: str) -> Optional[FundingRecord]:
+    """Extract funding rate and countdown from a rendered LBank futures page"""
+    from bs4 import BeautifulSoup  # 파싱이 필요할 때만 로드 (CLI 시작 속도)
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    try:
+        # 디버깅: 페이지 제목 확인
+        title = soup.find('title')
+        logger.info(f"Page title: {title.text if title else 'No title found'}", extra=SAMPLED)
+
+        # funding rate와 countdown 찾기 (최적화된 검색)
+        logger.info("Searching for funding rate and countdown in HTML...", extra=SAMPLED)
+
+        # 1. warning_color span에서 직접 검색 (가장 빠른 방법)
+        funding_spans = soup.find_all('span', class_='warning_color')
+        logger.info(f"Found {len(funding_spans)} spans with warning_color class", extra=SAMPLED)
+
+        for span in funding_spans:
+            rate = parse_rate(span.text) if '%' in span.text else float("nan")
+            if not math.isnan(rate):
+                funding_rate = span.text.strip()
+                logger.info(f"Found funding rate: {funding_rate}", extra=SAMPLED)
+
+                # countdown 찾기
+                countdown = "Not found"
+                next_span = span.find_next('span')
+                if next_span and ':' in next_span.text:
+                    countdown = next_span.text.strip()
+
+                return FundingRecord.from_countdown(symbol, rate, countdown)
+
+        # 2. funding-rate div에서 검색 (백업 방법)
+        funding_divs = soup.find_all('div', class_='funding-rate')
+        logger.info(f"Found {len(funding_divs)} divs with funding-rate class", extra=SAMPLED)
+
+        for div in funding_divs:
+            funding_rate_span = div.find('span', class_='warning_color')
+            has_rate = funding_rate_span and '%' in funding_rate_span.text
+            rate = parse_rate(funding_rate_span.text) if has_rate else float("nan")
+            if not math.isnan(rate):
+                funding_rate = funding_rate_span.text.strip()
+                logger.info(f"Found funding rate: {funding_rate}", extra=SAMPLED)
+
+                countdown_span = div.find('span', class_='countdown')
+                if countdown_span:
+                    countdown = countdown_span.text.strip()
+                else:
+                    next_span = funding_rate_span.find_next('span')
+                    countdown = next_span.text.strip() if next_span else "Not found"
+
+                return FundingRecord.from_countdown(symbol, rate, countdown)
+
+        # 3. 모든 span에서 %가 포함된 텍스트 찾기 (최후의 방법)
+        all_spans = soup.find_all('span')
+        for span in all_spans:
+            if span.text and '%' in span.text and any(char.isdigit() for char in span.text):
+                text = span.text.strip()
+                # 펀딩 레이트 패턴 확인 (예: +0.0019%, -0.0019%)
+                if ('+' in text or '-' in text) and '%' in text:
+                    rate = parse_rate(text)
+                    if math.isnan(rate):  # 숫자가 아닌 텍스트
+                        continue
+                    logger.info(f"Found funding rate with alternative method: {text}", extra=SAMPLED)
+
+                    # countdown 찾기
+                    countdown = "Not found"
+                    next_span = span.find_next('span')
+                    if next_span and ':' in next_span.text:
+                        countdown = next_span.text.strip()
+
+                    return FundingRecord.from_countdown(symbol, rate, countdown)
+
+        return None
+    finally:
+        # 메모리 정리
+        soup.decompose()
+
 
 class LBankPriceMonitor:
-    def __init__(self):
+    def __init__(self, config: Optional[ScraperConfig] = None):
+        # 튜닝 값은 scraper_config.json / 환경변수에서 읽음 (autotune.py로 생성 가능)
+        self.config = config or ScraperConfig.load()
         self.base_url = "https://api.lbank.com"
         self.interval = 10  # 10초 간격
         self.ticker_file = "lbank_tickers.json"
@@ -28,22 +202,70 @@ class LBankPriceMonitor:
         self.driver = None
         self.driver_lock = threading.Lock()
         
-        # 로깅 설정
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler()  # 콘솔 출력만 사용
-            ]
-        )
+        # 수집 방식: "browser" = 심볼마다 브라우저, "hybrid" = clearance 공유 HTTP + 브라우저 폴백
+        self.fetch_mode = self.config.fetch_mode
+        self.futures_url_template = self.config.futures_url_template
+        self.funding_api_template = self.config.funding_api_template  # 선물 페이지의 백엔드 JSON 엔드포인트 (설정 시 HTML 대신 사용)
+        self.http_workers = self.config.http_workers
+        self.cf_sessions: Dict[Optional[str], CloudflareSession] = {}  # 프록시별 clearance 세션 (None = 직접 연결)
+        
+        # 워커 슬롯별 프로필/쿠키를 디스크에 유지해 Cloudflare 대기를 건너뜀
+        self.persist_sessions = self.config.persist_sessions
+        self.browser_workers = self.config.browser_workers
+        self.profile_store = BrowserProfileStore(slots=self.browser_workers)
+        self.slot_drivers = {}  # 슬롯별로 살아있는 드라이버 (페이지 간 재사용)
+        
+        # egress 프록시 풀: 드라이버 슬롯마다 고정 배정, 나쁜 프록시는 자동 제외
+        self.proxy_pool = ProxyPool.from_config(self.config)
+        self.slot_proxies: Dict[int, Optional[str]] = {}  # 슬롯 드라이버가 띄워진 프록시
+        self._local = threading.local()  # 스레드별 현재 프록시 임대 상태
+        
+        # 데몬 실행 시 사이클 간 유지되는 상태
+        self._file_cache = {}  # path -> (mtime, data): 파일이 바뀔 때만 다시 읽음
+        self.latest_rates = {}  # symbol -> 최신 펀딩 레이트 (부분 수집 결과를 병합)
+        
+        # 계속 실패하는 심볼 자동 격리
+        self.health = SymbolHealthTracker()
+        
+        # 블랙리스트 핫 리로드: 파일이 바뀌면 대기 중인 작업에서 즉시 제외
+        self.blacklist = BlacklistMatcher()
+        self.blacklist_watcher = None
+        self.pending_futures = {}  # future -> symbol (아직 시작 안 된 작업 취소용)
+        self.pending_lock = threading.Lock()
+        self.pipeline = None  # pipeline 설정 시 첫 배치에서 생성 (파싱 프로세스 풀은 사이클 동안 유지)
+        
+        # 추출 방식별 전송 바이트/지연 (script = 페이지 안 JS, page_source = 전체 DOM 전송 후 파싱)
+        self.extraction = self.config.extraction
+        self.extract_stats = {mode: {"pages": 0, "bytes": 0, "seconds": 0.0} for mode in ("script", "page_source")}
+        self.stats_lock = threading.Lock()
+        
+        # 실패한 심볼은 슬롯을 잡고 기다리지 않고 메인 패스 이후에 다시 시도
+        self.retry_queue = DeferredRetryQueue(self.config.retry_wait, self.config.retry_max_wait,
+                                              self.config.max_retries)
+        
+        # 사이클 안 수집 순서 (중요한 심볼 먼저) 및 마감으로 다음 사이클로 넘긴 심볼
+        self.prioritizer = SymbolPrioritizer()
+        self.deferred_symbols: List[str] = []
+        
+        # 로깅은 log_setup.setup_logging()에서 한 번만 설정
         self.logger = logging.getLogger(__name__)
 
-    def setup_selenium(self):
+    def setup_selenium(self, profile_dir: Optional[str] = None, proxy: Optional[Proxy] = None):
         """Setup Selenium WebDriver with Cloudflare bypass"""
+        # selenium은 브라우저를 띄울 때만 로드 (CLI 시작 속도)
+        from selenium import webdriver
+        from selenium.webdriver.firefox.options import Options
+        from selenium.webdriver.firefox.service import Service
+        
         try:
             options = Options()
             options.add_argument('--headless')
             
+            # 영구 프로필 사용 (쿠키/clearance가 프로필에 남음)
+            if profile_dir:
+                options.add_argument('-profile')
+                options.add_argument(os.path.abspath(profile_dir))
+            
             # Cloudflare 우회를 위한 User-Agent 설정
             options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
             
@@ -54,6 +276,16 @@ class LBankPriceMonitor:
             # 창 크기 설정
             options.add_argument('--window-size=1920,1080')
             
+            # egress 프록시 (드라이버 수명 동안 고정)
+            if proxy:
+                for name, value in firefox_proxy_preferences(proxy).items():
+                    options.set_preference(name, value)
+            
+            # 멀티탭 모드: 백그라운드 탭의 타이머/렌더링이 늦춰지지 않도록
+            if self.config.tabs_per_browser > 1:
+                options.set_preference("dom.min_background_timeout_value", 4)
+                options.set_preference("dom.timeout.enable_budget_timer_throttling", False)
+            
             # 메모리 최적화 설정
             options.set_preference("browser.cache.disk.enable", False)
             options.set_preference("browser.cache.memory.enable", False)
@@ -80,179 +312,337 @@ class LBankPriceMonitor:
         except Exception as e:
             self.logger.warning(f"Error cleaning up driver: {e}")
 
-    def read_blacklist(self) -> set:
-        """Read blacklist from JSON file"""
+    @contextmanager
+    def browser_session(self):
+        """Yield a driver bound to a persisted profile slot, reused across pages"""
+        if not self.persist_sessions:
+            with self.proxy_pool.lease(timeout=self.config.breaker_max_cooldown) as (proxy, state):
+                self._local.proxy, self._local.proxy_state = proxy, state
+                driver = self.setup_selenium(proxy=proxy)
+                try:
+                    yield driver
+                    state["ok"] = True
+                finally:
+                    self._local.proxy = self._local.proxy_state = None
+                    self.cleanup_driver(driver)
+            return
+
+        with self.profile_store.acquire() as slot, \
+                self.proxy_pool.lease(slot, timeout=self.config.breaker_max_cooldown) as (proxy, state):
+            with self.driver_lock:
+                driver = self.slot_drivers.pop(slot, None)
+            proxy_url = proxy.url if proxy else None
+            if driver is not None and self.slot_proxies.get(slot) != proxy_url:
+                # 이전 프록시가 제외되어 다른 프록시를 배정받음: 드라이버를 새로 띄움
+                self.cleanup_driver(driver)
+                driver = None
+            if driver is None:
+                driver = self.setup_selenium(self.profile_store.profile_dir(slot), proxy)
+                self.slot_proxies[slot] = proxy_url
+
+            healthy = False
+            self._local.proxy, self._local.proxy_state = proxy, state
+            try:
+                yield driver
+                healthy = True
+                state["ok"] = True
+            finally:
+                self._local.proxy = self._local.proxy_state = None
+                if healthy:
+                    try:
+                        user_agent = driver.execute_script("return navigator.userAgent")
+                        self.profile_store.save_cookies(slot, driver.get_cookies(), user_agent)
+                        with self.driver_lock:
+                            self.slot_drivers[slot] = driver
+                    except Exception as e:
+                        self.logger.warning(f"Error saving session for slot {slot}: {e}")
+                        self.cleanup_driver(driver)
+                else:
+                    # 오류가 난 드라이버는 버리고 다음 요청에서 새로 생성
+                    self.cleanup_driver(driver)
+
+    def note_challenge(self, challenged: bool):
+        """Count a challenge for the session stats and against the current egress proxy"""
+        self.profile_store.record_challenge(challenged)
+        state = getattr(self._local, "proxy_state", None)
+        if state is not None:
+            state["challenged"] = state["challenged"] or challenged
+
+    def note_tab_page(self, ok: bool, challenged: bool, seconds: float):
+        """Score one tab's page against the egress proxy on its own load time
+
+        A tab browser holds one lease for the whole harvest, so the lease duration is not a page latency.
+        """
+        proxy = getattr(self._local, "proxy", None)
+        state = getattr(self._local, "proxy_state", None)
+        if proxy is None or state is None:
+            return
+        state["pages"] += 1  # 임대 종료 시에는 슬롯만 반환
+        self.proxy_pool.record(proxy, ok, seconds, challenged)
+
+    def close_browser_sessions(self):
+        """Quit drivers kept alive between pages and persist challenge counters"""
+        with self.driver_lock:
+            drivers = list(self.slot_drivers.values())
+            self.slot_drivers.clear()
+        for driver in drivers:
+            self.cleanup_driver(driver)
+        if self.persist_sessions:
+            self.profile_store.save_stats()
+            self.logger.info(f"🍪 Session reuse: {self.profile_store.summary()}")
+        if self.proxy_pool.enabled:
+            self.logger.info(f"🌍 Proxies: {self.proxy_pool.summary()}")
+
+    def _read_json_cached(self, path: str):
+        """Read a JSON file, reusing the parsed result while its mtime is unchanged"""
+        mtime = os.path.getmtime(path)
+        cached = self._file_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1], False
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._file_cache[path] = (mtime, data)
+        return data, True
+
+    def read_blacklist(self) -> BlacklistMatcher:
+        """Read blacklist (exact symbols plus glob/regex rules) from JSON file"""
         try:
-            with open(self.blacklist_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                blacklist = set(data.get('blacklist', []))
-                self.logger.info(f"📋 Loaded {len(blacklist)} blacklisted tickers")
-                return blacklist
-        except FileNotFoundError:
-            self.logger.warning(f"Blacklist file {self.blacklist_file} not found, using empty blacklist")
-            return set()
+            if self.blacklist_watcher is None:
+                self.blacklist_watcher = BlacklistWatcher(self.blacklist_file, on_change=self.apply_blacklist)
+            else:
+                self.blacklist_watcher.reload()
+            return self.blacklist
         except Exception as e:
             self.logger.error(f"Error reading blacklist: {e}")
-            return set()
+            return self.blacklist
+
+    def apply_blacklist(self, matcher: BlacklistMatcher):
+        """Swap in a reloaded blacklist and cancel queued work for newly listed symbols"""
+        self.blacklist = matcher
+        with self.pending_lock:
+            pending = list(self.pending_futures.items())
+        dropped = [symbol for future, symbol in pending if symbol in matcher and future.cancel()]
+        if dropped:
+            self.logger.info(f"🚫 Dropped {len(dropped)} newly blacklisted symbols from queue: {dropped}")
 
     def read_tickers_from_file(self) -> Optional[List[Dict]]:
         """Read ticker information from JSON file"""
         try:
-            with open(self.ticker_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('tickers', [])
+            data, _ = self._read_json_cached(self.ticker_file)
+            return data.get('tickers', [])
         except Exception as e:
             print(f"Error reading tickers from file: {e}")
             return None
 
-    def get_funding_rate_from_web(self, symbol: str, max_retries: int = 2) -> dict:
-        """Get funding rate from LBank website using Selenium and BeautifulSoup with optimized retry logic and memory management"""
-        for attempt in range(max_retries):
-            driver = None
-            soup = None
-            html = None
+    def load_latest_rates(self):
+        """Warm the in-memory state from the last saved funding file"""
+        try:
+            self.latest_rates = {record.symbol: record for record in read_funding_file(self.funding_file)}
+            self.logger.info(f"Loaded {len(self.latest_rates)} previous funding rates")
+        except FileNotFoundError:
+            self.latest_rates = {}
+        except Exception as e:
+            self.logger.warning(f"Error loading previous funding rates: {e}")
+
+    def futures_url(self, symbol: str) -> str:
+        """Build the futures page URL for a symbol (예: btc_usdt -> btcusdt)"""
+        return self.futures_url_template.format(symbol=symbol.replace('_', '').lower())
+
+    def get_cf_session(self, proxy: Optional[Proxy] = None) -> CloudflareSession:
+        """Lazily create the Cloudflare clearance session for an egress proxy (clearance is tied to the IP)"""
+        key = proxy.url if proxy else None
+        with self.driver_lock:
+            session = self.cf_sessions.get(key)
+            if session is None:
+                session = self.cf_sessions[key] = CloudflareSession(
+                    lambda: self.setup_selenium(proxy=proxy), base_url=self.config.site_url,
+                    pool_size=self.http_workers, proxy=key
+                )
+                if self.persist_sessions and proxy is None:
+                    clearance = self.profile_store.best_clearance()
+                    if clearance:
+                        session.seed(*clearance)
+            return session
+
+    @with_symbol_context
+    def get_funding_rate_via_http(self, symbol: str) -> Optional[FundingRecord]:
+        """Get funding rate over plain HTTP reusing the browser's Cloudflare clearance"""
+        if symbol in self.blacklist:
+            return None
+        try:
+            if self.funding_api_template:
+                url = self.funding_api_template.format(symbol=symbol.replace('_', '').upper())
+            else:
+                url = self.futures_url(symbol)
+
+            breaker = self.host_breaker(url)
+            if not breaker.acquire(timeout=self.config.breaker_max_cooldown):
+                return None
+            ok = False
             try:
-                driver = self.setup_selenium()
-                symbol_converted = symbol.replace('_', '').lower()
-                url = f"https://www.lbank.com/futures/{symbol_converted}"
-                self.logger.info(f"Fetching funding rate for {symbol} (attempt {attempt + 1}/{max_retries})")
-                
-                self.logger.info("Loading page...")
+                # HTTP 요청은 고정 배정 없이 가장 상태가 좋은 프록시로 분산
+                with self.proxy_pool.lease(timeout=self.config.breaker_max_cooldown) as (proxy, state):
+                    resp = self.get_cf_session(proxy).get(url)
+                    ok = state["ok"] = resp is not None and resp.status_code == 200
+            finally:
+                breaker.record(ok)
+            if not ok:
+                return None
+
+            if self.funding_api_template:
+                return parse_funding_json(symbol, resp.json())
+            return parse_funding_html(symbol, resp.text)
+        except Exception as e:
+            self.logger.warning(f"HTTP fetch failed for {symbol}: {e}")
+            return None
+
+    def fetch_batch_via_http(self, symbols: list) -> tuple:
+        """Fetch a batch over the pooled HTTP client, returning (results, misses)"""
+        results = []
+        misses = []
+        with ThreadPoolExecutor(max_workers=self.http_workers) as executor:
+            future_to_symbol = {executor.submit(self.get_funding_rate_via_http, s): s for s in symbols}
+            for future in as_completed(future_to_symbol):
+                symbol = future_to_symbol[future]
+                funding_data = future.result()
+                if funding_data:
+                    results.append(funding_data)
+                else:
+                    misses.append(symbol)
+
+        self.logger.info(f"⚡ HTTP fetch: {len(results)}/{len(symbols)} symbols, {len(misses)} falling back to browser")
+        for proxy_url, session in list(self.cf_sessions.items()):
+            self.logger.info(f"Clearance stats{f' via {proxy_url}' if proxy_url else ''}: {session.stats}")
+        return results, misses
+
+    def host_breaker(self, url: str) -> CircuitBreaker:
+        """Circuit breaker shared by every page load to url's host"""
+        return breaker_for(
+            url, window=self.config.breaker_window, failure_rate=self.config.breaker_failure_rate,
+            min_requests=self.config.breaker_min_requests, cooldown=self.config.breaker_cooldown,
+            max_cooldown=self.config.breaker_max_cooldown
+        )
+
+    def get_funding_rate_from_web(self, symbol: str) -> Optional[FundingRecord]:
+        """Get funding rate from LBank website using Selenium and BeautifulSoup (one attempt; retries are deferred)"""
+        record, _ = self.fetch_page(symbol)
+        return record
+
+    @with_symbol_context
+    def fetch_page(self, symbol: str, parse: bool = True) -> Tuple[Optional[FundingRecord], Optional[str]]:
+        """Load the futures page; returns (record, None), or (None, html) with parse=False when the HTML still needs parsing"""
+        # 실행 중 블랙리스트에 추가된 심볼은 바로 중단
+        if symbol in self.blacklist:
+            self.logger.info(f"Skipping {symbol}: blacklisted during collection", extra=SAMPLED)
+            return None, None
+
+        url = self.futures_url(symbol)
+        breaker = self.host_breaker(url)
+        # 차단 중이면 모든 스레드가 여기서 대기 (사이트를 계속 두드리지 않음)
+        if not breaker.acquire(timeout=self.config.breaker_max_cooldown):
+            self.logger.warning(f"⛔ Skipping {symbol}: {breaker.host} circuit still open")
+            return None, None
+
+        html = None
+        ok = False
+        challenged = False
+        try:
+            with self.browser_session() as driver:
+                self.logger.info(f"Fetching funding rate for {symbol}", extra=SAMPLED)
+
+                self.logger.info("Loading page...", extra=SAMPLED)
                 driver.get(url)
-                
-                # Cloudflare 페이지 확인 및 대기 (시간 단축)
-                self.logger.info("Checking for Cloudflare protection...")
-                time.sleep(2)  # 3초 → 2초로 단축
-                
+
+                # Cloudflare 페이지 확인 전 대기
+                self.logger.info("Checking for Cloudflare protection...", extra=SAMPLED)
+                time.sleep(self.config.cloudflare_check_wait)
+
                 # Cloudflare 페이지인지 확인
                 title = driver.title
-                if "Just a moment" in title or "Checking your browser" in title:
-                    self.logger.info("Cloudflare protection detected, waiting for bypass...")
-                    # Cloudflare 우회를 위해 대기 (시간 단축)
-                    time.sleep(10)  # 15초 → 10초로 단축
-                    
+                challenged = is_cloudflare_challenge(title)
+                self.note_challenge(challenged)
+                if challenged:
+                    self.logger.info("Cloudflare protection detected, waiting for bypass...", extra=SAMPLED)
+                    # Cloudflare 우회를 위해 대기
+                    time.sleep(self.config.cloudflare_bypass_wait)
+
                     # 페이지 새로고침
                     driver.refresh()
-                    time.sleep(3)  # 5초 → 3초로 단축
-                
-                # JavaScript 실행 완료까지 대기 (시간 단축)
-                self.logger.info("Waiting for JavaScript to complete...")
-                time.sleep(6)  # 10초 → 6초로 단축
-                
-                # 페이지가 완전히 로드되었는지 확인 (시간 단축)
-                self.logger.info("Checking if page is fully loaded...")
-                time.sleep(2)  # 3초 → 2초로 단축
-                
+                    time.sleep(self.config.cloudflare_refresh_wait)
+
+                start = time.time()
+                if self.extraction == "script":
+                    # 페이지 안에서 값이 나타날 때까지 기다렸다가 두 문자열만 가져옴
+                    result = self.extract_in_page(driver, symbol)
+                    if result:
+                        ok = True
+                        return result, None
+                    self.logger.info("In-page extraction found nothing, falling back to page_source", extra=SAMPLED)
+                else:
+                    # JavaScript 실행 완료까지 대기
+                    self.logger.info("Waiting for JavaScript to complete...", extra=SAMPLED)
+                    time.sleep(self.config.js_render_wait)
+
+                    # 페이지가 완전히 로드되었는지 확인
+                    self.logger.info("Checking if page is fully loaded...", extra=SAMPLED)
+                    time.sleep(self.config.page_settle_wait)
+
                 # HTML 가져오기
                 html = driver.page_source
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # 디버깅: 페이지 제목 확인
-                title = soup.find('title')
-                self.logger.info(f"Page title: {title.text if title else 'No title found'}")
-                
-                # funding rate와 countdown 찾기 (최적화된 검색)
-                self.logger.info("Searching for funding rate and countdown in HTML...")
-                
-                # 1. warning_color span에서 직접 검색 (가장 빠른 방법)
-                funding_spans = soup.find_all('span', class_='warning_color')
-                self.logger.info(f"Found {len(funding_spans)} spans with warning_color class")
-                
-                for span in funding_spans:
-                    if '%' in span.text:
-                        funding_rate = span.text.strip()
-                        self.logger.info(f"Found funding rate: {funding_rate}")
-                        
-                        # countdown 찾기
-                        countdown = "Not found"
-                        next_span = span.find_next('span')
-                        if next_span and ':' in next_span.text:
-                            countdown = next_span.text.strip()
-                        
-                        return {
-                            "symbol": symbol,
-                            "funding_rate": float(funding_rate.replace('%', '')),
-                            "countdown": countdown,
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        }
-                
-                # 2. funding-rate div에서 검색 (백업 방법)
-                funding_divs = soup.find_all('div', class_='funding-rate')
-                self.logger.info(f"Found {len(funding_divs)} divs with funding-rate class")
-                
-                for div in funding_divs:
-                    funding_rate_span = div.find('span', class_='warning_color')
-                    if funding_rate_span and '%' in funding_rate_span.text:
-                        funding_rate = funding_rate_span.text.strip()
-                        self.logger.info(f"Found funding rate: {funding_rate}")
-                        
-                        countdown_span = div.find('span', class_='countdown')
-                        if countdown_span:
-                            countdown = countdown_span.text.strip()
-                        else:
-                            next_span = funding_rate_span.find_next('span')
-                            countdown = next_span.text.strip() if next_span else "Not found"
-                        
-                        result = {
-                            "symbol": symbol,
-                            "funding_rate": float(funding_rate.replace('%', '')),
-                            "countdown": countdown,
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        }
-                        
-                        return result
-                
-                # 3. 모든 span에서 %가 포함된 텍스트 찾기 (최후의 방법)
-                all_spans = soup.find_all('span')
-                for span in all_spans:
-                    if span.text and '%' in span.text and any(char.isdigit() for char in span.text):
-                        text = span.text.strip()
-                        # 펀딩 레이트 패턴 확인 (예: +0.0019%, -0.0019%)
-                        if ('+' in text or '-' in text) and '%' in text:
-                            try:
-                                funding_rate = text
-                                self.logger.info(f"Found funding rate with alternative method: {funding_rate}")
-                                
-                                # countdown 찾기
-                                countdown = "Not found"
-                                next_span = span.find_next('span')
-                                if next_span and ':' in next_span.text:
-                                    countdown = next_span.text.strip()
-                                
-                                result = {
-                                    "symbol": symbol,
-                                    "funding_rate": float(funding_rate.replace('%', '').replace('+', '')),
-                                    "countdown": countdown,
-                                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                }
-                                
-                                return result
-                            except ValueError:
-                                continue
-                
-                self.logger.warning(f"Could not find funding rate in HTML (attempt {attempt + 1}/{max_retries})")
-                
-                # 재시도 전 대기 (시간 단축)
-                if attempt < max_retries - 1:
-                    self.logger.info(f"Waiting 3 seconds before retry...")
-                    time.sleep(3)
-                
-            except Exception as e:
-                self.logger.error(f"Error getting funding rate from web for {symbol} (attempt {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    self.logger.info(f"Waiting 3 seconds before retry...")
-                    time.sleep(3)
-                
-            finally:
-                # 메모리 정리
-                if soup:
-                    del soup
-                if html:
-                    del html
-                self.cleanup_driver(driver)
-        
-        self.logger.error(f"Failed to get funding rate for {symbol} after {max_retries} attempts")
-        return None
+                if not parse:
+                    # 파싱은 파이프라인의 프로세스 풀이 담당 (브라우저 슬롯을 바로 반환)
+                    self.record_extraction("page_source", len(html.encode('utf-8')), time.time() - start)
+                    ok = True
+                    return None, html
+                result = parse_funding_html(symbol, html)
+                self.record_extraction("page_source", len(html.encode('utf-8')), time.time() - start)
+                if result:
+                    ok = True
+                    return result, None
+
+                self.logger.warning(f"Could not find funding rate in HTML for {symbol}")
+
+        except Exception as e:
+            self.logger.error(f"Error getting funding rate from web for {symbol}: {e}")
+
+        finally:
+            # challenge 페이지도 차단기 입장에서는 실패로 집계
+            breaker.record(ok and not challenged)
+
+        return None, None
+
+    def extract_in_page(self, driver, symbol: str) -> Optional[FundingRecord]:
+        """Run EXTRACT_FUNDING_JS in the page, waiting there until the funding rate renders"""
+        timeout = self.config.js_render_wait + self.config.page_settle_wait
+        start = time.time()
+        try:
+            driver.set_script_timeout(timeout + 5)
+            data = driver.execute_async_script(EXTRACT_FUNDING_JS, int(timeout * 1000))
+        except Exception as e:
+            self.logger.warning(f"In-page extraction failed for {symbol}: {e}")
+            return None
+        self.record_extraction("script", len(json.dumps(data or {}).encode('utf-8')), time.time() - start)
+        if data:
+            self.logger.info(f"Found funding rate in page ({data.get('method')}): {data.get('funding_rate')}",
+                             extra=SAMPLED)
+        return parse_funding_extract(symbol, data)
+
+    def record_extraction(self, mode: str, size: int, seconds: float):
+        with self.stats_lock:
+            stats = self.extract_stats[mode]
+            stats["pages"] += 1
+            stats["bytes"] += size
+            stats["seconds"] += seconds
+
+    def extraction_summary(self) -> str:
+        """Average bytes moved and extraction latency per page for each mode used"""
+        with self.stats_lock:
+            parts = [
+                f"{mode} {stats['pages']} pages, {stats['bytes'] / stats['pages'] / 1024:.1f} KiB/page, "
+                f"{stats['seconds'] / stats['pages']:.2f}s/page"
+                for mode, stats in self.extract_stats.items() if stats["pages"]
+            ]
+        return "; ".join(parts) or "no pages"
 
     def update_funding_rates(self):
         """Update funding rates for all tickers from JSON file"""
@@ -276,18 +666,12 @@ class LBankPriceMonitor:
                         funding_rates.append(funding_data)
                     time.sleep(1)  # 웹 크롤링 간격 조절
             
-            data = {
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "funding_rates": funding_rates
-            }
-            
-            with open(self.funding_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_funding_file(self.funding_file, funding_rates)
             
             print(f"\nSaved {len(funding_rates)} funding rates to {self.funding_file}")
             if funding_rates:
                 print("Sample funding rate data:")
-                print(json.dumps(funding_rates[0], indent=2, ensure_ascii=False))
+                print(json.dumps(funding_rates[0].to_dict(), indent=2, ensure_ascii=False))
             
         except Exception as e:
             print(f"Error updating funding rates: {e}")
@@ -391,15 +775,9 @@ class LBankPriceMonitor:
     def save_funding_rates(self, funding_rates: list):
         """Save funding rates directly to a single file"""
         try:
-            data = {
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "funding_rates": funding_rates
-            }
-            
-            with open(self.funding_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            self.logger.info(f"💾 Saved {len(funding_rates)} funding rates to {self.funding_file}")
+            # 직렬화/디스크 쓰기는 write-behind 스레드가 담당 (문자열 변환도 그때만)
+            count = submit_funding_file(self.funding_file, funding_rates)
+            self.logger.info(f"💾 Queued {count} funding rates for {self.funding_file}")
             
         except Exception as e:
             self.logger.error(f"Error saving funding rates: {e}")
@@ -427,101 +805,346 @@ class LBankPriceMonitor:
         
         funding_rates = []
         success_count = 0
+        failed_count = 0
+        deferred_count = 0
+        dropped_count = 0
         
-        # 병렬 처리로 속도 향상 (워커 수를 10으로 증가)
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            # 각 티커에 대해 병렬로 펀딩 레이트 가져오기
-            future_to_ticker = {
-                executor.submit(self.get_funding_rate_from_web, ticker.get('symbol'), 2): ticker 
-                for ticker in tickers if ticker.get('symbol')
-            }
+        # hybrid 모드: 공유 clearance로 HTTP 먼저 수집하고, 실패한 심볼만 브라우저로 처리
+        browser_tickers = tickers
+        if self.fetch_mode == "hybrid":
+            symbols = [ticker.get('symbol') for ticker in tickers if ticker.get('symbol')]
+            http_results, misses = self.fetch_batch_via_http(symbols)
+            funding_rates.extend(http_results)
+            success_count += len(http_results)
+            for funding_data in http_results:
+                self.health.record_success(funding_data.symbol)
+            missed = set(misses)
+            browser_tickers = [ticker for ticker in tickers if ticker.get('symbol') in missed]
+        
+        # 병렬 처리로 속도 향상 (워커 수 = 프로필 슬롯 수), pipeline 설정 시 파싱은 프로세스 풀에서,
+        # tabs_per_browser 설정 시 브라우저마다 여러 탭으로 동시 로드
+        symbols = [ticker.get('symbol') for ticker in browser_tickers if ticker.get('symbol')]
+        if self.config.tabs_per_browser > 1:
+            results = self.tab_results(symbols)
+        elif self.config.pipeline:
+            results = self.pipeline_results(symbols)
+        else:
+            results = self.browser_results(symbols)
+        for symbol, funding_data, error, cancelled in results:
+            # 블랙리스트 변경으로 취소된 작업
+            if cancelled:
+                dropped_count += 1
+                continue
             
-            for future in as_completed(future_to_ticker):
-                ticker = future_to_ticker[future]
-                symbol = ticker.get('symbol')
-                
-                try:
-                    funding_data = future.result()
-                    if funding_data:
-                        funding_rates.append(funding_data)
-                        success_count += 1
-                        self.logger.info(f"✓ Success: {symbol} = {funding_data['funding_rate']}")
-                    else:
-                        self.logger.warning(f"✗ Failed: {symbol}")
-                        
-                except Exception as e:
-                    self.logger.error(f"Error processing ticker {symbol}: {e}")
-                
-                # 주기적으로 가비지 컬렉션 실행 (메모리 관리)
-                if len(funding_rates) % 10 == 0 and len(funding_rates) > 0:
-                    gc.collect()
-                    self.log_memory_usage(f"after {len(funding_rates)} tickers in batch {batch_num}")
+            if funding_data:
+                funding_rates.append(funding_data)
+                success_count += 1
+                self.health.record_success(symbol)
+                self.logger.info(f"✓ Success: {symbol} = {funding_data.rate}", extra=SAMPLED)
+            elif symbol in self.blacklist:
+                # 수집 도중 블랙리스트에 추가되어 중단된 심볼은 실패로 집계하지 않음
+                self.logger.info(f"- Dropped: {symbol} (blacklisted)", extra=SAMPLED)
+                dropped_count += 1
+            elif self.defer_or_fail(symbol, 1, error):
+                deferred_count += 1
+            else:
+                failed_count += 1
+            
+            # 주기적으로 가비지 컬렉션 실행 (메모리 관리)
+            if len(funding_rates) % 10 == 0 and len(funding_rates) > 0:
+                gc.collect()
+                self.log_memory_usage(f"after {len(funding_rates)} tickers in batch {batch_num}")
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         success_rate = (success_count / len(tickers)) * 100 if tickers else 0
         
-        self.logger.info(f"Completed batch {batch_num} in {duration:.2f} seconds")
-        self.logger.info(f"Success rate: {success_count}/{len(tickers)} ({success_rate:.1f}%)")
+        throughput = success_count / duration if duration > 0 else 0
+        self.logger.info(
+            f"📦 Batch {batch_num} summary: {success_count}/{len(tickers)} ok ({success_rate:.1f}%), "
+            f"{deferred_count} deferred, {failed_count} failed, {dropped_count} dropped "
+            f"in {duration:.2f}s ({throughput:.2f} symbols/s)"
+        )
         
         # 메모리 정리
         gc.collect()
         self.log_memory_usage(f"after batch {batch_num}")
+        # 프로파일링 중이면 배치별 할당 차이 기록
+        get_profiler().checkpoint(f"lbank batch {batch_num}")
         
         return funding_rates
 
-    def monitor_loop(self):
+    def track_pending(self, futures: Dict):
+        """Register queued page loads so a blacklist change can cancel them"""
+        with self.pending_lock:
+            self.pending_futures = dict(futures)
+
+    def browser_results(self, symbols: List[str]):
+        """Yield (symbol, record, error, cancelled) with each worker thread loading and parsing its page"""
+        with ThreadPoolExecutor(max_workers=self.browser_workers) as executor:
+            futures = {executor.submit(self.get_funding_rate_from_web, symbol): symbol for symbol in symbols}
+            self.track_pending(futures)
+            for future in as_completed(futures):
+                symbol = futures[future]
+                with self.pending_lock:
+                    self.pending_futures.pop(future, None)
+                if future.cancelled():
+                    yield symbol, None, None, True
+                    continue
+                try:
+                    record, error = future.result(), "funding rate not found"
+                except Exception as e:
+                    self.logger.error(f"Error processing ticker {symbol}: {e}")
+                    record, error = None, str(e)
+                yield symbol, record, error, False
+
+    def pipeline_results(self, symbols: List[str]):
+        """Same results from the staged pipeline: browser threads only load pages, a process pool parses"""
+        if self.pipeline is None:
+            self.pipeline = CollectionPipeline(lambda symbol: self.fetch_page(symbol, parse=False),
+                                               parse_funding_html, self.browser_workers,
+                                               self.config.parse_workers, self.config.parse_queue_size)
+        yield from self.pipeline.run(symbols, on_submit=self.track_pending)
+
+    def tab_results(self, symbols: List[str]):
+        """Same results from a few browsers, each keeping tabs_per_browser page loads in flight"""
+        pending: queue.Queue = queue.Queue()
+        for symbol in symbols:
+            pending.put(symbol)
+        results: queue.Queue = queue.Queue()
+        tabs = self.config.tabs_per_browser
+        browsers = max(1, min(self.browser_workers, math.ceil(len(symbols) / tabs)))
+        threads = [threading.Thread(target=self.harvest_tabs, args=(pending, results, tabs),
+                                    name=f"tabs-{i}", daemon=True) for i in range(browsers)]
+        for thread in threads:
+            thread.start()
+
+        received = 0
+        while received < len(symbols):
+            try:
+                item = results.get(timeout=1.0)
+            except queue.Empty:
+                if any(thread.is_alive() for thread in threads):
+                    continue
+                # 브라우저가 모두 종료됨: 남은 심볼은 실패로 보고
+                while True:
+                    try:
+                        results.put((pending.get_nowait(), None, "no browser available", False))
+                    except queue.Empty:
+                        break
+                if results.empty():
+                    break
+                continue
+            received += 1
+            yield item
+        for thread in threads:
+            thread.join()
+
+    def harvest_tabs(self, pending: queue.Queue, results: queue.Queue, tabs: int):
+        """One browser thread: start loads in its tabs and harvest each tab once the funding rate appears"""
+        def next_item(busy: bool):
+            while True:
+                try:
+                    symbol = pending.get_nowait()
+                except queue.Empty:
+                    return None
+                if symbol in self.blacklist:
+                    results.put((symbol, None, None, False))
+                    continue
+                url = self.futures_url(symbol)
+                breaker = self.host_breaker(url)
+                # 다른 탭이 로드 중이면 기다리지 않음 (그 탭들의 수거가 멈추지 않도록)
+                if breaker.acquire(timeout=0 if busy else self.config.breaker_max_cooldown):
+                    return symbol, url
+                if busy:
+                    pending.put(symbol)
+                    return WAIT
+                self.logger.warning(f"⛔ Skipping {symbol}: {breaker.host} circuit still open")
+                results.put((symbol, None, f"{breaker.host} circuit still open", False))
+
+        def on_result(symbol: str, found: Optional[Dict], error: Optional[str], challenged: bool, seconds: float):
+            self.note_challenge(challenged)
+            record = parse_funding_extract(symbol, found)
+            if found:
+                self.record_extraction("script", len(json.dumps(found).encode('utf-8')), seconds)
+                self.logger.info(f"Found funding rate in tab ({found.get('method')}): {found.get('funding_rate')}",
+                                 extra=SAMPLED)
+            self.note_tab_page(record is not None, challenged, seconds)
+            # challenge 페이지도 차단기 입장에서는 실패로 집계
+            self.host_breaker(self.futures_url(symbol)).record(record is not None and not challenged)
+            results.put((symbol, record, None if record else error or "funding rate not found", False))
+
+        try:
+            with self.browser_session() as driver:
+                harvester = TabHarvester(driver, tabs, PROBE_FUNDING_JS, timeout=self.config.tab_timeout,
+                                         challenge_wait=self.config.cloudflare_bypass_wait)
+                harvester.run(next_item, on_result)
+        except Exception as e:
+            self.logger.error(f"Tab browser failed: {e}")
+
+    def defer_or_fail(self, symbol: str, attempts: int, error: str) -> bool:
+        """Queue another attempt after the main pass, or record the failure once attempts run out"""
+        if self.retry_queue.push(symbol, attempts):
+            self.logger.info(f"↻ Deferred: {symbol} (attempt {attempts}/{self.retry_queue.max_attempts})",
+                             extra=SAMPLED)
+            return True
+        self.health.record_failure(symbol, error)
+        self.logger.warning(f"✗ Failed: {symbol} after {attempts} attempts")
+        return False
+
+    def report_deferred(self, symbols: List[str], reason: str):
+        """Record symbols left for the next cycle because the deadline ran out"""
+        if not symbols:
+            return
+        self.deferred_symbols.extend(symbols)
+        preview = ", ".join(symbols[:10]) + (" ..." if len(symbols) > 10 else "")
+        self.logger.warning(f"⏰ Cycle deadline: deferred {len(symbols)} {reason}: {preview}")
+
+    def run_deferred_retries(self, deadline: Optional[float] = None) -> list:
+        """Retry deferred symbols once the main pass is done (jittered backoff, breaker-gated)"""
+        funding_rates = []
+        if not self.retry_queue:
+            return funding_rates
+        self.logger.info(f"↻ Retrying {len(self.retry_queue)} deferred symbols")
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.browser_workers) as executor:
+            while self.retry_queue or in_flight:
+                # 마감이 지나면 새 재시도는 시작하지 않음 (진행 중인 것만 기다림)
+                if deadline is not None and time.time() >= deadline:
+                    self.report_deferred(self.retry_queue.drain(), "retries")
+                # 빈 슬롯만큼만 꺼냄 (백오프가 끝나지 않은 심볼은 큐에 남김)
+                for symbol, attempts in self.retry_queue.pop_ready(self.browser_workers - len(in_flight)):
+                    if symbol not in self.blacklist:
+                        in_flight[executor.submit(self.get_funding_rate_from_web, symbol)] = (symbol, attempts)
+                next_ready = self.retry_queue.next_ready_in()
+                timeout = min(next_ready, 1.0) if next_ready is not None else None
+                if not in_flight:
+                    if next_ready is not None:
+                        time.sleep(timeout)
+                    continue
+
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    symbol, attempts = in_flight.pop(future)
+                    try:
+                        funding_data = future.result()
+                        error = "funding rate not found"
+                    except Exception as e:
+                        funding_data, error = None, str(e)
+                    if funding_data:
+                        funding_rates.append(funding_data)
+                        self.health.record_success(symbol)
+                        self.logger.info(f"✓ Retry success: {symbol} = {funding_data.rate}", extra=SAMPLED)
+                    elif symbol not in self.blacklist:
+                        self.defer_or_fail(symbol, attempts + 1, error)
+
+        self.logger.info(f"↻ Deferred retries recovered {len(funding_rates)} symbols "
+                         f"({self.host_breaker(self.futures_url_template).summary()})")
+        return funding_rates
+
+    def select_tickers(self, symbols: Optional[List[str]] = None) -> list:
+        """Read tickers and drop blacklisted and quarantined symbols"""
+        # 티커 읽기
+        tickers = self.read_tickers_from_file()
+        if not tickers:
+            self.logger.error("No tickers found")
+            return []
+        
+        # 정산 직전 수집처럼 일부 심볼만 요청된 경우
+        if symbols is not None:
+            wanted = set(symbols)
+            tickers = [ticker for ticker in tickers if ticker.get('symbol') in wanted]
+        
+        # 블랙리스트 읽기 및 적용
+        blacklist = self.read_blacklist()
+        filtered_tickers = [ticker for ticker in tickers if ticker.get('symbol') not in blacklist]
+        
+        # 격리 중인 심볼 제외 (백오프 기간이 끝나면 다시 시도)
+        self.health.refresh()  # manage_blacklist.py quarantine release/promote 반영
+        quarantined = set(self.health.quarantined())
+        filtered_tickers = [ticker for ticker in filtered_tickers if ticker.get('symbol') not in quarantined]
+        
+        self.logger.info(f"📊 Original tickers: {len(tickers)}")
+        self.logger.info(f"🚫 Blacklist entries: {len(blacklist)} ({blacklist.rule_count} pattern rules)")
+        self.logger.info(f"🔒 Quarantined tickers: {len(quarantined)}")
+        self.logger.info(f"✅ Filtered tickers: {len(filtered_tickers)}")
+        
+        if not filtered_tickers:
+            self.logger.error("No tickers remaining after blacklist filtering")
+        return filtered_tickers
+
+    def merge_funding_rates(self, funding_rates: list):
+        """Merge fresh results into the latest snapshot and save it (부분 수집이어도 전체 스냅샷 유지)"""
+        for item in funding_rates:
+            self.latest_rates[item.symbol] = item
+        self.save_funding_rates(list(self.latest_rates.values()))
+
+    def monitor_loop(self, symbols: Optional[List[str]] = None, deadline: Optional[float] = None) -> list:
+        """Run one collection cycle (profiled when --profile or SIGUSR1 enabled profiling)"""
+        with get_profiler().cycle("lbank"):
+            return self.collect_cycle(symbols, deadline)
+
+    def collect_cycle(self, symbols: Optional[List[str]] = None, deadline: Optional[float] = None) -> list:
         """Monitor funding rates continuously with optimized performance and memory management"""
         self.logger.info("Starting LBank funding rate monitoring")
+        all_funding_rates = []
+        self.deferred_symbols = []
         
         try:
-            # 티커 읽기
-            tickers = self.read_tickers_from_file()
-            if not tickers:
-                self.logger.error("No tickers found")
-                return
-            
-            # 블랙리스트 읽기 및 적용
-            blacklist = self.read_blacklist()
-            filtered_tickers = [ticker for ticker in tickers if ticker.get('symbol') not in blacklist]
+            filtered_tickers = self.select_tickers(symbols)
+            if not filtered_tickers:
+                return all_funding_rates
             
-            self.logger.info(f"📊 Original tickers: {len(tickers)}")
-            self.logger.info(f"🚫 Blacklisted tickers: {len(blacklist)}")
-            self.logger.info(f"✅ Filtered tickers: {len(filtered_tickers)}")
+            # 중요한 심볼부터 수집 (직전 차이, 정산 임박, 거래대금, 데이터 나이)
+            if not self.prioritizer.spreads:
+                self.prioritizer.load_spreads()
+            filtered_tickers = self.prioritizer.order(filtered_tickers, self.latest_rates)
             
-            if not filtered_tickers:
-                self.logger.error("No tickers remaining after blacklist filtering")
-                return
+            # 수집 중에도 블랙리스트 파일 변경을 감시
+            self.blacklist_watcher.start()
             
-            batch_size = 80  # 배치 크기를 80으로 대폭 증가 (속도 대폭 향상)
+            batch_size = self.config.batch_size
             total_batches = (len(filtered_tickers) + batch_size - 1) // batch_size
             
             self.logger.info(f"Processing {len(filtered_tickers)} tickers in {total_batches} batches")
             
-            all_funding_rates = []
-            
             # 티커를 배치로 나누어 처리
+            batch_durations = []
             for i in range(0, len(filtered_tickers), batch_size):
-                batch = filtered_tickers[i:i + batch_size]
                 batch_num = i // batch_size + 1
                 
+                # 마감 전에 다음 배치를 끝낼 수 없으면 남은 (우선순위 낮은) 심볼은 다음 사이클로
+                if deadline is not None:
+                    expected = sum(batch_durations) / len(batch_durations) if batch_durations else 0
+                    if time.time() + expected > deadline:
+                        self.report_deferred([t['symbol'] for t in filtered_tickers[i:] if t.get('symbol')],
+                                             "low-priority symbols")
+                        break
+                batch_start = time.time()
+                batch = [ticker for ticker in filtered_tickers[i:i + batch_size]
+                         if ticker.get('symbol') not in self.blacklist]
+                
                 self.logger.info(f"Starting batch {batch_num}/{total_batches}")
                 
                 # 배치 처리
                 funding_rates = self.process_ticker_batch(batch, batch_num)
                 all_funding_rates.extend(funding_rates)
                 
-                # 배치 간 대기 (시간 단축)
+                # 배치 간 대기
                 if i + batch_size < len(filtered_tickers):
-                    self.logger.info("Waiting 3 seconds before next batch...")
-                    time.sleep(3)
+                    self.logger.info(f"Waiting {self.config.batch_pause} seconds before next batch...")
+                    time.sleep(self.config.batch_pause)
                 
                 # 메모리 정리
                 gc.collect()
+                batch_durations.append(time.time() - batch_start)
+            
+            # 메인 패스에서 실패한 심볼 재시도 (정상 심볼이 다 끝난 뒤 남는 용량으로)
+            all_funding_rates.extend(self.run_deferred_retries(deadline))
             
             # 모든 배치 처리 완료 후 한 번에 저장
             if all_funding_rates:
-                self.save_funding_rates(all_funding_rates)
+                self.merge_funding_rates(all_funding_rates)
                 total_success_rate = (len(all_funding_rates) / len(filtered_tickers)) * 100
                 self.logger.info(f"📊 Overall success rate: {len(all_funding_rates)}/{len(filtered_tickers)} ({total_success_rate:.1f}%)")
                 self.logger.info("🎉 LBank funding rate collection completed")
@@ -533,11 +1156,29 @@ class LBankPriceMonitor:
             
         finally:
             # 최종 메모리 정리
+            for session in self.cf_sessions.values():
+                session.close()
+            self.cf_sessions.clear()
+            self.close_browser_sessions()
+            if self.pipeline:
+                self.pipeline.close()
+                self.pipeline = None
+            self.logger.info(f"📄 Extraction: {self.extraction_summary()}")
+            self.health.save()
+            if self.blacklist_watcher:
+                self.blacklist_watcher.stop()
             gc.collect()
             self.logger.info("🏁 LBank monitoring process completed")
+        
+        return all_funding_rates
 
 def main():
+    setup_logging()
     monitor = LBankPriceMonitor()
+    if "--hybrid" in sys.argv:
+        monitor.fetch_mode = "hybrid"
+    if "--profile" in sys.argv:
+        get_profiler().enabled = True
     monitor.monitor_loop()
 
 if __name__ == "__main__":
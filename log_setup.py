@@ -0,0 +1,188 @@
+import atexit
+import contextvars
+import functools
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(symbol_tag)s%(message)s'
+
+# 페이지마다 반복되는 메시지에만 붙이는 표시 (logger.info(..., extra=SAMPLED)), 배치/사이클 요약은 항상 출력
+SAMPLED = {"sampled": True}
+
+current_symbol = contextvars.ContextVar("current_symbol", default=None)
+
+_listener: Optional[QueueListener] = None
+_rate_limit: Optional["RateLimitFilter"] = None
+_setup_lock = threading.Lock()
+
+
+class SymbolContextFilter(logging.Filter):
+    """작업 중인 심볼을 레코드에 붙임 (워커 스레드의 contextvar에서 읽음)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        symbol = getattr(record, "symbol", None) or current_symbol.get()
+        record.symbol = symbol
+        record.symbol_tag = f"[{symbol}] " if symbol else ""
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """SAMPLED 표시가 붙은 반복 INFO 메시지를 유형별로 interval마다 한 번만 통과시키고 생략 건수를 덧붙임"""
+
+    def __init__(self, interval: float = 10.0):
+        super().__init__()
+        self.interval = interval
+        self.last_emitted: Dict[str, float] = {}
+        self.suppressed: Dict[str, int] = {}
+        self.last_suppressed: Dict[str, Tuple[str, str]] = {}  # 유형 -> (로거 이름, 마지막으로 생략한 메시지)
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval <= 0 or record.levelno > logging.INFO or not getattr(record, "sampled", False):
+            return True
+
+        # 숫자만 다른 메시지("Found 3 spans...")는 같은 유형으로 취급
+        key = f"{record.name}:{re.sub(r'[0-9.]+', '#', str(record.msg))}"
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_emitted.get(key, 0) < self.interval:
+                self.suppressed[key] = self.suppressed.get(key, 0) + 1
+                self.last_suppressed[key] = (record.name, record.getMessage())
+                return False
+            self.last_emitted[key] = now
+            suppressed = self.suppressed.pop(key, 0)
+            self.last_suppressed.pop(key, None)
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} (+{suppressed} similar suppressed)"
+            record.args = None
+        return True
+
+    def flush(self):
+        """Log the counts still pending (nothing later would carry them), e.g. when logging shuts down"""
+        with self.lock:
+            pending = [(self.last_suppressed[key], count) for key, count in self.suppressed.items()]
+            self.suppressed.clear()
+            self.last_suppressed.clear()
+        for (name, message), count in pending:
+            logging.getLogger(name).info(f"{message} (+{count} similar suppressed)")
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """Parse 'lbank_monitor=WARNING,cf_session=DEBUG' into a mapping"""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, level = item.partition('=')
+        if level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = None, subsystems: Dict[str, str] = None,
+                  sample_interval: float = None) -> QueueListener:
+    """Configure non-blocking queued logging once per process
+
+    Environment overrides: LOG_LEVEL, LOG_LEVELS (per subsystem),
+    LOG_SAMPLE_INTERVAL (seconds, 0 disables sampling).
+    """
+    global _listener, _rate_limit
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        level = (level or os.environ.get("LOG_LEVEL", "INFO")).upper()
+        if sample_interval is None:
+            sample_interval = float(os.environ.get("LOG_SAMPLE_INTERVAL", 10))
+        levels = dict(subsystems or {})
+        levels.update(_parse_levels(os.environ.get("LOG_LEVELS", "")))
+
+        # 실제 출력은 리스너 스레드에서만 수행 → 워커 스레드는 I/O에 막히지 않음
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(SymbolContextFilter())
+        _rate_limit = RateLimitFilter(sample_interval)
+        queue_handler.addFilter(_rate_limit)
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+        for name, subsystem_level in levels.items():
+            logging.getLogger(name).setLevel(subsystem_level)
+
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            if _rate_limit is not None:
+                _rate_limit.flush()  # 큐에 넣은 뒤 stop()이 마저 출력
+            _listener.stop()
+            _listener = None
+
+
+class _DispatchHandler(logging.Handler):
+    """자식 프로세스에서 온 레코드를 이 프로세스의 로거로 다시 보냄 (레벨/샘플링/출력은 부모 설정을 따름)"""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        target = logging.getLogger(record.name)
+        if target.isEnabledFor(record.levelno):
+            target.handle(record)
+        return True
+
+
+def start_worker_logging(context) -> Tuple[object, QueueListener]:
+    """Queue and listener that carry log records from spawned pool processes back to this process
+
+    Pass the queue to init_worker_logging through the pool's initializer; stop the listener after the pool.
+    """
+    log_queue = context.Queue()
+    listener = QueueListener(log_queue, _DispatchHandler())
+    listener.start()
+    return log_queue, listener
+
+
+def init_worker_logging(log_queue, level: int):
+    """Pool initializer: spawned processes start without handlers, so send every record to the parent"""
+    handler = QueueHandler(log_queue)
+    handler.addFilter(SymbolContextFilter())  # 심볼 태그는 자식의 contextvar에서 붙여서 보냄
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+@contextmanager
+def symbol_context(symbol: str):
+    token = current_symbol.set(symbol)
+    try:
+        yield
+    finally:
+        current_symbol.reset(token)
+
+
+def with_symbol_context(func):
+    """Decorator for per-symbol methods: tags every log line with the symbol argument"""
+    @functools.wraps(func)
+    def wrapper(self, symbol, *args, **kwargs):
+        with symbol_context(symbol):
+            return func(self, symbol, *args, **kwargs)
+    return wrapper
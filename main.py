@@ -1,118 +1,224 @@
 import time
-from lbank_monitor import LBankPriceMonitor
-from mexc_monitor import MEXCMonitor
-from telegram_sender import TelegramSender
+import signal
+import sys
+import threading
+from scheduler import SettlementScheduler
+from funding_matrix import DEFAULT_THRESHOLD, compare_matrix, load_latest_rates, symbol_spread
+from spread_index import SpreadIndex
+from spread_stats import RollingStats, load_rules
+from log_setup import setup_logging
+from profiler import get_profiler
+from read_api import DEFAULT_PORT, ReadApi
+from shm_table import SharedFundingTable
+from write_behind import get_writer
 import logging
-import json
 from datetime import datetime
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()  # 콘솔 출력만 사용
-    ]
-)
-
-def compare_funding_rates():
-    """LBank와 MEXC의 펀딩 레이트 비교"""
+def compare_funding_rates(latest: dict = None, threshold: float = DEFAULT_THRESHOLD,
+                          index: SpreadIndex = None):
+    """모든 거래소의 펀딩 레이트를 심볼 x 거래소 행렬로 한 번에 비교"""
     try:
-        # LBank 펀딩 레이트 읽기
-        with open('lbank_funding.json', 'r', encoding='utf-8') as f:
-            lbank_data = json.load(f)
-            lbank_rates = {}
-            for item in lbank_data.get('funding_rates', []):
-                rate = item['funding_rate']
-                # 문자열인 경우 % 제거 후 float로 변환
-                if isinstance(rate, str):
-                    rate = float(rate.replace('%', ''))
-                lbank_rates[item['symbol']] = rate
-        
-        # MEXC 펀딩 레이트 읽기
-        with open('mexc_funding.json', 'r', encoding='utf-8') as f:
-            mexc_data = json.load(f)
-            mexc_rates = {item['symbol']: float(item['funding_rate'])
-                         for item in mexc_data.get('funding_rates', [])}
-        
-        # 공통 심볼 찾기 및 비교
-        common_symbols = set(lbank_rates.keys()) & set(mexc_rates.keys())
-        comparison_results = []
-        
-        # 임계값을 0.001 (0.1%)로 수정
-        threshold = 0.001
-        
-        for symbol in common_symbols:
-            lbank_rate = lbank_rates[symbol]
-            mexc_rate = mexc_rates[symbol]
-            difference = lbank_rate - mexc_rate
-            
-            # 펀딩 레이트 차이가 0.1% 이상인 경우만 포함
-            if abs(difference) >= threshold:
-                comparison_results.append({
-                    'symbol': symbol,
-                    'lbank_rate': lbank_rate,
-                    'mexc_rate': mexc_rate,
-                    'difference': difference,
-                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                })
-        
-        # 결과 저장
-        with open('funding_comparison.json', 'w', encoding='utf-8') as f:
-            json.dump({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'comparisons': comparison_results
-            }, f, indent=2, ensure_ascii=False)
+        # 데몬은 메모리의 최신 값을, CLI는 거래소별 저장 파일을 사용
+        if latest is None:
+            latest = load_latest_rates()
+
+        # 전체 심볼로 순위 인덱스를 다시 만들고, 임계값 이상만 범위 조회
+        index = index if index is not None else SpreadIndex()
+        index.rebuild(compare_matrix(latest, threshold=0.0))
+        comparison_results = index.range(low=threshold)
+
+        # 결과 저장 (백그라운드 쓰기, 수집 경로는 디스크를 기다리지 않음)
+        get_writer().submit('funding_comparison.json', {
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'exchanges': sorted(latest),
+            'comparisons': comparison_results
+        })
         
-        logging.info(f"Compared {len(comparison_results)} funding rates with difference >= 0.1%")
+        logging.info(f"Compared {len(comparison_results)} symbols across {len(latest)} exchanges "
+                     f"with spread >= {threshold}%")
         return comparison_results
         
     except Exception as e:
         logging.error(f"Error comparing funding rates: {e}")
         return None
 
+class FundingDaemon:
+    """수집 객체를 유지한 채 정산 시각에 맞춰 수집/비교/전송을 반복하는 데몬"""
+
+    def __init__(self, schedules: dict = None, api_port: int = DEFAULT_PORT):
+        # 무거운 의존성(selenium 등)은 데몬을 실제로 띄울 때만 로드
+        from exchange_adapters import FundingCollector, LBankAdapter, MexcAdapter
+        from lbank_monitor import LBankPriceMonitor
+        from mexc_monitor import MEXCMonitor
+        from mexc_stream import MexcStream
+        from telegram_sender import TelegramSender
+        
+        self.lbank = LBankPriceMonitor()
+        self.mexc = MEXCMonitor()
+        # 스트림이 살아있으면 MEXC 수집은 네트워크 없이 메모리 테이블을 저장
+        self.mexc.stream = MexcStream(self.mexc)
+        self.telegram = TelegramSender()
+        self.scheduler = SettlementScheduler(schedules)
+        # 일정에 있는 거래소마다 어댑터 하나 (LBank/MEXC는 위 모니터를 그대로 사용)
+        self.collector = FundingCollector.create(
+            list(self.scheduler.schedules),
+            lbank=LBankAdapter(self.lbank),
+            mexc=MexcAdapter(self.mexc)
+        )
+        # 심볼별 스프레드 순위 (사이클마다 재구성, 스트림 갱신은 심볼 단위로 반영)
+        self.spreads = SpreadIndex()
+        self.stats = RollingStats()
+        self.alert_rules = load_rules()
+        self.mexc.stream.subscribe(self.on_mexc_update)
+        self.retry_delay = 900  # 오류 시 15분 후 재시도
+        self.deadline_margin = 60  # 다음 수집 시점보다 이만큼 먼저 끝내고 비교/전송
+        # 다른 프로세스가 파일 대신 메모리 상태를 읽는 로컬 API (api_port=None이면 끔)
+        self.api = ReadApi(self, port=api_port) if api_port else None
+        # 같은 머신의 다른 프로세스가 NumPy 뷰로 바로 읽는 최신 펀딩 테이블 (run()에서 생성)
+        self.table = None
+        # 사이클 스레드의 테이블 교체(용량 증가 시 이전 mmap 해제)와 스트림 스레드의 갱신을 직렬화
+        self.table_lock = threading.Lock()
+        self.running = True
+
+    def stop(self, signum=None, frame=None):
+        logging.info("종료 신호 수신, 현재 사이클 후 종료합니다")
+        self.running = False
+
+    def on_mexc_update(self, symbols: list, stream):
+        """Move streamed MEXC symbols in the spread index without a full recompute"""
+        if "mexc" not in self.collector.adapters:
+            return
+        latest = {name: adapter.latest for name, adapter in self.collector.adapters.items()}
+        updated = []
+        for symbol in symbols:
+            record = stream.get_record(symbol)
+            if record is None:
+                continue
+            latest["mexc"][symbol] = record
+            self.spreads.update(symbol, symbol_spread(latest, symbol))
+            updated.append(record)
+        if updated:
+            with self.table_lock:
+                if self.table:
+                    self.table.update("mexc", updated)
+        if self.api:
+            self.api.publish(symbols)
+
+    def run_cycle(self, exchanges: set, symbols: list = None):
+        """Collect the requested exchanges, then compare and notify"""
+        scope = "전체" if symbols is None else f"{len(symbols)}개 심볼"
+        logging.info(f"수집 사이클 시작: {sorted(exchanges)} ({scope})")
+
+        # 1. 거래소별 펀딩 레이트 동시 수집 (LBank는 다음 수집 시점 전까지 중요한 심볼부터)
+        deadline = self.scheduler.next_due("lbank") - self.deadline_margin
+        results = self.collector.collect(exchanges, symbols, deadline)
+        if "lbank" in results:
+            self.scheduler.update_settlements(results["lbank"])
+        profiler = get_profiler()
+        profiler.checkpoint("collect")
+
+        # 2. 펀딩 레이트 비교 (이번에 수집하지 않은 거래소는 직전 값 사용)
+        logging.info("펀딩 레이트 비교 시작")
+        comparison_results = compare_funding_rates(self.collector.latest(), index=self.spreads)
+        if comparison_results is None:
+            logging.error("펀딩 레이트 비교 실패")
+            return
+        logging.info("펀딩 레이트 비교 완료")
+        profiler.checkpoint("compare")
+        # 다음 사이클의 수집 순서에 반영
+        self.lbank.prioritizer.update_spreads({r['symbol']: r['spread'] for r in self.spreads.ranked()})
+        with self.table_lock:
+            if self.table:
+                self.table = self.table.publish(self.collector.latest())
+
+        # 3. 심볼별 이동 통계 갱신 후 알림 규칙 평가 (고정 임계값 대신 z-score/백분위)
+        touched = {record.symbol for records in results.values() for record in records}
+        spreads = [r for r in self.spreads.ranked() if r['symbol'] in touched]
+        alerts = self.stats.observe_cycle(spreads, results, self.alert_rules)
+        if self.api:
+            # 통계까지 갱신한 뒤에 버전을 올림 (이벤트를 받고 읽은 /history가 이전 통계로 캐시되지 않도록)
+            self.api.publish()
+        self.stats.save()
+        profiler.checkpoint("stats")
+
+        # 4. 결과 전송
+        if alerts:
+            logging.info(f"알림 {len(alerts)}건 전송 시작")
+            self.telegram.send_alerts(alerts)
+            logging.info("결과 전송 완료")
+            profiler.checkpoint("notify")
+
+        writes = get_writer().stats()
+        logging.info(f"💾 Write-behind: queue {writes['queue_depth']} (max {writes['max_queue_depth']}), "
+                     f"{writes['written']} writes, {writes['coalesced']} coalesced, "
+                     f"avg {writes['avg_write_ms']:.1f}ms, max lag {writes['max_lag_ms']:.0f}ms")
+
+    def sleep_until(self, run_at: float):
+        """Sleep in short steps so a stop signal is honoured promptly"""
+        while self.running:
+            remaining = run_at - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 30))
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        # kill -USR1 <pid> 로 다음 사이클부터 프로파일링 켜기/끄기
+        get_profiler().install_signal()
+
+        # 이전 결과로 정산 시각을 미리 계산 (재시작해도 일정 유지)
+        self.collector.load()
+        self.stats.load()
+        self.scheduler.update_settlements(self.lbank.latest_rates.values())
+
+        try:
+            # 재시작 직후에도 직전 값을 바로 읽을 수 있도록 불러온 값으로 채움
+            table = SharedFundingTable.create().publish(self.collector.latest())
+            with self.table_lock:
+                self.table = table
+        except OSError as e:
+            logging.error(f"공유 펀딩 테이블 생성 실패 (파일만 사용): {e}")
+        self.mexc.stream.start()
+        if self.api:
+            try:
+                self.api.start()
+            except OSError as e:
+                logging.error(f"Read API 시작 실패 (파일만 사용): {e}")
+                self.api = None
+
+        # 시작 시 한 번 전체 수집
+        exchanges, symbols = set(self.scheduler.schedules), None
+        try:
+            while self.running:
+                try:
+                    with get_profiler().cycle("daemon"):
+                        self.run_cycle(exchanges, symbols)
+                    run_at, exchanges, symbols = self.scheduler.next_run()
+                except Exception as e:
+                    logging.error(f"실행 중 오류 발생: {e}")
+                    run_at = time.time() + self.retry_delay
+                    exchanges, symbols = set(self.scheduler.schedules), None
+
+                scope = "전체" if symbols is None else f"정산 임박 {len(symbols)}개 심볼"
+                next_time = datetime.fromtimestamp(run_at).strftime("%Y-%m-%d %H:%M:%S")
+                logging.info(f"다음 실행: {next_time} {sorted(exchanges)} ({scope})")
+                self.sleep_until(run_at)
+        finally:
+            self.mexc.stream.stop()
+            if self.api:
+                self.api.stop()
+            # 대기 중인 파일 쓰기를 모두 마친 뒤 종료
+            get_writer().close()
+
 def main():
     """메인 실행 함수"""
+    setup_logging()
     logging.info("모니터링 시스템 시작")
+    if "--profile" in sys.argv:
+        get_profiler().enabled = True
     
     try:
-        while True:
-            try:
-                # 1. LBank 펀딩 레이트 수집
-                logging.info("LBank 펀딩 레이트 수집 시작")
-                lbank = LBankPriceMonitor()
-                lbank.monitor_loop()
-                logging.info("LBank 펀딩 레이트 수집 완료")
-                
-                # 2. MEXC 펀딩 레이트 수집
-                logging.info("MEXC 펀딩 레이트 수집 시작")
-                mexc = MEXCMonitor()
-                mexc.monitor_funding_rates()
-                logging.info("MEXC 펀딩 레이트 수집 완료")
-                
-                # 3. 펀딩 레이트 비교
-                logging.info("펀딩 레이트 비교 시작")
-                comparison_results = compare_funding_rates()
-                if comparison_results:
-                    logging.info("펀딩 레이트 비교 완료")
-                    
-                    # 4. 결과 전송
-                    logging.info("결과 전송 시작")
-                    telegram = TelegramSender()
-                    telegram.send_comparison_results(comparison_results)
-                    logging.info("결과 전송 완료")
-                else:
-                    logging.error("펀딩 레이트 비교 실패")
-                
-                # 30분 대기
-                logging.info("다음 실행까지 30분 대기...")
-                time.sleep(1800)  # 30분 = 1800초
-                
-            except Exception as e:
-                logging.error(f"실행 중 오류 발생: {e}")
-                logging.info("15분 후 재시도...")
-                time.sleep(900)  # 15분 대기 후 재시도
-                
+        FundingDaemon().run()
     except KeyboardInterrupt:
         logging.info("모니터링 시스템 종료")
     except Exception as e:
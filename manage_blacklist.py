@@ -3,40 +3,32 @@
 블랙리스트 관리 도구
 사용법:
 - python3 manage_blacklist.py list          # 현재 블랙리스트 보기
-- python3 manage_blacklist.py add <symbol>  # 블랙리스트에 추가
+- python3 manage_blacklist.py add <symbol>  # 블랙리스트에 추가 (glob `1000*`, 정규식 `re:...` 지원)
 - python3 manage_blacklist.py remove <symbol> # 블랙리스트에서 제거
 - python3 manage_blacklist.py clear         # 블랙리스트 초기화
+- python3 manage_blacklist.py quarantine list             # 자동 격리된 심볼 보기
+- python3 manage_blacklist.py quarantine show <symbol>    # 심볼 실패 통계 보기
+- python3 manage_blacklist.py quarantine release <symbol> # 격리 해제
+- python3 manage_blacklist.py quarantine promote <symbol> # 영구 블랙리스트로 이동
 """
 
-import json
 import sys
 from datetime import datetime
-
-BLACKLIST_FILE = "blacklist.json"
+from symbol_health import SymbolHealthTracker
+from blacklist_store import BLACKLIST_FILE, load_entries, normalize_entry, update_entries, validate_entry
 
 def load_blacklist():
     """블랙리스트 파일 로드"""
     try:
-        with open(BLACKLIST_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('blacklist', [])
-    except FileNotFoundError:
-        return []
+        return load_entries(BLACKLIST_FILE)
     except Exception as e:
         print(f"블랙리스트 파일 읽기 오류: {e}")
         return []
 
 def save_blacklist(blacklist):
-    """블랙리스트 파일 저장"""
-    data = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "description": "LBank 펀딩 레이트 수집에서 제외할 티커들의 블랙리스트",
-        "blacklist": blacklist
-    }
-    
+    """블랙리스트 파일 저장 (잠금 + 임시 파일 + rename으로 원자적 저장)"""
     try:
-        with open(BLACKLIST_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        update_entries(lambda _: blacklist, BLACKLIST_FILE)
         print(f"✅ 블랙리스트가 {BLACKLIST_FILE}에 저장되었습니다.")
     except Exception as e:
         print(f"❌ 블랙리스트 저장 오류: {e}")
@@ -53,37 +45,62 @@ def list_blacklist():
         print(f"  {i}. {symbol}")
 
 def add_to_blacklist(symbol):
-    """블랙리스트에 심볼 추가"""
+    """블랙리스트에 심볼 또는 패턴 추가 (예: win_usdt, 1000*, re:.*[35][ls]_usdt), 블랙리스트에 있게 되면 True"""
     if not symbol:
         print("❌ 심볼을 입력해주세요.")
-        return
+        return False
     
-    symbol = symbol.lower()
-    blacklist = load_blacklist()
+    symbol = normalize_entry(symbol)
+    try:
+        validate_entry(symbol)
+    except ValueError as e:
+        print(f"❌ 잘못된 정규식 규칙입니다 (추가하지 않음): {e}")
+        return False
+    added = []
     
-    if symbol in blacklist:
-        print(f"⚠️  {symbol}는 이미 블랙리스트에 있습니다.")
-        return
+    # 다른 프로세스의 수정과 겹치지 않도록 잠금 안에서 읽고 씀
+    def add(blacklist):
+        if symbol not in blacklist:
+            blacklist.append(symbol)
+            added.append(symbol)
+        return blacklist
+    
+    try:
+        update_entries(add, BLACKLIST_FILE)
+    except Exception as e:
+        print(f"❌ 블랙리스트 저장 오류: {e}")
+        return False
     
-    blacklist.append(symbol)
-    save_blacklist(blacklist)
+    if not added:
+        print(f"⚠️  {symbol}는 이미 블랙리스트에 있습니다.")
+        return True
     print(f"✅ {symbol}가 블랙리스트에 추가되었습니다.")
+    return True
 
 def remove_from_blacklist(symbol):
-    """블랙리스트에서 심볼 제거"""
+    """블랙리스트에서 심볼 또는 패턴 제거"""
     if not symbol:
         print("❌ 심볼을 입력해주세요.")
         return
     
-    symbol = symbol.lower()
-    blacklist = load_blacklist()
+    symbol = normalize_entry(symbol)
+    removed = []
     
-    if symbol not in blacklist:
-        print(f"⚠️  {symbol}는 블랙리스트에 없습니다.")
+    def remove(blacklist):
+        if symbol in blacklist:
+            blacklist.remove(symbol)
+            removed.append(symbol)
+        return blacklist
+    
+    try:
+        update_entries(remove, BLACKLIST_FILE)
+    except Exception as e:
+        print(f"❌ 블랙리스트 저장 오류: {e}")
         return
     
-    blacklist.remove(symbol)
-    save_blacklist(blacklist)
+    if not removed:
+        print(f"⚠️  {symbol}는 블랙리스트에 없습니다.")
+        return
     print(f"✅ {symbol}가 블랙리스트에서 제거되었습니다.")
 
 def clear_blacklist():
@@ -95,6 +112,93 @@ def clear_blacklist():
     else:
         print("❌ 블랙리스트 초기화가 취소되었습니다.")
 
+def _format_time(epoch):
+    if not epoch:
+        return "-"
+    return datetime.fromtimestamp(epoch).strftime("%Y-%m-%d %H:%M:%S")
+
+def list_quarantine():
+    """자동 격리된 심볼 출력"""
+    tracker = SymbolHealthTracker()
+    quarantined = tracker.quarantined()
+    if not quarantined:
+        print("📋 현재 격리된 심볼이 없습니다.")
+        return
+    
+    print(f"🔒 현재 격리된 심볼 ({len(quarantined)}개):")
+    for i, symbol in enumerate(quarantined, 1):
+        entry = tracker.get(symbol)
+        print(f"  {i}. {symbol} - 연속 실패 {entry['consecutive_failures']}회, "
+              f"해제 예정 {_format_time(entry['quarantined_until'])}")
+
+def show_quarantine(symbol):
+    """심볼 실패 통계 출력"""
+    tracker = SymbolHealthTracker()
+    entry = tracker.get(symbol.lower())
+    if not entry:
+        print(f"⚠️  {symbol}의 수집 기록이 없습니다.")
+        return
+    
+    status = "격리 중" if tracker.is_quarantined(symbol.lower()) else "정상"
+    print(f"📊 {symbol.lower()} ({status})")
+    print(f"  성공: {entry['successes']}회 / 실패: {entry['failures']}회")
+    print(f"  연속 실패: {entry['consecutive_failures']}회 / 격리 횟수: {entry['quarantine_count']}회")
+    print(f"  마지막 성공: {_format_time(entry['last_success'])}")
+    print(f"  마지막 실패: {_format_time(entry['last_failure'])} ({entry['last_error'] or '-'})")
+    print(f"  격리 해제 예정: {_format_time(entry['quarantined_until'])}")
+
+def release_quarantine(symbol):
+    """격리 해제"""
+    symbol = symbol.lower()
+    tracker = SymbolHealthTracker()
+    if not tracker.release(symbol):
+        print(f"⚠️  {symbol}의 수집 기록이 없습니다.")
+        return
+    tracker.save()
+    print(f"✅ {symbol}의 격리가 해제되었습니다.")
+
+def promote_quarantine(symbol):
+    """격리된 심볼을 영구 블랙리스트로 이동"""
+    symbol = symbol.lower()
+    tracker = SymbolHealthTracker()
+    if symbol not in tracker.symbols:
+        print(f"⚠️  {symbol}의 수집 기록이 없습니다.")
+        return
+    # 블랙리스트에 넣지 못했으면 격리도 그대로 둠 (기록을 지우면 격리가 풀림)
+    if not add_to_blacklist(symbol):
+        print(f"❌ {symbol}를 블랙리스트에 추가하지 못해 격리 상태를 유지합니다.")
+        return
+    tracker.forget(symbol)
+    tracker.save()
+    print(f"✅ {symbol}가 격리 목록에서 영구 블랙리스트로 이동되었습니다.")
+
+def handle_quarantine(args):
+    """quarantine 하위 명령 처리"""
+    if not args:
+        show_usage()
+        return
+    
+    command = args[0].lower()
+    if command == "list":
+        list_quarantine()
+        return
+    
+    if command not in ("show", "release", "promote"):
+        print(f"❌ 알 수 없는 명령어: quarantine {command}")
+        show_usage()
+        return
+    
+    if len(args) < 2:
+        print("❌ 심볼을 입력해주세요.")
+        return
+    
+    if command == "show":
+        show_quarantine(args[1])
+    elif command == "release":
+        release_quarantine(args[1])
+    else:
+        promote_quarantine(args[1])
+
 def show_usage():
     """사용법 출력"""
     print("""
@@ -105,11 +209,18 @@ def show_usage():
   python3 manage_blacklist.py add <symbol>            # 블랙리스트에 추가
   python3 manage_blacklist.py remove <symbol>         # 블랙리스트에서 제거
   python3 manage_blacklist.py clear                   # 블랙리스트 초기화
+  python3 manage_blacklist.py quarantine list         # 자동 격리된 심볼 보기
+  python3 manage_blacklist.py quarantine show <symbol>     # 심볼 실패 통계 보기
+  python3 manage_blacklist.py quarantine release <symbol>  # 격리 해제
+  python3 manage_blacklist.py quarantine promote <symbol>  # 영구 블랙리스트로 이동
 
 예시:
   python3 manage_blacklist.py add win_usdt
+  python3 manage_blacklist.py add "1000*"
+  python3 manage_blacklist.py add "re:.*[35][ls]_usdt"
   python3 manage_blacklist.py remove btc_usdt
   python3 manage_blacklist.py list
+  python3 manage_blacklist.py quarantine promote qi_usdt
 """)
 
 def main():
@@ -133,6 +244,8 @@ def main():
         remove_from_blacklist(sys.argv[2])
     elif command == "clear":
         clear_blacklist()
+    elif command == "quarantine":
+        handle_quarantine(sys.argv[2:])
     else:
         print(f"❌ 알 수 없는 명령어: {command}")
         show_usage()
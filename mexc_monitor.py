@@ -1,48 +1,206 @@
 import requests
-import json
+import math
 import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Optional, List
 import logging
+from funding_record import FundingRecord, format_countdown
+from log_setup import setup_logging
+from write_behind import get_writer
+
+# 티커 응답에서 유지할 숫자 필드 (API 키 -> 컬럼 이름)
+TICKER_FIELDS = {
+    "lastPrice": "last_price",
+    "bid1": "bid1",
+    "ask1": "ask1",
+    "indexPrice": "index_price",
+    "fairPrice": "fair_price",
+    "holdVol": "hold_vol",
+    "volume24": "volume24",
+    "amount24": "amount24",
+    "riseFallRate": "rise_fall_rate",
+}
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class MexcContractSnapshot:
+    """MEXC 전체 계약 스냅샷을 컬럼형 배열로 보관 (한 번 파싱해서 모든 소비자가 공유)"""
+
+    def __init__(self):
+        self.fetched_at = time.time()
+        self.symbols: List[str] = []          # 소문자 심볼 (예: btc_usdt)
+        self.index: Dict[str, int] = {}
+        self.funding_rate = array('d')        # 퍼센트 단위
+        self.next_settle_time = array('q')    # epoch ms (0 = 알 수 없음)
+        self.funding_interval = array('l')    # 초
+        self.columns = {name: array('d') for name in TICKER_FIELDS.values()}
+
+    @classmethod
+    def from_payloads(cls, tickers: List[Dict], funding: List[Dict]) -> "MexcContractSnapshot":
+        """Build the snapshot from the ticker and funding-rate endpoint payloads"""
+        snapshot = cls()
+        funding_by_symbol = {item["symbol"]: item for item in funding or []}
+
+        for ticker in tickers:
+            if snapshot.apply_ticker(ticker) is None:
+                continue
+            # funding-rate 엔드포인트 값이 있으면 우선 사용 (정산 주기와 같은 시점의 값)
+            info = funding_by_symbol.get(ticker["symbol"])
+            if info:
+                snapshot.apply_funding(info)
+        return snapshot
+
+    def _slot(self, symbol: str) -> int:
+        """Row index for a contract, appending an empty row for unseen ones"""
+        i = self.index.get(symbol)
+        if i is None:
+            i = self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.funding_rate.append(float("nan"))
+            self.next_settle_time.append(0)
+            self.funding_interval.append(8 * 3600)
+            for values in self.columns.values():
+                values.append(float("nan"))
+        return i
+
+    def apply_ticker(self, ticker: Dict) -> Optional[int]:
+        """Write one ticker (REST or websocket push) into its row in place"""
+        if "fundingRate" not in ticker:
+            return None
+        i = self._slot(ticker["symbol"].lower())
+        self.funding_rate[i] = _to_float(ticker["fundingRate"]) * 100
+        for key, column in TICKER_FIELDS.items():
+            if key in ticker:
+                self.columns[column][i] = _to_float(ticker[key])
+        return i
+
+    def apply_funding(self, info: Dict) -> int:
+        """Write funding-rate endpoint / push.funding.rate fields into a row"""
+        i = self._slot(info["symbol"].lower())
+        rate = info.get("fundingRate", info.get("rate"))
+        if rate is not None:
+            self.funding_rate[i] = _to_float(rate) * 100
+        if info.get("nextSettleTime"):
+            self.next_settle_time[i] = int(info["nextSettleTime"])
+        if info.get("collectCycle"):
+            self.funding_interval[i] = int(info["collectCycle"]) * 3600
+        return i
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def countdown(self, i: int, now: Optional[float] = None) -> str:
+        """Time to next settlement in the same '/HH:MM:SS' form LBank shows"""
+        settle_ms = self.next_settle_time[i]
+        if not settle_ms:
+            return f"{self.funding_interval[i] // 3600}h"
+        return format_countdown(settle_ms / 1000 - (now or time.time()))
+
+    def row(self, i: int) -> Dict:
+        record = {
+            "symbol": self.symbols[i],
+            "funding_rate": None if math.isnan(self.funding_rate[i]) else round(self.funding_rate[i], 6),
+            "countdown": self.countdown(i, self.fetched_at),
+            "next_settle_time": self.next_settle_time[i],
+            "funding_interval": self.funding_interval[i],
+            "timestamp": datetime.fromtimestamp(self.fetched_at).strftime("%Y-%m-%d %H:%M:%S")
+        }
+        for column, values in self.columns.items():
+            value = values[i]
+            record[column] = None if math.isnan(value) else value
+        return record
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        i = self.index.get(symbol)
+        return self.row(i) if i is not None else None
+
+    def to_records(self) -> List[Dict]:
+        return [self.row(i) for i in range(len(self.symbols))]
+
+    def funding_record(self, i: int) -> Optional[FundingRecord]:
+        """Typed funding record for one row (None while the rate is unknown)"""
+        if math.isnan(self.funding_rate[i]):
+            return None
+        return FundingRecord(self.symbols[i], self.funding_rate[i], int(self.fetched_at * 1e9),
+                             self.next_settle_time[i], self.funding_interval[i])
+
+    def funding_records(self) -> List[FundingRecord]:
+        records = (self.funding_record(i) for i in range(len(self.symbols)))
+        return [record for record in records if record is not None]
+
 
 class MEXCMonitor:
     def __init__(self):
         self.base_url = "https://contract.mexc.com"
         self.funding_file = "mexc_funding.json"
+        self.snapshot: Optional[MexcContractSnapshot] = None
+        self.snapshot_ttl = 30  # 초 단위, 이 시간 안에는 모든 소비자가 같은 스냅샷을 재사용
+        self.stream = None  # MexcStream이 연결되어 있으면 네트워크 없이 최신 값 사용
         self.logger = logging.getLogger(__name__)
 
-    def get_funding_rates(self) -> Optional[List[Dict]]:
-        """Get MEXC futures funding rates"""
+    def _get_data(self, endpoint: str) -> List[Dict]:
+        url = self.base_url + endpoint
+        resp = requests.get(url, timeout=10)
+        resp.raise_for_status()
+        data = resp.json()
+        if not data.get("success"):
+            raise ValueError(f"API response failed for {endpoint}: {data.get('message')}")
+        return data["data"]
+
+    def fetch_snapshot(self) -> Optional[MexcContractSnapshot]:
+        """Fetch ticker and funding-rate payloads in parallel and parse them once"""
         try:
-            endpoint = "/api/v1/contract/ticker"
-            url = self.base_url + endpoint
-            self.logger.info(f"Fetching funding rates from {url}")
-            
-            resp = requests.get(url, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            if data.get("success"):
-                funding_rates = []
-                for ticker in data["data"]:
-                    if "fundingRate" in ticker:
-                        # 심볼 변환: 대문자 -> 소문자, _USDT -> _usdt
-                        symbol = ticker["symbol"].lower().replace('_usdt', '_usdt')
-                        funding_rate = float(ticker["fundingRate"]) * 100  # 퍼센트로 변환
-                        funding_rates.append({
-                            "symbol": symbol,
-                            "funding_rate": funding_rate,
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
-                self.logger.info(f"Successfully fetched {len(funding_rates)} funding rates")
-                return funding_rates
-            else:
-                self.logger.error(f"API response failed: {data.get('message')}")
-                return None
-                
+            self.logger.info(f"Fetching contract snapshot from {self.base_url}")
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                tickers = executor.submit(self._get_data, "/api/v1/contract/ticker")
+                funding = executor.submit(self._get_data, "/api/v1/contract/funding_rate")
+                ticker_data = tickers.result()
+                try:
+                    funding_data = funding.result()
+                except Exception as e:
+                    # 정산 정보가 없어도 티커의 펀딩 레이트로 계속 진행
+                    self.logger.warning(f"Funding-rate endpoint failed, using ticker rates only: {e}")
+                    funding_data = []
+
+            self.snapshot = MexcContractSnapshot.from_payloads(ticker_data, funding_data)
+            self.logger.info(f"Successfully fetched {len(self.snapshot)} contracts")
+            return self.snapshot
         except Exception as e:
-            self.logger.error(f"Error fetching funding rates: {e}")
+            self.logger.error(f"Error fetching contract snapshot: {e}")
+            return None
+
+    def get_snapshot(self, max_age: Optional[float] = None) -> Optional[MexcContractSnapshot]:
+        """Return the cached snapshot if fresh enough, otherwise fetch a new one"""
+        max_age = self.snapshot_ttl if max_age is None else max_age
+        if self.snapshot and time.time() - self.snapshot.fetched_at <= max_age:
+            return self.snapshot
+        return self.fetch_snapshot()
+
+    def get_funding_rates(self) -> Optional[List[Dict]]:
+        """Get MEXC futures funding rates"""
+        if self.stream is not None and self.stream.is_fresh():
+            return self.stream.records()
+        snapshot = self.get_snapshot()
+        if snapshot is None:
             return None
+        return snapshot.to_records()
+
+    def get_funding_records(self) -> Optional[List[FundingRecord]]:
+        """Funding rates as typed records (comparison, statistics, scheduler)"""
+        if self.stream is not None and self.stream.is_fresh():
+            return self.stream.funding_records()
+        snapshot = self.get_snapshot()
+        if snapshot is None:
+            return None
+        return snapshot.funding_records()
 
     def save_funding_rates(self, funding_rates: List[Dict]):
         """Save funding rates to JSON file"""
@@ -51,19 +209,18 @@ class MEXCMonitor:
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "funding_rates": funding_rates
             }
-            
-            with open(self.funding_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            self.logger.info(f"Saved {len(funding_rates)} funding rates to {self.funding_file}")
-            
+            get_writer().submit(self.funding_file, data)
+
+            self.logger.info(f"Queued {len(funding_rates)} funding rates for {self.funding_file}")
+
         except Exception as e:
             self.logger.error(f"Error saving funding rates: {e}")
 
     def monitor_funding_rates(self):
         """Monitor funding rates"""
         self.logger.info("Starting MEXC funding rate monitoring")
-        
+
+        funding_rates = None
         try:
             funding_rates = self.get_funding_rates()
             if funding_rates:
@@ -71,16 +228,19 @@ class MEXCMonitor:
                 self.logger.info("MEXC funding rate collection completed")
             else:
                 self.logger.error("No funding rates were fetched")
-                
+
         except Exception as e:
             self.logger.error(f"Error in monitoring loop: {e}")
-            
+
         finally:
             self.logger.info("MEXC monitoring process completed")
 
+        return funding_rates
+
 def main():
+    setup_logging()
     monitor = MEXCMonitor()
     monitor.monitor_funding_rates()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+MEXC 계약 티커 웹소켓 스트림 (메모리 최신 값 테이블)
+사용법:
+- python3 mexc_stream.py                                # 실시간 구독, 30초마다 상태 출력
+- python3 mexc_stream.py --record mexc_frames.jsonl     # 수신 프레임 기록
+- python3 mexc_stream.py --replay mexc_frames.jsonl     # 기록한 프레임을 네트워크 없이 재생
+- python3 mexc_stream.py --url ws://127.0.0.1:8767/edge --rest-url http://127.0.0.1:8767  # 로컬 스탠드인 (standin_mexc.py)
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from funding_record import FundingRecord
+from log_setup import setup_logging
+from mexc_monitor import MEXCMonitor, MexcContractSnapshot
+
+WS_URL = "wss://contract.mexc.com/edge"
+
+logger = logging.getLogger(__name__)
+
+
+class MexcStream:
+    """sub.tickers 구독으로 계약별 최신 값을 유지하고, 끊기거나 공백이 생기면 REST로 보정"""
+
+    def __init__(self, monitor: MEXCMonitor = None, url: str = WS_URL, ping_interval: float = 15,
+                 gap_timeout: float = 30, max_backoff: float = 60, record_file: str = None):
+        self.monitor = monitor or MEXCMonitor()
+        self.url = url
+        self.ping_interval = ping_interval
+        self.gap_timeout = gap_timeout  # 이 시간 동안 push가 없으면 재연결 + REST 보정
+        self.max_backoff = max_backoff
+        self.record_file = record_file
+        self.snapshot: Optional[MexcContractSnapshot] = None
+        self.lock = threading.Lock()
+        self.listeners: List[Callable] = []
+        self.last_message = 0.0
+        self.stats = {"messages": 0, "updates": 0, "reconnects": 0, "resyncs": 0}
+        self._stop = threading.Event()
+        self._thread = None
+        self._ws = None
+
+    # 소비자 측 (네트워크 호출 없음)
+
+    def subscribe(self, callback: Callable[[List[str], "MexcStream"], None]):
+        """Register a callback receiving the list of updated symbols"""
+        self.listeners.append(callback)
+
+    def is_fresh(self, max_age: Optional[float] = None) -> bool:
+        max_age = self.gap_timeout if max_age is None else max_age
+        return self.snapshot is not None and time.time() - self.last_message <= max_age
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        with self.lock:
+            return self.snapshot.get(symbol) if self.snapshot else None
+
+    def records(self) -> List[Dict]:
+        with self.lock:
+            return self.snapshot.to_records() if self.snapshot else []
+
+    def get_record(self, symbol: str) -> Optional[FundingRecord]:
+        with self.lock:
+            if self.snapshot is None or symbol not in self.snapshot.index:
+                return None
+            return self.snapshot.funding_record(self.snapshot.index[symbol])
+
+    def funding_records(self) -> List[FundingRecord]:
+        with self.lock:
+            return self.snapshot.funding_records() if self.snapshot else []
+
+    # 수신 처리
+
+    def _notify(self, symbols: List[str]):
+        for callback in self.listeners:
+            try:
+                callback(symbols, self)
+            except Exception as e:
+                logger.error(f"Stream listener failed: {e}")
+
+    def handle_message(self, raw: str) -> List[str]:
+        """Apply one websocket frame to the table; returns the updated symbols"""
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.warning(f"Ignoring non-JSON frame: {raw[:100]}")
+            return []
+
+        channel = message.get("channel", "")
+        data = message.get("data")
+        self.stats["messages"] += 1
+        if channel.startswith("push."):
+            # pong/구독 응답은 제외: 서버가 연결만 유지하고 push를 멈춘 경우도 공백으로 감지
+            self.last_message = time.time()
+
+        updated = []
+        if channel in ("push.tickers", "push.ticker"):
+            items = data if isinstance(data, list) else [data]
+            with self.lock:
+                if self.snapshot is None:
+                    self.snapshot = MexcContractSnapshot()
+                for ticker in items:
+                    i = self.snapshot.apply_ticker(ticker)
+                    if i is not None:
+                        updated.append(self.snapshot.symbols[i])
+                self.snapshot.fetched_at = self.last_message
+        elif channel == "push.funding.rate":
+            with self.lock:
+                # 티커로 본 적 없는 계약은 펀딩 정보만으로 행을 만들지 않음
+                if self.snapshot is not None and data["symbol"].lower() in self.snapshot.index:
+                    i = self.snapshot.apply_funding(data)
+                    updated.append(self.snapshot.symbols[i])
+        elif channel == "rs.error":
+            logger.warning(f"Stream error response: {data}")
+
+        if updated:
+            self.stats["updates"] += len(updated)
+            self._notify(updated)
+        return updated
+
+    def resync(self) -> bool:
+        """Replace the table with a REST snapshot to cover any gap in the stream"""
+        snapshot = self.monitor.fetch_snapshot()
+        if snapshot is None:
+            return False
+        with self.lock:
+            self.snapshot = snapshot
+        self.last_message = time.time()
+        self.stats["resyncs"] += 1
+        logger.info(f"🔄 Resynced {len(snapshot)} contracts from REST")
+        self._notify(list(snapshot.symbols))
+        return True
+
+    def _record(self, raw: str):
+        with open(self.record_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"t": time.time(), "frame": raw}, ensure_ascii=False) + "\n")
+
+    def replay(self, path: str, speed: float = 0) -> int:
+        """Feed recorded frames through handle_message (speed 0 = as fast as possible)"""
+        count = 0
+        previous = None
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if speed and previous is not None:
+                    time.sleep(max(0.0, entry["t"] - previous) / speed)
+                previous = entry["t"]
+                self.handle_message(entry["frame"])
+                count += 1
+        return count
+
+    # 연결 관리
+
+    def _connect_and_read(self, websocket):
+        ws = websocket.create_connection(self.url, timeout=1)
+        self._ws = ws
+        try:
+            ws.send(json.dumps({"method": "sub.tickers", "param": {}}))
+            logger.info(f"📡 Subscribed to tickers on {self.url}")
+            # 구독 후 REST로 보정해야 연결 전/끊긴 동안의 공백이 메워짐
+            self.resync()
+            self.last_message = time.time()
+            last_ping = time.time()
+
+            while not self._stop.is_set():
+                if time.time() - last_ping >= self.ping_interval:
+                    ws.send(json.dumps({"method": "ping"}))
+                    last_ping = time.time()
+                try:
+                    raw = ws.recv()
+                except websocket.WebSocketTimeoutException:
+                    raw = None
+                if raw:
+                    if self.record_file:
+                        self._record(raw)
+                    self.handle_message(raw)
+                elif raw == "":
+                    raise ConnectionError("connection closed by server")
+                if time.time() - self.last_message > self.gap_timeout:
+                    raise TimeoutError(f"no frames for {self.gap_timeout:.0f}s")
+        finally:
+            self._ws = None
+            ws.close()
+
+    def _run(self):
+        try:
+            import websocket
+        except ImportError:
+            logger.warning("websocket-client not installed, MEXC stays on REST polling")
+            return
+
+        backoff = 1
+        while not self._stop.is_set():
+            started = time.time()
+            try:
+                self._connect_and_read(websocket)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                self.stats["reconnects"] += 1
+                # 한동안 잘 유지된 연결이었다면 백오프를 초기화
+                if time.time() - started > self.max_backoff:
+                    backoff = 1
+                logger.warning(f"Stream disconnected ({e}), reconnecting in {backoff}s")
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mexc-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread:
+            self._thread.join(timeout=5)
+        logger.info(f"MEXC stream stopped: {self.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MEXC 계약 티커 웹소켓 스트림")
+    parser.add_argument("--url", default=WS_URL, help="웹소켓 주소 (로컬 스탠드인 서버용)")
+    parser.add_argument("--rest-url", help="REST 보정에 쓸 주소 (로컬 스탠드인 서버용)")
+    parser.add_argument("--record", help="수신 프레임을 JSONL로 기록")
+    parser.add_argument("--replay", help="기록한 프레임 파일을 재생")
+    parser.add_argument("--speed", type=float, default=0, help="재생 속도 배율 (0 = 최대)")
+    parser.add_argument("--interval", type=float, default=30, help="상태 출력 간격 (초)")
+    args = parser.parse_args()
+
+    setup_logging()
+    monitor = MEXCMonitor()
+    if args.rest_url:
+        monitor.base_url = args.rest_url.rstrip("/")
+    stream = MexcStream(monitor, url=args.url, record_file=args.record)
+
+    if args.replay:
+        count = stream.replay(args.replay, args.speed)
+        print(f"✅ Replayed {count} frames: {len(stream.records())} contracts, {stream.stats}")
+        return
+
+    stream.start()
+    try:
+        while True:
+            time.sleep(args.interval)
+            state = "fresh" if stream.is_fresh() else "stale"
+            print(f"📊 {len(stream.records())} contracts ({state}), {stream.stats}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.stop()
+
+
+if __name__ == "__main__":
+    main()
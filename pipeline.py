@@ -0,0 +1,228 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from log_setup import init_worker_logging, start_worker_logging, symbol_context
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()  # 파싱 대기열 종료 표시
+
+
+def _timed_parse(parse: Callable, symbol: str, html: str):
+    """Runs in a pool process: parse and report how long it took"""
+    start = time.perf_counter()
+    with symbol_context(symbol):
+        record = parse(symbol, html)
+    return record, time.perf_counter() - start
+
+
+class StageStats:
+    """단계별 처리 건수, 바쁜 시간, 대기열 길이 (이용률 = 바쁜 시간 / (워커 수 x 경과 시간))"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0      # 다음 단계 대기열이 가득 차서 기다린 시간 (역압)
+        self.depth_max = 0
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.lock = threading.Lock()
+
+    def add(self, busy: float, blocked: float = 0.0):
+        with self.lock:
+            self.items += 1
+            self.busy += busy
+            self.blocked += blocked
+
+    def sample(self, depth: int):
+        with self.lock:
+            self.depth_max = max(self.depth_max, depth)
+            self.depth_total += depth
+            self.depth_samples += 1
+
+    def summary(self, elapsed: float) -> str:
+        utilisation = self.busy / (self.workers * elapsed) * 100 if elapsed > 0 else 0
+        text = f"{self.name} {self.items} items, {utilisation:.0f}% busy of {self.workers}"
+        if self.blocked:
+            text += f", blocked {self.blocked:.1f}s"
+        if self.depth_samples:
+            text += f", queue max {self.depth_max} avg {self.depth_total / self.depth_samples:.1f}"
+        return text
+
+
+class CollectionPipeline:
+    """브라우저 로드(스레드) -> HTML 파싱(프로세스 풀) -> 결과 집계(호출 스레드) 단계 파이프라인, 단계 사이는 상한 있는 대기열"""
+
+    def __init__(self, fetch: Callable[[str], Tuple[Optional[object], Optional[str]]],
+                 parse: Callable[[str, str], Optional[object]], fetch_workers: int,
+                 parse_workers: int = 0, queue_size: int = 20):
+        # fetch(symbol) -> (record, None) 또는 파싱이 필요한 (None, html)
+        self.fetch = fetch
+        self.parse = parse  # 모듈 최상위 함수여야 함 (프로세스로 전달)
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.pool_lock = threading.Lock()  # 디스패처의 풀 재생성과 close() 사이
+        self.log_listener = None
+
+    def start(self):
+        with self.pool_lock:
+            if self.pool is None:
+                # 브라우저 스레드가 도는 중에 fork하지 않도록 spawn 사용
+                context = multiprocessing.get_context("spawn")
+                if self.log_listener is None:
+                    # spawn된 프로세스는 로깅 설정이 없으므로 레코드를 부모로 보내 같은 핸들러로 출력
+                    self.log_queue, self.log_listener = start_worker_logging(context)
+                self.pool = ProcessPoolExecutor(self.parse_workers, mp_context=context,
+                                                initializer=init_worker_logging,
+                                                initargs=(self.log_queue, logging.getLogger().getEffectiveLevel()))
+
+    def close(self):
+        with self.pool_lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=True, cancel_futures=True)
+                self.pool = None
+            if self.log_listener is not None:
+                self.log_listener.stop()
+                self.log_listener = None
+
+    def _restart_pool(self) -> bool:
+        """Replace a pool broken by a crashed worker; False when a new one cannot be started"""
+        with self.pool_lock:
+            broken, self.pool = self.pool, None
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+        try:
+            self.start()
+            return True
+        except Exception as e:
+            logger.error(f"❌ Could not restart parse pool: {e}")
+            return False
+
+    def _submit(self, symbol: str, html: str, done: Callable[[Future], None]) -> bool:
+        """Hand one page to the pool, restarting it once if it broke; False when the pool cannot take work"""
+        for attempt in range(2):
+            try:
+                self.pool.submit(_timed_parse, self.parse, symbol, html).add_done_callback(done)
+                return True
+            except (BrokenProcessPool, RuntimeError, AttributeError) as e:
+                # BrokenProcessPool: 워커가 죽음 / RuntimeError: 종료된 풀 / AttributeError: close()로 pool이 None
+                if attempt or not self._restart_pool():
+                    logger.error(f"❌ Parse pool unavailable ({e!r}), parsing in the dispatcher thread")
+                    return False
+                logger.warning(f"⚠️ Parse pool broken ({e!r}), restarted it")
+        return False
+
+    def _fetch_stage(self, symbol: str, parse_queue: queue.Queue, results: queue.Queue,
+                     stats: Dict[str, StageStats]):
+        start = time.perf_counter()
+        try:
+            record, html = self.fetch(symbol)
+        except Exception as e:
+            stats["fetch"].add(time.perf_counter() - start)
+            results.put((symbol, None, str(e)))
+            return
+        busy = time.perf_counter() - start
+        if html is None:
+            stats["fetch"].add(busy)
+            results.put((symbol, record, None if record else "funding rate not found"))
+            return
+        # 파싱 대기열이 가득 차면 여기서 기다림 (브라우저가 파서보다 앞서가지 않도록)
+        waited = time.perf_counter()
+        parse_queue.put((symbol, html))
+        stats["fetch"].add(busy, time.perf_counter() - waited)
+        stats["parse"].sample(parse_queue.qsize())
+
+    def _dispatch_stage(self, parse_queue: queue.Queue, results: queue.Queue,
+                        stats: Dict[str, StageStats]):
+        # 프로세스 풀에 넣는 작업 수도 제한 (대기열에서 꺼낸 HTML이 풀 안에 무한히 쌓이지 않도록)
+        slots = threading.Semaphore(self.parse_workers * 2)
+        in_thread = False  # 풀을 다시 띄우지 못하면 이번 실행의 나머지는 여기서 직접 파싱
+        while True:
+            item = parse_queue.get()
+            if item is _DONE:
+                break
+            symbol, html = item
+
+            def done(future: Future, symbol=symbol):
+                slots.release()
+                try:
+                    record, seconds = future.result()
+                    stats["parse"].add(seconds)
+                    results.put((symbol, record, None if record else "funding rate not found"))
+                except Exception as e:
+                    # 풀이 깨지면 안에 있던 작업은 BrokenProcessPool로 끝남 → 실패 결과로 보고
+                    stats["parse"].add(0.0)
+                    results.put((symbol, None, str(e)))
+
+            if not in_thread:
+                slots.acquire()
+                if self._submit(symbol, html, done):
+                    continue
+                slots.release()
+                in_thread = True
+            # 디스패처가 죽으면 가져오기 스레드는 대기열에, run()은 결과에 영원히 막히므로 여기서 끝까지 처리
+            try:
+                record, seconds = _timed_parse(self.parse, symbol, html)
+                stats["parse"].add(seconds)
+                results.put((symbol, record, None if record else "funding rate not found"))
+            except Exception as e:
+                stats["parse"].add(0.0)
+                results.put((symbol, None, str(e)))
+
+    def run(self, symbols: List[str], on_submit: Callable[[Dict[Future, str]], None] = None
+            ) -> Iterator[Tuple[str, Optional[object], Optional[str], bool]]:
+        """Yield (symbol, record, error, cancelled) as results reach the sink, then log stage utilisation
+
+        on_submit receives the fetch futures (so the blacklist watcher can cancel queued loads).
+        """
+        self.start()
+        started = time.perf_counter()
+        parse_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        results: queue.Queue = queue.Queue()
+        stats = {
+            "fetch": StageStats("fetch", self.fetch_workers),
+            "parse": StageStats("parse", self.parse_workers),
+            "sink": StageStats("sink", 1),
+        }
+        dispatcher = threading.Thread(target=self._dispatch_stage, args=(parse_queue, results, stats),
+                                      name="parse-dispatch", daemon=True)
+        dispatcher.start()
+
+        def report_cancelled(future: Future, symbol: str):
+            # 취소된 로드도 결과로 알림 (집계 단계가 끝을 알 수 있도록)
+            if future.cancelled():
+                results.put((symbol, None, None, True))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+                futures = {executor.submit(self._fetch_stage, symbol, parse_queue, results, stats): symbol
+                           for symbol in symbols}
+                if on_submit:
+                    on_submit(futures)
+                for future, symbol in futures.items():
+                    future.add_done_callback(lambda f, symbol=symbol: report_cancelled(f, symbol))
+
+                for _ in range(len(symbols)):
+                    item = results.get()
+                    stats["sink"].sample(results.qsize())
+                    start = time.perf_counter()
+                    yield item if len(item) == 4 else (*item, False)
+                    stats["sink"].add(time.perf_counter() - start)
+        finally:
+            # 로드가 모두 끝난 뒤에 종료 표시 (남은 HTML은 디스패처가 마저 넘김)
+            parse_queue.put(_DONE)
+            dispatcher.join()
+
+        elapsed = time.perf_counter() - started
+        logger.info("🔀 Pipeline: " + "; ".join(stage.summary(elapsed) for stage in stats.values()))
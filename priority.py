@@ -0,0 +1,98 @@
+import json
+import logging
+import math
+import time
+from typing import Dict, List, Optional
+
+from funding_record import FundingRecord
+
+COMPARISON_FILE = "funding_comparison.json"
+
+# 점수 가중치 (각 항목은 0~1로 정규화)
+DEFAULT_WEIGHTS = {
+    "spread": 0.4,      # 직전 사이클의 거래소 간 차이
+    "settlement": 0.3,  # 다음 정산까지 남은 시간 (가까울수록 높음)
+    "turnover": 0.2,    # 24시간 거래대금
+    "age": 0.1,         # 마지막 수집 후 지난 시간
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _rank_scores(values: Dict[str, float]) -> Dict[str, float]:
+    """Percentile rank in [0, 1] (robust to the heavy tails of spreads and turnover)"""
+    ordered = sorted(values, key=values.get)
+    if len(ordered) < 2:
+        return {symbol: 1.0 for symbol in ordered}
+    return {symbol: i / (len(ordered) - 1) for i, symbol in enumerate(ordered)}
+
+
+class SymbolPrioritizer:
+    """사이클 안에서 중요한 심볼(큰 차이, 정산 임박, 거래대금, 오래된 데이터)을 먼저 수집하도록 순서를 정함"""
+
+    def __init__(self, weights: Dict[str, float] = None, settlement_horizon: float = 3600,
+                 max_age: float = 2 * 3600):
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.settlement_horizon = settlement_horizon  # 이보다 먼 정산은 0점
+        self.max_age = max_age                        # 이보다 오래된 데이터는 만점
+        self.spreads: Dict[str, float] = {}
+
+    def update_spreads(self, spreads: Dict[str, float]):
+        """Latest cross-exchange spread per symbol (the daemon passes its spread index)"""
+        self.spreads = {symbol: abs(spread) for symbol, spread in spreads.items()}
+
+    def load_spreads(self, path: str = COMPARISON_FILE):
+        """Fall back to the last saved comparison when running outside the daemon"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                comparisons = json.load(f).get('comparisons', [])
+            self.update_spreads({r['symbol']: r['spread'] for r in comparisons if 'spread' in r})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Error reading {path}: {e}")
+
+    def scores(self, tickers: List[Dict], latest: Dict[str, FundingRecord],
+               now: Optional[float] = None) -> Dict[str, float]:
+        """Weighted score per symbol; higher is collected first"""
+        now = now or time.time()
+        symbols = [ticker['symbol'] for ticker in tickers if ticker.get('symbol')]
+
+        spread = _rank_scores({s: self.spreads[s] for s in symbols if s in self.spreads})
+        turnover = {}
+        for ticker in tickers:
+            try:
+                turnover[ticker['symbol']] = float(ticker.get('ticker', {}).get('turnover') or 0)
+            except (KeyError, TypeError, ValueError):
+                continue
+        turnover = _rank_scores(turnover)
+
+        scores = {}
+        for symbol in symbols:
+            record = latest.get(symbol)
+            settlement = age = 0.0
+            if record is None:
+                age = 1.0  # 한 번도 수집하지 못한 심볼
+            else:
+                age = min((now - record.ts_ns / 1e9) / self.max_age, 1.0)
+                if record.next_settle_ms:
+                    # 지난 정산 시각은 주기만큼 앞으로 이동
+                    settle_at = record.next_settle_ms / 1000
+                    if settle_at <= now:
+                        settle_at += math.ceil((now - settle_at) / record.interval) * record.interval
+                    settlement = max(0.0, 1 - (settle_at - now) / self.settlement_horizon)
+            scores[symbol] = (self.weights["spread"] * spread.get(symbol, 0.0)
+                              + self.weights["settlement"] * settlement
+                              + self.weights["turnover"] * turnover.get(symbol, 0.0)
+                              + self.weights["age"] * max(age, 0.0))
+        return scores
+
+    def order(self, tickers: List[Dict], latest: Dict[str, FundingRecord],
+              now: Optional[float] = None) -> List[Dict]:
+        """Tickers sorted by descending score (ties keep file order)"""
+        scores = self.scores(tickers, latest, now)
+        ordered = sorted(tickers, key=lambda ticker: -scores.get(ticker.get('symbol'), 0.0))
+        if ordered:
+            top = ", ".join(f"{t['symbol']} {scores[t['symbol']]:.2f}" for t in ordered[:5] if t.get('symbol'))
+            logger.info(f"🎯 Priority order for {len(ordered)} symbols, top: {top}")
+        return ordered
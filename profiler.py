@@ -0,0 +1,176 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional
+
+PROFILE_DIR = "profiles"
+
+logger = logging.getLogger(__name__)
+
+_profiler: Optional["CycleProfiler"] = None
+_profiler_lock = threading.Lock()
+
+
+class ThreadSampler:
+    """모든 스레드의 스택을 주기적으로 샘플링해 collapsed stack 형식으로 집계 (워커 스레드까지 포함)"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)).replace(" ", "_"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed format ('frame;frame;frame count'), for flamegraph.pl or speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class CycleProfiler:
+    """수집 사이클 프로파일링 (cProfile + 스레드 샘플링 + 배치별 tracemalloc 차이), 사이클마다 profiles/에 저장"""
+
+    def __init__(self, directory: str = PROFILE_DIR, sample_interval: float = 0.01,
+                 top: int = 25, frames: int = 10):
+        self.directory = directory
+        self.sample_interval = sample_interval
+        self.top = top          # 리포트에 남길 상위 함수/할당 위치 수
+        self.frames = frames    # tracemalloc이 보관할 스택 깊이
+        self.enabled = False
+        self.active = False
+        self._cycle_name = ""
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[ThreadSampler] = None
+        self._snapshot = None
+        self._alloc_report: List[str] = []
+        self._lock = threading.Lock()
+
+    def toggle(self, signum=None, frame=None):
+        """Flip profiling on/off; takes effect at the next cycle boundary (SIGUSR1 handler)"""
+        self.enabled = not self.enabled
+        logger.info(f"🔬 Profiling {'enabled' if self.enabled else 'disabled'} (from next cycle)")
+
+    def install_signal(self, signum: int = getattr(signal, "SIGUSR1", None)):
+        if signum is not None:
+            signal.signal(signum, self.toggle)
+
+    def checkpoint(self, label: str):
+        """Record the allocation diff since the previous checkpoint (per batch / per stage)"""
+        if not self.active:
+            return
+        with self._lock:
+            # filter_traces는 순수 Python이라 느리므로 스냅샷 전체를 그대로 비교
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            lines = [f"== {label}: traced {current / 1024 / 1024:.1f} MB (peak {peak / 1024 / 1024:.1f} MB)"]
+            for stat in snapshot.compare_to(self._snapshot, "lineno")[:self.top]:
+                lines.append(f"  {stat}")
+            self._alloc_report.extend(lines)
+            self._snapshot = snapshot
+
+    @contextmanager
+    def cycle(self, name: str):
+        """Profile one collection cycle; nested cycles and disabled profiling are no-ops"""
+        if not self.enabled or self.active:
+            yield
+            return
+        self._start(name)
+        try:
+            yield
+        finally:
+            self._finish()
+
+    def _start(self, name: str):
+        self.active = True
+        self._cycle_name = name
+        self._alloc_report = []
+        tracemalloc.start(self.frames)
+        self._snapshot = tracemalloc.take_snapshot()
+        self._sampler = ThreadSampler(self.sample_interval)
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        self._started = time.time()
+
+    def _finish(self):
+        self._profile.disable()
+        self._sampler.stop()
+        self.checkpoint("end of cycle")
+        tracemalloc.stop()
+        self.active = False
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            base = os.path.join(self.directory, f"{stamp}-{self._cycle_name.replace(' ', '_')}")
+
+            # cProfile: 호출한 스레드 기준 (pstats 파일은 snakeviz 등으로 열람)
+            self._profile.dump_stats(f"{base}.pstats")
+            text = io.StringIO()
+            pstats.Stats(self._profile, stream=text).sort_stats("cumulative").print_stats(self.top)
+            with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+                f.write(text.getvalue())
+
+            # 모든 스레드 샘플 (flamegraph.pl / speedscope 입력)
+            with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+                f.write(self._sampler.collapsed())
+
+            with open(f"{base}.alloc.txt", 'w', encoding='utf-8') as f:
+                f.write("\n".join(self._alloc_report) + "\n")
+
+            logger.info(f"🔬 Profile for {self._cycle_name} ({time.time() - self._started:.1f}s, "
+                        f"{self._sampler.samples} samples) saved to {base}.*")
+        except Exception as e:
+            logger.error(f"Error writing profile: {e}")
+        finally:
+            self._profile = None
+            self._sampler = None
+            self._snapshot = None
+
+
+def get_profiler() -> CycleProfiler:
+    """Process-wide profiler (disabled until --profile or SIGUSR1)"""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = CycleProfiler()
+        return _profiler
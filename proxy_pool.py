@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Hashable, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class Proxy:
+    """egress 프록시 1개의 상태 (동시 사용 수, 성공률/지연 EWMA, 제외 기간)"""
+
+    def __init__(self, url: str, max_concurrent: int):
+        parsed = urlparse(url if "://" in url else f"http://{url}")
+        self.url = parsed.geturl()
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port or (1080 if parsed.scheme.startswith("socks") else 8080)
+        self.has_auth = bool(parsed.username)
+        self.max_concurrent = max_concurrent
+        self.in_use = 0
+        self.success = 1.0          # 성공 EWMA (새 프록시는 만점에서 시작)
+        self.latency = 0.0          # 로드 시간 EWMA (초)
+        self.strikes = 0            # 연속 실패/지연 횟수
+        self.ejections = 0          # 연속 제외 횟수 (복귀 후 성공하면 초기화)
+        self.ejected_until = 0.0
+        self.stats = {"requests": 0, "failures": 0, "challenges": 0, "slow": 0}
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until and self.in_use < self.max_concurrent
+
+    def score(self, latency_limit: float) -> float:
+        """Higher is better: success rate discounted by latency"""
+        return self.success / (1 + self.latency / latency_limit)
+
+    def __repr__(self) -> str:
+        return f"Proxy({self.url})"
+
+
+class ProxyPool:
+    """egress 프록시 풀: 드라이버(키)별 고정 배정, 상태 점수, 느리거나 challenge 받는 프록시 자동 제외, 프록시당 동시 사용 제한"""
+
+    def __init__(self, urls: List[str] = None, max_concurrent: int = 2, latency_limit: float = 30.0,
+                 eject_after: int = 3, eject_cooldown: float = 300.0, max_cooldown: float = 3600.0,
+                 alpha: float = 0.2):
+        self.proxies = [Proxy(url, max_concurrent) for url in (urls or [])]
+        self.latency_limit = latency_limit  # 이보다 느린 로드는 실패로 집계
+        self.eject_after = eject_after      # 연속 n회 실패/지연이면 제외
+        self.eject_cooldown = eject_cooldown  # 첫 제외 시간, 반복 시 2배씩
+        self.max_cooldown = max_cooldown
+        self.alpha = alpha
+        self.assignments: Dict[Hashable, Proxy] = {}  # 키(드라이버 슬롯 등) -> 고정 프록시
+        self._cond = threading.Condition()
+        for proxy in self.proxies:
+            if proxy.has_auth:
+                logger.warning(f"{proxy.host}: Firefox cannot pass proxy credentials, use an IP-allowlisted proxy")
+
+    @classmethod
+    def from_config(cls, config) -> "ProxyPool":
+        urls = [url.strip() for url in (config.proxies or "").split(",") if url.strip()]
+        return cls(urls, max_concurrent=config.proxy_max_concurrent, latency_limit=config.proxy_latency_limit,
+                   eject_after=config.proxy_eject_after, eject_cooldown=config.proxy_eject_cooldown)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.proxies)
+
+    def _pick(self, key: Optional[Hashable], now: float) -> Optional[Proxy]:
+        sticky = self.assignments.get(key) if key is not None else None
+        if sticky is not None and now >= sticky.ejected_until:
+            # 고정 배정이 살아있으면 자리가 날 때까지 그 프록시를 기다림 (드라이버 재생성 방지)
+            return sticky if sticky.in_use < sticky.max_concurrent else None
+        candidates = [proxy for proxy in self.proxies if proxy.available(now)]
+        if not candidates:
+            return None
+        assigned = {}
+        for owner in self.assignments.values():
+            assigned[id(owner)] = assigned.get(id(owner), 0) + 1
+        # 점수가 같으면 고정 배정이 적고 덜 바쁜 프록시 (드라이버가 프록시에 고르게 퍼지도록)
+        proxy = max(candidates, key=lambda p: (p.score(self.latency_limit), -assigned.get(id(p), 0), -p.in_use))
+        if key is not None:
+            self.assignments[key] = proxy
+        return proxy
+
+    def acquire(self, key: Optional[Hashable] = None, timeout: Optional[float] = None) -> Optional[Proxy]:
+        """Reserve a proxy slot (key's sticky proxy when healthy); None if none frees up within timeout"""
+        start = time.time()
+        with self._cond:
+            while True:
+                now = time.time()
+                proxy = self._pick(key, now)
+                if proxy is not None:
+                    proxy.in_use += 1
+                    return proxy
+                if timeout is not None and now - start >= timeout:
+                    return None
+                # 제외가 끝나는 시각 또는 release 알림까지 대기
+                wake = min((p.ejected_until for p in self.proxies if p.ejected_until > now), default=now + 1.0)
+                wait = wake - now
+                if timeout is not None:
+                    wait = min(wait, start + timeout - now)
+                self._cond.wait(max(wait, 0.01))
+
+    def release(self, proxy: Proxy, ok: bool, latency: float, challenged: bool = False, score: bool = True):
+        """Return a slot and score the outcome (a challenge or a load over latency_limit counts as a strike)
+
+        score=False only returns the slot (the caller already scored each page with record()).
+        """
+        with self._cond:
+            proxy.in_use -= 1
+            if score:
+                self._score(proxy, ok, latency, challenged)
+            self._cond.notify_all()
+
+    def record(self, proxy: Proxy, ok: bool, latency: float, challenged: bool = False):
+        """Score one page load while the slot stays leased (several pages per lease, e.g. browser tabs)"""
+        with self._cond:
+            self._score(proxy, ok, latency, challenged)
+            self._cond.notify_all()
+
+    def _score(self, proxy: Proxy, ok: bool, latency: float, challenged: bool):
+        # _cond을 잡은 상태에서 호출
+        slow = latency > self.latency_limit
+        good = ok and not challenged and not slow
+        proxy.stats["requests"] += 1
+        proxy.stats["failures"] += not ok
+        proxy.stats["challenges"] += challenged
+        proxy.stats["slow"] += slow
+        proxy.success += self.alpha * (good - proxy.success)
+        proxy.latency += self.alpha * (latency - proxy.latency)
+        if good:
+            proxy.strikes = 0
+            proxy.ejections = 0
+        else:
+            # 첫 방문 challenge는 흔하므로 연속으로 나쁠 때만 제외
+            proxy.strikes += 1
+            if proxy.strikes >= self.eject_after:
+                self._eject(proxy, "challenged" if challenged else "slow" if slow else "failing")
+
+    def _eject(self, proxy: Proxy, reason: str):
+        proxy.ejections += 1
+        cooldown = min(self.eject_cooldown * 2 ** (proxy.ejections - 1), self.max_cooldown)
+        proxy.ejected_until = time.time() + cooldown
+        proxy.strikes = 0
+        # 이 프록시에 고정된 키는 다음 acquire에서 다른 프록시를 배정받음
+        for key in [key for key, assigned in self.assignments.items() if assigned is proxy]:
+            del self.assignments[key]
+        logger.warning(f"🚫 Proxy {proxy.host}:{proxy.port} ejected for {cooldown:.0f}s ({reason}, "
+                       f"score {proxy.score(self.latency_limit):.2f})")
+
+    @contextmanager
+    def lease(self, key: Optional[Hashable] = None, timeout: Optional[float] = None):
+        """Yield (proxy, state); proxy is None when the pool is empty (direct connection)
+
+        The caller sets state["ok"] / state["challenged"]; the outcome and load time are scored on exit,
+        unless the caller scored pages itself with record() and counted them in state["pages"].
+        """
+        if not self.enabled:
+            yield None, {}
+            return
+        proxy = self.acquire(key, timeout)
+        if proxy is None:
+            raise RuntimeError("no healthy egress proxy available")
+        state = {"ok": False, "challenged": False, "pages": 0}
+        start = time.time()
+        try:
+            yield proxy, state
+        finally:
+            # 페이지별로 점수를 낸 임대는 전체 임대 시간을 지연으로 보지 않음
+            self.release(proxy, state["ok"], time.time() - start, state["challenged"], score=not state["pages"])
+
+    def summary(self) -> str:
+        now = time.time()
+        with self._cond:
+            parts = [
+                f"{p.host}:{p.port} {'ejected' if now < p.ejected_until else f'{p.in_use}/{p.max_concurrent}'} "
+                f"score {p.score(self.latency_limit):.2f}, {p.stats['failures']}/{p.stats['requests']} failed, "
+                f"{p.stats['challenges']} challenged"
+                for p in self.proxies
+            ]
+        return "; ".join(parts) or "direct"
+
+
+def firefox_proxy_preferences(proxy: Proxy) -> Dict[str, object]:
+    """Firefox prefs routing every protocol through the proxy"""
+    if proxy.scheme.startswith("socks"):
+        return {
+            "network.proxy.type": 1,
+            "network.proxy.socks": proxy.host,
+            "network.proxy.socks_port": proxy.port,
+            "network.proxy.socks_version": 4 if proxy.scheme == "socks4" else 5,
+            "network.proxy.socks_remote_dns": True,
+        }
+    return {
+        "network.proxy.type": 1,
+        "network.proxy.http": proxy.host,
+        "network.proxy.http_port": proxy.port,
+        "network.proxy.ssl": proxy.host,
+        "network.proxy.ssl_port": proxy.port,
+        "network.proxy.no_proxies_on": "",
+        "network.proxy.allow_hijacking_localhost": True,  # 로컬 스탠드인 서버도 프록시를 거치도록
+    }
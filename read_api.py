@@ -0,0 +1,280 @@
+import gzip
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qs, urlparse
+from urllib.request import Request, urlopen
+
+from funding_record import FundingRecord
+from write_behind import encode_json
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+GZIP_MIN_BYTES = 1024   # 이보다 작은 응답은 압축하지 않음
+KEEPALIVE_SECONDS = 15  # SSE 연결 유지용 주석 전송 간격
+
+logger = logging.getLogger(__name__)
+
+
+class ReadApi:
+    """데몬의 메모리 상태(최신 펀딩, 스프레드 순위, 이력, 수집 상태)를 로컬 HTTP로 제공 (파일 재파싱 없이 읽기)"""
+
+    def __init__(self, daemon, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        # daemon: collector, spreads, stats, scheduler, lbank 속성을 가진 FundingDaemon
+        self.daemon = daemon
+        self.host = host
+        self.port = port
+        self.version = 0
+        self._changes = deque(maxlen=256)  # (버전, 바뀐 심볼 목록 또는 None=전체)
+        self._cond = threading.Condition()
+        self._cache: Dict[str, Tuple[int, bytes, str, Optional[bytes]]] = {}  # 경로 -> (버전, 본문, ETag, gzip 본문)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.routes: Dict[str, Tuple[Callable[[List[str], Dict], object], bool]] = {
+            # 경로 첫 부분 -> (응답 생성 함수, 버전 단위 캐시 여부)
+            "funding": (self.funding, True),
+            "spreads": (self.spreads, True),
+            "history": (self.history, True),
+            "health": (self.health, False),
+        }
+
+    def publish(self, symbols: Optional[List[str]] = None):
+        """Mark the state as changed (symbols=None: whole cycle) and wake long-poll/SSE readers"""
+        with self._cond:
+            self.version += 1
+            self._changes.append((self.version, symbols))
+            self._cond.notify_all()
+
+    def changes_since(self, version: int) -> Optional[List[str]]:
+        """Symbols changed after version, or None when a full refresh is needed"""
+        with self._cond:
+            if not self._changes or self._changes[0][0] > version + 1:
+                return None
+            symbols = set()
+            for changed_at, changed in self._changes:
+                if changed_at <= version:
+                    continue
+                if changed is None:
+                    return None
+                symbols.update(changed)
+            return sorted(symbols)
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        with self._cond:
+            self._cond.wait_for(lambda: self.version > version, timeout)
+            return self.version
+
+    # --- 응답 생성 ---
+
+    def funding(self, parts: List[str], query: Dict) -> object:
+        """/funding, /funding/<exchange>, /funding/<exchange>/<symbol>"""
+        latest = {name: dict(records) for name, records in self.daemon.collector.latest().items()}
+        if not parts:
+            return {name: {symbol: r.to_dict() for symbol, r in records.items()}
+                    for name, records in latest.items()}
+        records = latest.get(parts[0])
+        if records is None:
+            raise KeyError(parts[0])
+        if len(parts) == 1:
+            return {symbol: r.to_dict() for symbol, r in records.items()}
+        return records[parts[1]].to_dict()
+
+    def spreads(self, parts: List[str], query: Dict) -> object:
+        """/spreads?k=20&abs=1 (largest first)"""
+        k = int(query.get("k", ["20"])[0])
+        by_abs = query.get("abs", ["0"])[0] in ("1", "true")
+        return self.daemon.spreads.top(k, by_abs=by_abs)
+
+    def history(self, parts: List[str], query: Dict) -> object:
+        """/history/<symbol>?series=spread (rolling window, oldest first, plus summary)"""
+        if not parts:
+            raise KeyError("symbol")
+        series = query.get("series", ["spread"])[0]
+        stats = self.daemon.stats
+        return {
+            "symbol": parts[0],
+            "series": series,
+            "values": stats.history(parts[0], series),
+            "summary": stats.summary(parts[0], series)
+        }
+
+    def health(self, parts: List[str], query: Dict) -> object:
+        """Collection health: per-exchange freshness, quarantine, breakers, next runs"""
+        from circuit_breaker import all_breakers
+        from write_behind import get_writer
+
+        now = time.time()
+        exchanges = {}
+        for name, records in self.daemon.collector.latest().items():
+            newest = max((r.ts_ns for r in list(records.values())), default=0)
+            next_due = self.daemon.scheduler.next_due(name, now)
+            exchanges[name] = {
+                "symbols": len(records),
+                "age_seconds": round(now - newest / 1e9, 1) if newest else None,
+                "next_due": next_due if math.isfinite(next_due) else None
+            }
+        return {
+            "version": self.version,
+            "exchanges": exchanges,
+            "quarantined": self.daemon.lbank.health.quarantined(now),
+            "deferred": list(self.daemon.lbank.deferred_symbols),
+            "breakers": {host: breaker.summary() for host, breaker in all_breakers().items()},
+            "writer": get_writer().stats()
+        }
+
+    def render(self, path: str, query: Dict) -> Tuple[bytes, str, Optional[bytes]]:
+        """JSON body, ETag and gzip body for a GET path (cached until the next publish)"""
+        parts = [part for part in path.split("/") if part]
+        if not parts or parts[0] not in self.routes:
+            raise KeyError(path)
+        build, cacheable = self.routes[parts[0]]
+        key = f"{path}?{sorted(query.items())}"
+        version = self.version
+        if cacheable:
+            cached = self._cache.get(key)
+            if cached and cached[0] == version:
+                return cached[1:]
+        body = encode_json(build(parts[1:], query))
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        gzipped = gzip.compress(body, compresslevel=5) if len(body) >= GZIP_MIN_BYTES else None
+        if cacheable:
+            if len(self._cache) > 256:
+                self._cache.clear()  # 쿼리 조합이 많아져도 메모리가 늘지 않도록
+            self._cache[key] = (version, body, etag, gzipped)
+        return body, etag, gzipped
+
+    # --- 서버 ---
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.api = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="read-api", daemon=True)
+        self._thread.start()
+        logger.info(f"🌐 Read API on http://{self.host}:{self._server.server_port}")
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._cond:
+            # 대기 중인 long-poll/SSE 요청을 깨워서 끝냄
+            self.version += 1
+            self._cond.notify_all()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def send_body(self, status: int, body: bytes, etag: Optional[str] = None, gzipped: Optional[bytes] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Vary", "Accept-Encoding")
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if gzipped is not None and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzipped
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        api = self.server.api
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            if url.path == "/poll":
+                return self.poll(api, query)
+            if url.path == "/events":
+                return self.events(api, query)
+            body, etag, gzipped = api.render(url.path, query)
+        except KeyError as e:
+            return self.send_body(404, encode_json({"error": f"not found: {e}"}))
+        except Exception as e:
+            logger.error(f"Read API error for {self.path}: {e}")
+            return self.send_body(500, encode_json({"error": str(e)}))
+
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_body(200, body, etag, gzipped)
+
+    def poll(self, api: ReadApi, query: Dict):
+        """Long-poll: /poll?since=<version>&timeout=30 returns once the version moves past since"""
+        since = int(query.get("since", [api.version])[0])
+        timeout = min(float(query.get("timeout", ["30"])[0]), 300)
+        version = api.wait_for_change(since, timeout)
+        if version <= since:
+            return self.send_body(200, encode_json({"version": version, "changed": []}))
+        self.send_body(200, encode_json({"version": version, "changed": api.changes_since(since)}))
+
+    def events(self, api: ReadApi, query: Dict):
+        """Server-sent events: one 'update' event per publish (data: version and changed symbols)"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        seen = int(self.headers.get("Last-Event-ID") or query.get("since", [api.version])[0])
+        try:
+            while api._server is not None:
+                version = api.wait_for_change(seen, KEEPALIVE_SECONDS)
+                if version <= seen:
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    data = json.dumps({"version": version, "changed": api.changes_since(seen)})
+                    self.wfile.write(f"id: {version}\nevent: update\ndata: {data}\n\n".encode('utf-8'))
+                    seen = version
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def get_json(path: str, etags: Dict[str, Tuple[str, object]] = None,
+             base_url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout: float = 5):
+    """GET a read API path (gzip + ETag); etags caches (etag, value) per path so unchanged data is not re-parsed"""
+    request = Request(base_url + path, headers={"Accept-Encoding": "gzip"})
+    cached = etags.get(path) if etags is not None else None
+    if cached:
+        request.add_header("If-None-Match", cached[0])
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            if response.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            value = json.loads(body)
+            if etags is not None and response.headers.get("ETag"):
+                etags[path] = (response.headers["ETag"], value)
+            return value
+    except HTTPError as e:
+        if e.code == 304 and cached:
+            return cached[1]
+        raise
+
+
+def load_latest_rates_from_api(etags: Dict = None, base_url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+                               ) -> Optional[Dict[str, Dict[str, FundingRecord]]]:
+    """{exchange: {symbol: record}} from a running daemon, or None when no daemon is listening"""
+    try:
+        data = get_json("/funding", etags, base_url)
+    except (URLError, OSError, ValueError):
+        return None
+    return {name: {symbol: FundingRecord.from_dict(item) for symbol, item in records.items()}
+            for name, records in data.items()}
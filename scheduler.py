@@ -0,0 +1,157 @@
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from funding_record import DEFAULT_INTERVAL, FundingRecord
+
+# 거래소별 기본 수집 주기 (cron 형식: 분 시 일 월 요일)
+DEFAULT_SCHEDULES = {
+    "lbank": "0 * * * *",     # 매시 정각 전체 수집
+    "mexc": "*/10 * * * *",   # 10분마다 (API 한 번이라 저렴)
+    "binance": "*/10 * * * *",
+    "bybit": "*/10 * * * *",
+    "gate": "*/10 * * * *",
+}
+
+# 정산 직전 추가 수집 시점 (정산 n초 전)
+PRE_SETTLEMENT_OFFSETS = (900, 300, 60)
+
+DEFAULT_FUNDING_INTERVAL = DEFAULT_INTERVAL
+
+
+class CronSchedule:
+    """Minimal 5-field cron expression (minute hour day month weekday)"""
+
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression: {expr}")
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(field, lo, hi) for field, (lo, hi) in zip(fields, self.RANGES)
+        )
+
+    @staticmethod
+    def _parse_field(field: str, lo: int, hi: int) -> Set[int]:
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+            if part == '*':
+                start, end = lo, hi
+            elif '-' in part:
+                start, end = (int(x) for x in part.split('-', 1))
+            else:
+                start = end = int(part)
+            if start < lo or end > hi or step < 1:
+                raise ValueError(f"Cron field out of range: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def matches(self, dt: datetime) -> bool:
+        # cron 요일: 0 = 일요일
+        return (dt.minute in self.minutes and dt.hour in self.hours and dt.day in self.days
+                and dt.month in self.months and (dt.weekday() + 1) % 7 in self.weekdays)
+
+    def next_after(self, dt: datetime) -> datetime:
+        """First matching minute strictly after dt"""
+        current = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=366)
+        while current < limit:
+            if current.month not in self.months or current.day not in self.days \
+                    or (current.weekday() + 1) % 7 not in self.weekdays:
+                current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if current.hour not in self.hours:
+                current = (current + timedelta(hours=1)).replace(minute=0)
+                continue
+            if current.minute in self.minutes:
+                return current
+            current += timedelta(minutes=1)
+        raise ValueError(f"Cron expression never fires: {self.expr}")
+
+
+class SettlementScheduler:
+    """정산 시각에 맞춰 다음 수집 시점과 대상 심볼을 계산"""
+
+    def __init__(self, schedules: Dict[str, str] = None,
+                 pre_settlement_offsets: Iterable[int] = PRE_SETTLEMENT_OFFSETS):
+        self.schedules = {name: CronSchedule(expr)
+                          for name, expr in (schedules or DEFAULT_SCHEDULES).items()}
+        self.pre_settlement_offsets = sorted(pre_settlement_offsets, reverse=True)
+        self.settlements: Dict[str, Tuple[float, int]] = {}  # symbol -> (다음 정산 epoch, 주기)
+        self.logger = logging.getLogger(__name__)
+
+    def update_settlements(self, records: Iterable[FundingRecord], interval: int = DEFAULT_FUNDING_INTERVAL):
+        """Take each symbol's next settlement time from its latest record"""
+        for record in records:
+            if not record.next_settle_ms:
+                continue
+            # 카운트다운 오차를 없애기 위해 분 단위로 반올림
+            settle_at = round(record.next_settle_ms / 1000 / 60) * 60
+            self.settlements[record.symbol] = (settle_at, record.interval or interval)
+
+    def next_settlement(self, symbol: str, now: float) -> Optional[float]:
+        if symbol not in self.settlements:
+            return None
+        settle_at, interval = self.settlements[symbol]
+        while settle_at <= now:
+            settle_at += interval
+        return settle_at
+
+    def _settlement_groups(self, now: float) -> Dict[float, List[str]]:
+        groups: Dict[float, List[str]] = {}
+        for symbol in self.settlements:
+            groups.setdefault(self.next_settlement(symbol, now), []).append(symbol)
+        return groups
+
+    def next_due(self, exchange: str, now: Optional[float] = None) -> float:
+        """When the exchange is next collected again (the deadline for the current cycle)"""
+        if exchange not in self.schedules:
+            return float("inf")
+        at = now or time.time()
+        for _ in range(1000):
+            run_at, exchanges, _ = self.next_run(at)
+            if exchange in exchanges:
+                return run_at
+            at = run_at + 1
+        return at
+
+    def next_run(self, now: Optional[float] = None) -> Tuple[float, Set[str], Optional[List[str]]]:
+        """Return (run_at, exchanges, symbols); symbols is None for a full collection"""
+        now = now or time.time()
+        now_dt = datetime.fromtimestamp(now)
+
+        # 1. 거래소별 cron 일정
+        run_at = None
+        exchanges: Set[str] = set()
+        for name, schedule in self.schedules.items():
+            at = schedule.next_after(now_dt).timestamp()
+            if run_at is None or at < run_at - 1:
+                run_at, exchanges = at, {name}
+            elif abs(at - run_at) <= 1:
+                exchanges.add(name)
+
+        # 2. 정산 직전 촘촘한 추가 수집 (해당 정산 그룹 심볼만)
+        symbols = None
+        for settle_at, group in self._settlement_groups(now).items():
+            for offset in self.pre_settlement_offsets:
+                at = settle_at - offset
+                if at <= now:
+                    continue
+                if run_at is None or at < run_at - 1:
+                    run_at, exchanges, symbols = at, set(self.schedules), list(group)
+                elif abs(at - run_at) <= 1:
+                    exchanges = set(self.schedules)
+                    if symbols is not None:
+                        symbols = symbols + group
+                break
+
+        if symbols is not None and not symbols:
+            symbols = None
+        return run_at, exchanges, symbols
@@ -0,0 +1,111 @@
+import json
+import os
+import logging
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Dict, Optional
+
+CONFIG_FILE = "scraper_config.json"
+ENV_PREFIX = "SCRAPER_"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScraperConfig:
+    """LBank 스크래퍼 튜닝 값 (scraper_config.json → 환경변수 SCRAPER_<NAME> 순으로 덮어씀)"""
+    # 동시성
+    browser_workers: int = 10
+    http_workers: int = 50
+    batch_size: int = 80
+    max_retries: int = 2                  # 심볼당 총 시도 횟수 (재시도는 메인 패스 이후 지연 큐에서)
+
+    # 페이지 대기 시간 (초)
+    cloudflare_check_wait: float = 2.0    # 첫 로드 후 challenge 여부 확인 전
+    cloudflare_bypass_wait: float = 10.0  # challenge 감지 시 통과 대기
+    cloudflare_refresh_wait: float = 3.0  # challenge 통과 후 새로고침 대기
+    js_render_wait: float = 6.0           # JavaScript 렌더링 대기
+    page_settle_wait: float = 2.0         # 렌더링 후 추가 안정화 대기
+    retry_wait: float = 3.0               # 지연 재시도 기본 대기 (시도마다 2배, 지터 적용)
+    retry_max_wait: float = 60.0
+    batch_pause: float = 3.0              # 배치 사이 대기
+
+    # 호스트 단위 차단기 (최근 window초 동안 오류/challenge 비율이 높으면 모든 페이지 로드 일시 중지)
+    breaker_window: float = 60.0
+    breaker_failure_rate: float = 0.5
+    breaker_min_requests: int = 10
+    breaker_cooldown: float = 30.0        # 연속 차단 시 2배씩, breaker_max_cooldown까지
+    breaker_max_cooldown: float = 300.0
+
+    # egress 프록시 풀 (비우면 직접 연결)
+    proxies: str = ""                     # 쉼표로 구분 (http://host:port, socks5://host:port)
+    proxy_max_concurrent: int = 2         # 프록시당 동시 페이지 로드 수
+    proxy_latency_limit: float = 30.0     # 이보다 느린 로드는 실패로 집계
+    proxy_eject_after: int = 3            # 연속 실패/지연/challenge n회면 제외
+    proxy_eject_cooldown: float = 300.0   # 첫 제외 시간, 반복 시 2배씩
+
+    # 수집 방식 / 대상
+    fetch_mode: str = "browser"           # "browser" 또는 "hybrid"
+    extraction: str = "script"            # "script" = 페이지 안 JS로 두 값만 반환, "page_source" = 전체 DOM 파싱
+    pipeline: bool = False                # 브라우저 로드와 HTML 파싱을 단계로 분리 (파싱은 프로세스 풀)
+    parse_workers: int = 0                # 파싱 프로세스 수 (0 = CPU 코어 수)
+    parse_queue_size: int = 20            # 브라우저 -> 파싱 대기열 상한 (가득 차면 브라우저가 기다림)
+    tabs_per_browser: int = 1             # 2 이상이면 브라우저마다 탭 n개에 로드를 걸어두고 값이 뜬 탭부터 수거
+    tab_timeout: float = 30.0             # 탭 로드 시작부터 값이 나타날 때까지 최대 대기
+    persist_sessions: bool = True
+    site_url: str = "https://www.lbank.com"
+    futures_url_template: str = "https://www.lbank.com/futures/{symbol}"
+    funding_api_template: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str = CONFIG_FILE, environ: bool = True) -> "ScraperConfig":
+        """Load the config file (if any) and apply environment overrides (environ=False: file values only)"""
+        values: Dict = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                values = json.load(f).get("scraper", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error reading {path}, using defaults: {e}")
+
+        config = cls()
+        config.update(values)
+        if not environ:
+            return config
+        config.update({f.name: os.environ[ENV_PREFIX + f.name.upper()]
+                       for f in fields(cls) if ENV_PREFIX + f.name.upper() in os.environ})
+        return config
+
+    def update(self, values: Dict):
+        """Set known fields, coercing strings (from env or JSON) to the field's type"""
+        defaults = asdict(ScraperConfig())
+        for name, value in values.items():
+            if name not in defaults:
+                logger.warning(f"Unknown scraper config key ignored: {name}")
+                continue
+            default = defaults[name]
+            if isinstance(value, str) and not isinstance(default, str) and default is not None:
+                if isinstance(default, bool):
+                    value = value.lower() in ("1", "true", "yes", "on")
+                else:
+                    value = type(default)(value)
+            setattr(self, name, value)
+
+    def replace(self, **changes) -> "ScraperConfig":
+        config = ScraperConfig(**asdict(self))
+        config.update(changes)
+        return config
+
+    def save(self, path: str = CONFIG_FILE, metadata: Dict = None):
+        """Write the config (and optional autotune metadata) atomically"""
+        data = {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "scraper": asdict(self)
+        }
+        if metadata:
+            data["autotune"] = metadata
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+최신 펀딩 테이블 공유 메모리 (mmap 고정 레이아웃 + seqlock, 읽는 쪽은 NumPy 뷰로 복사/파싱 없이 접근)
+사용법:
+- python3 shm_table.py                  # 데몬이 게시한 테이블 요약 출력
+- python3 shm_table.py --top 20         # 거래소 간 차이가 큰 심볼 20개
+- python3 shm_table.py --path ./funding_table.shm
+
+읽기 예시 (같은 머신의 다른 프로세스):
+    table = SharedFundingTable.open()
+    rates, ts_ns, next_settle_ms, intervals = table.snapshot()   # 일관된 복사본
+    # 또는 복사 없이: seq = table.begin(); ...table.rates 사용...; if table.retry(seq): 다시 읽기
+"""
+
+import argparse
+import logging
+import mmap
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from funding_record import FundingRecord
+
+MAGIC = b"FRTB"
+LAYOUT_VERSION = 1
+MAX_EXCHANGES = 8
+SYMBOL_BYTES = 32
+EXCHANGE_BYTES = 16
+ALIGN = 64
+
+# /dev/shm가 있으면 디스크를 거치지 않는 tmpfs 사용
+DEFAULT_PATH = "/dev/shm/lbank_funding_table" if os.path.isdir("/dev/shm") else "funding_table.shm"
+
+HEADER = np.dtype([
+    ("magic", "S4"),
+    ("layout", "<u4"),
+    ("seq", "<u8"),          # 짝수: 안정, 홀수: 쓰는 중
+    ("generation", "<u8"),   # 심볼 목록이 바뀔 때마다 증가 (읽는 쪽 심볼 캐시 무효화)
+    ("capacity", "<u4"),
+    ("count", "<u4"),        # 사용 중인 심볼 행 수
+    ("exchanges", "<u4"),    # 사용 중인 거래소 열 수
+    ("retired", "<u4"),      # 1이면 더 큰 파일로 교체됨 (다시 open 해야 함)
+    ("updated_ns", "<i8"),
+])
+
+logger = logging.getLogger(__name__)
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _layout(capacity: int) -> Tuple[Dict[str, Tuple[int, np.dtype, tuple]], int]:
+    """Offset, dtype and shape of every section for a given capacity"""
+    sections = [
+        ("header", HEADER, ()),
+        ("exchange_names", np.dtype(f"S{EXCHANGE_BYTES}"), (MAX_EXCHANGES,)),
+        ("symbol_names", np.dtype(f"S{SYMBOL_BYTES}"), (capacity,)),
+        ("rates", np.dtype("<f8"), (capacity, MAX_EXCHANGES)),
+        ("ts_ns", np.dtype("<i8"), (capacity, MAX_EXCHANGES)),
+        ("next_settle_ms", np.dtype("<i8"), (capacity, MAX_EXCHANGES)),
+        ("intervals", np.dtype("<i4"), (capacity, MAX_EXCHANGES)),
+    ]
+    layout, offset = {}, 0
+    for name, dtype, shape in sections:
+        offset = _aligned(offset)
+        layout[name] = (offset, dtype, shape)
+        offset += dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+    return layout, _aligned(offset)
+
+
+class SharedFundingTable:
+    """거래소 x 심볼 최신 펀딩 테이블을 mmap 파일로 게시 (쓰는 쪽은 데몬 하나, 읽는 쪽은 여러 프로세스)"""
+
+    def __init__(self, path: str, mm: mmap.mmap, writable: bool):
+        self.path = path
+        self.writable = writable
+        self._mm = mm
+        self.closed = False  # close() 뒤에는 뷰가 해제된 메모리를 가리키므로 쓰지 않음
+        self._symbol_cache: Tuple[int, List[str]] = (-1, [])
+        self._map_views()
+        # 쓰는 쪽 전용: 심볼/거래소 -> 행/열 (사이클 스레드와 스트림 스레드가 함께 쓰므로 잠금)
+        self.write_lock = threading.Lock()
+        self.rows: Dict[str, int] = {}
+        self.columns: Dict[str, int] = {}
+        if writable:
+            self.columns = {name: i for i, name in enumerate(self.exchange_list())}
+            self.rows = {name: i for i, name in enumerate(self.symbol_list())}
+
+    def _map_views(self):
+        capacity = int(np.ndarray((), HEADER, buffer=self._mm)["capacity"])
+        layout, _ = _layout(capacity)
+        for name, (offset, dtype, shape) in layout.items():
+            view = np.ndarray(shape, dtype, buffer=self._mm, offset=offset)
+            if not self.writable:
+                view.flags.writeable = False
+            setattr(self, f"_{name}", view)
+        self.capacity = capacity
+
+    @classmethod
+    def create(cls, path: str = DEFAULT_PATH, capacity: int = 2048) -> "SharedFundingTable":
+        """Create (or replace) the table file; readers of a replaced file see it as retired"""
+        _, size = _layout(capacity)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.truncate(size)
+        with open(tmp_path, "r+b") as f:
+            mm = mmap.mmap(f.fileno(), size)
+        header = np.ndarray((), HEADER, buffer=mm)
+        header["magic"] = MAGIC
+        header["layout"] = LAYOUT_VERSION
+        header["capacity"] = capacity
+        table = cls(path, mm, writable=True)
+        table._rates[:] = np.nan
+
+        try:
+            old = cls.open(path, writable=True)
+        except (FileNotFoundError, ValueError):
+            old = None
+        os.replace(tmp_path, path)
+        if old is not None:
+            # 교체 후에 표시해야 다시 여는 쪽이 새 파일을 봄
+            old._header["retired"] = 1
+            old.close()
+        return table
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_PATH, writable: bool = False) -> "SharedFundingTable":
+        """Map an existing table (read-only unless writable)"""
+        with open(path, "r+b" if writable else "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        header = np.ndarray((), HEADER, buffer=mm)
+        if header["magic"] != MAGIC or header["layout"] != LAYOUT_VERSION:
+            mm.close()
+            raise ValueError(f"{path} is not a funding table (layout {LAYOUT_VERSION})")
+        return cls(path, mm, writable)
+
+    def _reopen(self):
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._symbol_cache = (-1, [])
+        self._map_views()
+
+    # --- 쓰는 쪽 (seqlock) ---
+
+    def _begin_write(self):
+        self._header["seq"] += 1  # 홀수: 읽는 쪽은 재시도
+
+    def _end_write(self):
+        self._header["updated_ns"] = time.time_ns()
+        self._header["seq"] += 1
+
+    def _column(self, exchange: str) -> int:
+        column = self.columns.get(exchange)
+        if column is None:
+            if len(self.columns) >= MAX_EXCHANGES:
+                raise ValueError(f"funding table holds at most {MAX_EXCHANGES} exchanges")
+            column = self.columns[exchange] = len(self.columns)
+            self._exchange_names[column] = exchange.encode()
+            self._header["exchanges"] = len(self.columns)
+        return column
+
+    def _row(self, symbol: str) -> Optional[int]:
+        row = self.rows.get(symbol)
+        if row is None:
+            if len(self.rows) >= self.capacity:
+                return None
+            row = self.rows[symbol] = len(self.rows)
+            self._symbol_names[row] = symbol.encode()[:SYMBOL_BYTES]
+            self._header["count"] = len(self.rows)
+            self._header["generation"] += 1
+        return row
+
+    def _write_records(self, column: int, records) -> int:
+        dropped = 0
+        for record in records:
+            row = self._row(record.symbol)
+            if row is None:
+                dropped += 1
+                continue
+            self._rates[row, column] = record.rate
+            self._ts_ns[row, column] = record.ts_ns
+            self._next_settle_ms[row, column] = record.next_settle_ms
+            self._intervals[row, column] = record.interval
+        return dropped
+
+    def publish(self, latest: Dict[str, Dict[str, FundingRecord]]) -> "SharedFundingTable":
+        """Write the whole {exchange: {symbol: record}} table in one seqlock section
+
+        Returns the table to keep using (a larger one when the symbol count outgrew capacity).
+        The old table is closed, so callers that also update() from another thread must swap
+        the reference under a lock they share with those updates.
+        """
+        symbols = set().union(*(records.keys() for records in latest.values())) if latest else set()
+        if len(symbols | self.rows.keys()) > self.capacity:
+            table = SharedFundingTable.create(self.path, max(self.capacity * 2, len(symbols)))
+            logger.info(f"📐 Funding table grown to {table.capacity} symbols")
+            self.close()
+            return table.publish(latest)
+        with self.write_lock:
+            if self.closed:
+                raise ValueError("funding table is closed")
+            self._begin_write()
+            try:
+                for exchange, records in latest.items():
+                    column = self._column(exchange)
+                    self._rates[:, column] = np.nan  # 목록에서 빠진 심볼은 비움
+                    self._write_records(column, list(records.values()))
+            finally:
+                self._end_write()
+        return self
+
+    def update(self, exchange: str, records: List[FundingRecord]) -> bool:
+        """Overwrite a few symbols of one exchange (stream updates); False once the table is closed"""
+        with self.write_lock:
+            if self.closed:
+                # 더 큰 테이블로 교체된 뒤 늦게 도착한 갱신 (다음 publish가 새 테이블에 반영)
+                return False
+            self._begin_write()
+            try:
+                dropped = self._write_records(self._column(exchange), records)
+            finally:
+                self._end_write()
+        if dropped:
+            logger.warning(f"Funding table full, {dropped} {exchange} symbols not published")
+        return True
+
+    def close(self):
+        """Unmap the file (waits for a write in progress; later writes are refused)"""
+        with self.write_lock:
+            self.closed = True
+            self._mm.close()
+
+    # --- 읽는 쪽 ---
+
+    @property
+    def seq(self) -> int:
+        return int(self._header["seq"])
+
+    @property
+    def retired(self) -> bool:
+        return bool(self._header["retired"])
+
+    def begin(self) -> int:
+        """Wait for a stable sequence number (even) before reading the views"""
+        if self.retired and not self.writable:
+            self._reopen()  # 쓰는 쪽이 더 큰 파일로 교체함
+        while True:
+            seq = self.seq
+            if seq % 2 == 0:
+                return seq
+            time.sleep(0)
+
+    def retry(self, seq: int) -> bool:
+        """True when a write happened since begin() and the values read must be discarded"""
+        return self.seq != seq
+
+    def exchange_list(self) -> List[str]:
+        return [name.decode() for name in self._exchange_names[:int(self._header["exchanges"])]]
+
+    def symbol_list(self) -> List[str]:
+        """Row order of the arrays (decoded once per generation)"""
+        generation = int(self._header["generation"])
+        if self._symbol_cache[0] != generation:
+            count = int(self._header["count"])
+            self._symbol_cache = (generation, [name.decode() for name in self._symbol_names[:count]])
+        return self._symbol_cache[1]
+
+    @property
+    def rates(self) -> np.ndarray:
+        """Zero-copy view, symbol x exchange (NaN where an exchange does not list the symbol)"""
+        return self._rates[:int(self._header["count"]), :int(self._header["exchanges"])]
+
+    @property
+    def ts_ns(self) -> np.ndarray:
+        return self._ts_ns[:int(self._header["count"]), :int(self._header["exchanges"])]
+
+    @property
+    def next_settle_ms(self) -> np.ndarray:
+        return self._next_settle_ms[:int(self._header["count"]), :int(self._header["exchanges"])]
+
+    @property
+    def intervals(self) -> np.ndarray:
+        return self._intervals[:int(self._header["count"]), :int(self._header["exchanges"])]
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Consistent copies of (rates, ts_ns, next_settle_ms, intervals), retrying across writes"""
+        while True:
+            seq = self.begin()
+            arrays = (self.rates.copy(), self.ts_ns.copy(), self.next_settle_ms.copy(), self.intervals.copy())
+            if not self.retry(seq):
+                return arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공유 펀딩 테이블 요약")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    parser.add_argument("--top", type=int, default=10, help="차이가 큰 심볼 수")
+    args = parser.parse_args()
+
+    table = SharedFundingTable.open(args.path)
+    rates, ts_ns, _, _ = table.snapshot()
+    exchanges, symbols = table.exchange_list(), table.symbol_list()[:len(rates)]
+    updated = time.time() - int(table._header["updated_ns"]) / 1e9
+    print(f"📊 {len(symbols)} symbols x {exchanges}, seq {table.seq}, updated {updated:.0f}s ago")
+
+    with np.errstate(invalid="ignore"):
+        spread = np.nanmax(rates, axis=1) - np.nanmin(rates, axis=1)
+    for i in np.argsort(-np.nan_to_num(spread, nan=-1))[:args.top]:
+        values = "  ".join(f"{name} {rates[i, j]:+.4f}%" for j, name in enumerate(exchanges) if not np.isnan(rates[i, j]))
+        print(f"  {symbols[i]:<20} diff {spread[i]:.4f}  {values}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import math
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Iterable, List, Optional
+
+_MAX_SYMBOL = "\U0010ffff"  # 같은 값일 때 모든 심볼보다 뒤에 오는 범위 끝 표시
+
+
+class SpreadIndex:
+    """심볼별 스프레드 순위 인덱스 (정렬 리스트 + bisect, 심볼 단위 갱신)
+
+    위치 찾기는 O(log n)이지만 리스트 중간 삽입/삭제가 뒤 원소를 옮기므로 갱신은 O(n).
+    심볼 수백 개 규모에서는 memmove 한 번이라 트리 구조보다 빠르고 의존성도 필요 없음.
+    """
+
+    def __init__(self, key: Callable[[Dict], float] = None):
+        # key: 순위 기준 값 (기본은 compare_matrix 결과의 최고-최저 차이)
+        self.key = key or (lambda record: record['spread'])
+        self._records: Dict[str, Dict] = {}
+        self._values: Dict[str, float] = {}
+        self._signed: List[tuple] = []  # (값, 심볼) 오름차순
+        self._negatives = 0             # 음수 값 개수 (0이면 |값| 순서 = 값 순서라 따로 정렬하지 않음)
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._records
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        return self._records.get(symbol)
+
+    @staticmethod
+    def _discard(keys: List[tuple], item: tuple):
+        i = bisect_left(keys, item)
+        if i < len(keys) and keys[i] == item:
+            del keys[i]
+
+    def _remove_locked(self, symbol: str):
+        value = self._values.pop(symbol, None)
+        if value is None:
+            return
+        del self._records[symbol]
+        self._discard(self._signed, (value, symbol))
+        self._negatives -= value < 0
+
+    def update(self, symbol: str, record: Optional[Dict]):
+        """Insert or move one symbol; a None record (or NaN value) removes it"""
+        value = self.key(record) if record is not None else None
+        with self.lock:
+            self._remove_locked(symbol)
+            if value is None or math.isnan(value):
+                return
+            self._records[symbol] = record
+            self._values[symbol] = value
+            insort(self._signed, (value, symbol))
+            self._negatives += value < 0
+
+    def remove(self, symbol: str):
+        with self.lock:
+            self._remove_locked(symbol)
+
+    def rebuild(self, records: Iterable[Dict]):
+        """Replace the whole index (one sort instead of n inserts)"""
+        records = {record['symbol']: record for record in records}
+        values = {symbol: self.key(record) for symbol, record in records.items()}
+        values = {symbol: value for symbol, value in values.items() if not math.isnan(value)}
+        with self.lock:
+            self._records = {symbol: records[symbol] for symbol in values}
+            self._values = values
+            self._signed = sorted((value, symbol) for symbol, value in values.items())
+            self._negatives = sum(value < 0 for value in values.values())
+
+    def _keys(self, by_abs: bool) -> List[tuple]:
+        # 기본 키(최고-최저 차이)는 음수가 없으므로 |값| 순위도 같은 리스트를 그대로 사용
+        if by_abs and self._negatives:
+            return sorted((abs(value), symbol) for value, symbol in self._signed)
+        return self._signed
+
+    def top(self, k: int, by_abs: bool = False) -> List[Dict]:
+        """K widest spreads, largest first"""
+        with self.lock:
+            keys = self._keys(by_abs)
+            return [self._records[symbol] for _, symbol in reversed(keys[max(0, len(keys) - k):])]
+
+    def bottom(self, k: int) -> List[Dict]:
+        """K lowest signed spreads, lowest first"""
+        with self.lock:
+            return [self._records[symbol] for _, symbol in self._signed[:k]]
+
+    def range(self, low: float = None, high: float = None, by_abs: bool = False) -> List[Dict]:
+        """Symbols with low <= value <= high (either bound optional), largest first"""
+        with self.lock:
+            keys = self._keys(by_abs)
+            start = bisect_left(keys, (low,)) if low is not None else 0
+            end = bisect_right(keys, (high, _MAX_SYMBOL)) if high is not None else len(keys)
+            return [self._records[symbol] for _, symbol in reversed(keys[start:end])]
+
+    def ranked(self, by_abs: bool = False) -> List[Dict]:
+        """Every symbol, largest first (CSV export)"""
+        return self.range(by_abs=by_abs)
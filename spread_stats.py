@@ -0,0 +1,234 @@
+import io
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from funding_record import FundingRecord
+from write_behind import get_writer
+
+STATS_FILE = "spread_stats.npz"
+RULES_FILE = "alert_rules.json"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AlertRule:
+    """시리즈(spread 또는 거래소 이름)의 z-score / 백분위 / 값 조건"""
+    series: str = "spread"             # "spread" 또는 거래소 이름 ("lbank", "mexc", ...)
+    metric: str = "zscore"             # "zscore", "percentile", "value"
+    above: Optional[float] = None
+    below: Optional[float] = None
+    min_observations: int = 20         # 통계가 쌓이기 전에는 알림 안 함
+    name: str = ""
+
+    def matches(self, value: float) -> bool:
+        if np.isnan(value):
+            return False
+        if self.above is not None and value >= self.above:
+            return True
+        return self.below is not None and value <= self.below
+
+
+DEFAULT_RULES = [
+    AlertRule(series="spread", metric="zscore", above=3.0, name="spread z-score"),
+    AlertRule(series="spread", metric="percentile", above=99.0, min_observations=50, name="spread p99 breach"),
+]
+
+
+def load_rules(path: str = RULES_FILE) -> List[AlertRule]:
+    """Alert rules from alert_rules.json ({"rules": [...]}), defaults if absent"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [AlertRule(**rule) for rule in json.load(f).get("rules", [])]
+    except FileNotFoundError:
+        return list(DEFAULT_RULES)
+    except Exception as e:
+        logger.error(f"Error reading {path}, using default rules: {e}")
+        return list(DEFAULT_RULES)
+
+
+def _encode_npz(arrays: Dict[str, np.ndarray]) -> bytes:
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+class RollingStats:
+    """시리즈별 고정 크기 NumPy 링 버퍼 + EWMA 평균/분산 (관측당 O(1) 갱신)"""
+
+    def __init__(self, window: int = 288, alpha: float = 0.05, path: Optional[str] = STATS_FILE):
+        self.window = window
+        self.alpha = alpha
+        self.path = path
+        self.keys: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.buffer = np.full((0, window), np.nan)
+        self.pos = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.mean = np.full(0, np.nan)
+        self.var = np.zeros(0)
+
+    @staticmethod
+    def key(symbol: str, series: str) -> str:
+        return f"{symbol}|{series}"
+
+    def _grow(self, size: int):
+        capacity = len(self.pos)
+        if size <= capacity:
+            return
+        extra = max(size, capacity * 2, 64) - capacity
+        self.buffer = np.vstack([self.buffer, np.full((extra, self.window), np.nan)])
+        self.pos = np.concatenate([self.pos, np.zeros(extra, dtype=np.int64)])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.mean = np.concatenate([self.mean, np.full(extra, np.nan)])
+        self.var = np.concatenate([self.var, np.zeros(extra)])
+
+    def _row_ids(self, keys: Iterable[str]) -> np.ndarray:
+        ids = []
+        for key in keys:
+            row = self.rows.get(key)
+            if row is None:
+                row = self.rows[key] = len(self.keys)
+                self.keys.append(key)
+            ids.append(row)
+        self._grow(len(self.keys))
+        return np.asarray(ids, dtype=np.int64)
+
+    def observe(self, keys: List[str], values) -> Dict[str, np.ndarray]:
+        """Add one observation per key; returns each value's z-score and percentile before it was added"""
+        values = np.asarray(values, dtype=float)
+        rows = self._row_ids(keys)
+        ok = ~np.isnan(values)
+        rows, values = rows[ok], values[ok]
+
+        # 새 값이 기존 분포에서 얼마나 벗어났는지 (갱신 전 통계 기준)
+        std = np.sqrt(self.var[rows])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            zscore = np.where(std > 0, (values - self.mean[rows]) / std, np.nan)
+        window = self.buffer[rows]
+        filled = np.minimum(self.count[rows], self.window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentile = np.where(filled > 0, (window < values[:, None]).sum(axis=1) / filled * 100, np.nan)
+
+        # 링 버퍼 (같은 키가 한 번에 두 번 오면 마지막 값만 남음)
+        self.buffer[rows, self.pos[rows]] = values
+        self.pos[rows] = (self.pos[rows] + 1) % self.window
+        self.count[rows] += 1
+
+        # EWMA 평균/분산 (첫 관측은 평균으로 시작)
+        first = np.isnan(self.mean[rows])
+        delta = np.where(first, 0.0, values - self.mean[rows])
+        self.mean[rows] = np.where(first, values, self.mean[rows] + self.alpha * delta)
+        self.var[rows] = (1 - self.alpha) * (self.var[rows] + self.alpha * delta ** 2)
+
+        return {
+            "keys": [keys[i] for i in np.flatnonzero(ok)],
+            "values": values,
+            "zscore": zscore,
+            "percentile": percentile,
+            "count": self.count[rows]
+        }
+
+    def summary(self, symbol: str, series: str = "spread",
+                percentiles: Iterable[float] = (5, 50, 95)) -> Optional[Dict]:
+        """EWMA mean/std, rolling min/max and percentiles for one series"""
+        row = self.rows.get(self.key(symbol, series))
+        if row is None or self.count[row] == 0:
+            return None
+        window = self.buffer[row]
+        window = window[~np.isnan(window)]
+        summary = {
+            "count": int(self.count[row]),
+            "ewma_mean": float(self.mean[row]),
+            "ewma_std": float(np.sqrt(self.var[row])),
+            "min": float(window.min()),
+            "max": float(window.max()),
+        }
+        for q, value in zip(percentiles, np.percentile(window, list(percentiles))):
+            summary[f"p{q:g}"] = float(value)
+        return summary
+
+    def history(self, symbol: str, series: str = "spread") -> List[float]:
+        """Values in the rolling window, oldest first"""
+        row = self.rows.get(self.key(symbol, series))
+        if row is None or self.count[row] == 0:
+            return []
+        window = np.roll(self.buffer[row], -self.pos[row])
+        return window[~np.isnan(window)].tolist()
+
+    def observe_cycle(self, spreads: List[Dict], fresh: Dict[str, List[FundingRecord]],
+                      rules: List[AlertRule]) -> List[Dict]:
+        """Feed one comparison cycle (spread per symbol + freshly collected rates) and evaluate rules"""
+        keys = [self.key(r['symbol'], "spread") for r in spreads]
+        values = [r['spread'] for r in spreads]
+        # 이번 사이클에 실제로 수집한 거래소만 (재사용된 직전 값은 분포를 왜곡함)
+        for exchange, records in fresh.items():
+            for record in records:
+                keys.append(self.key(record.symbol, exchange))
+                values.append(record.rate)
+        if not keys:
+            return []
+
+        observed = self.observe(keys, values)
+        by_symbol = {r['symbol']: r for r in spreads}
+        alerts = []
+        for i, key in enumerate(observed["keys"]):
+            symbol, series = key.split("|", 1)
+            for rule in rules:
+                if rule.series != series or observed["count"][i] <= rule.min_observations:
+                    continue
+                metric = observed["values"] if rule.metric == "value" else observed[rule.metric]
+                if rule.matches(float(metric[i])):
+                    alerts.append({
+                        "symbol": symbol,
+                        "series": series,
+                        "rule": rule.name or f"{series} {rule.metric}",
+                        "value": float(observed["values"][i]),
+                        "zscore": float(observed["zscore"][i]),
+                        "percentile": float(observed["percentile"][i]),
+                        "comparison": by_symbol.get(symbol),
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    })
+                    break
+        return alerts
+
+    def save(self):
+        """Queue the ring buffers and EWMA state for an atomic background write (restart resumes instantly)"""
+        if self.path is None:
+            return
+        size = len(self.keys)
+        # 복사본을 넘겨서 다음 observe가 쓰는 중인 배열을 바꾸지 않도록
+        snapshot = {
+            "keys": np.array(self.keys, dtype=str), "buffer": self.buffer[:size].copy(),
+            "pos": self.pos[:size].copy(), "count": self.count[:size].copy(),
+            "mean": self.mean[:size].copy(), "var": self.var[:size].copy(),
+            "params": np.array([self.window, self.alpha])
+        }
+        get_writer().submit(self.path, snapshot, _encode_npz)
+
+    def load(self):
+        """Rebuild from the saved history; a different window size starts fresh"""
+        if self.path is None:
+            return
+        try:
+            with np.load(self.path) as data:
+                if int(data["params"][0]) != self.window:
+                    logger.warning(f"{self.path} has a different window size, starting fresh")
+                    return
+                self.keys = [str(key) for key in data["keys"]]
+                self.rows = {key: i for i, key in enumerate(self.keys)}
+                self.buffer = data["buffer"].copy()
+                self.pos = data["pos"].copy()
+                self.count = data["count"].copy()
+                self.mean = data["mean"].copy()
+                self.var = data["var"].copy()
+            logger.info(f"Loaded rolling stats for {len(self.keys)} series")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error loading {self.path}: {e}")
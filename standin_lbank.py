@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+튜닝/벤치마크용 로컬 스탠드인 LBank 선물 페이지 서버 (렌더링 지연, 오류, Cloudflare challenge 주입)
+사용법:
+- python3 standin_lbank.py --port 8080                                   # 값은 1.5초 뒤 JS로 렌더링
+- python3 standin_lbank.py --port 8080 --render-delay 4 --latency 0.5 --fail-rate 0.05 --challenge-rate 0.1
+- python3 autotune.py --url-template "http://127.0.0.1:8080/futures/{symbol}"
+- SCRAPER_FUNDING_API_TEMPLATE="http://127.0.0.1:8080/api/funding/{symbol}" python3 lbank_monitor.py   # hybrid JSON 경로
+
+/futures/<symbol>: 펀딩 레이트/카운트다운 span이 --render-delay 뒤에 채워지는 페이지 (실제 페이지처럼 JS 렌더링 필요)
+/api/funding/<SYMBOL>: 같은 값을 JSON으로 (fundingRate는 소수, nextFundingTime은 epoch ms)
+challenge는 쿠키가 없는 요청에만 --challenge-rate 비율로 응답하고, --challenge-delay 뒤 쿠키를 심고 새로고침
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SETTLE_INTERVAL = 8 * 3600
+
+FUTURES_PAGE = """<html><head><title>{symbol} Perpetual | LBank</title></head><body>
+<div class="funding-rate">Funding rate <span class="warning_color"></span> <span class="countdown"></span></div>
+<script>
+setTimeout(function () {{
+    const spans = document.querySelectorAll('.funding-rate span');
+    spans[0].textContent = '{rate}';
+    spans[1].textContent = '{countdown}';
+}}, {render_ms});
+</script>
+</body></html>"""
+
+CHALLENGE_PAGE = """<html><head><title>Just a moment...</title></head><body>
+<div id="cf-browser-verification">Checking your browser</div>
+<script>
+setTimeout(function () {{
+    document.cookie = 'cf_clearance=standin; path=/';
+    location.reload();
+}}, {delay_ms});
+</script>
+</body></html>"""
+
+
+def funding_rate(symbol: str) -> float:
+    """Stable per-symbol rate in percent (-0.05% .. +0.05%)"""
+    digest = hashlib.blake2b(symbol.lower().encode(), digest_size=4).digest()
+    return (int.from_bytes(digest, "big") / 0xFFFFFFFF - 0.5) / 10
+
+
+def next_settlement(now: float) -> int:
+    return int((now // SETTLE_INTERVAL + 1) * SETTLE_INTERVAL)
+
+
+class StandinLBankHandler(BaseHTTPRequestHandler):
+    """선물 페이지/JSON 응답 (server.render_delay/latency/fail_rate/challenge_rate로 동작 조절)"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, status: int, body: str, content_type: str = "text/html", headers: dict = None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        with server.lock:
+            server.stats["requests"] += 1
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if random.random() < server.fail_rate:
+            with server.lock:
+                server.stats["failed"] += 1
+            return self.send(502, "<html><head><title>502 Bad Gateway</title></head></html>")
+        if "cf_clearance" not in self.headers.get("Cookie", "") and random.random() < server.challenge_rate:
+            with server.lock:
+                server.stats["challenged"] += 1
+            return self.send(503, CHALLENGE_PAGE.format(delay_ms=int(server.challenge_delay * 1000)),
+                             headers={"Server": "cloudflare"})
+
+        now = time.time()
+        if len(parts) == 2 and parts[0] == "futures":
+            rate = funding_rate(parts[1])
+            remaining = int(next_settlement(now) - now)
+            countdown = f"{remaining // 3600:02d}:{remaining % 3600 // 60:02d}:{remaining % 60:02d}"
+            return self.send(200, FUTURES_PAGE.format(symbol=parts[1].upper(), rate=f"{rate:+.4f}%",
+                                                      countdown=countdown,
+                                                      render_ms=int(server.render_delay * 1000)))
+        if len(parts) == 3 and parts[:2] == ["api", "funding"]:
+            body = {"data": {"symbol": parts[2], "fundingRate": f"{funding_rate(parts[2]) / 100:.8f}",
+                             "nextFundingTime": next_settlement(now) * 1000}}
+            return self.send(200, json.dumps(body), "application/json")
+        if not parts:
+            return self.send(200, "<html><head><title>LBank</title></head><body>standin</body></html>")
+        self.send(404, "<html><head><title>404</title></head></html>")
+
+
+def start_server(port: int, render_delay: float = 1.5, latency: float = 0.0, fail_rate: float = 0.0,
+                 challenge_rate: float = 0.0, challenge_delay: float = 3.0) -> ThreadingHTTPServer:
+    """Start the stand-in in a background thread (port 0 picks a free port)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandinLBankHandler)
+    server.daemon_threads = True
+    server.render_delay = render_delay
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.challenge_rate = challenge_rate
+    server.challenge_delay = challenge_delay
+    server.lock = threading.Lock()
+    server.stats = {"requests": 0, "failed": 0, "challenged": 0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 스탠드인 LBank 선물 페이지 서버")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--render-delay", type=float, default=1.5, help="값이 JS로 렌더링되기까지 (초)")
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 전 추가 지연 (초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="502로 응답할 비율")
+    parser.add_argument("--challenge-rate", type=float, default=0.0, help="쿠키 없는 요청에 challenge를 보낼 비율")
+    parser.add_argument("--challenge-delay", type=float, default=3.0, help="challenge 페이지가 통과되기까지 (초)")
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.render_delay, args.latency, args.fail_rate,
+                          args.challenge_rate, args.challenge_delay)
+    print(f"📄 http://127.0.0.1:{args.port}/futures/{{symbol}}  render {args.render_delay}s, "
+          f"latency {args.latency}s, fail {args.fail_rate:.0%}, challenge {args.challenge_rate:.0%}")
+    try:
+        while True:
+            time.sleep(30)
+            print(f"  {server.stats}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+MexcStream 테스트용 로컬 스탠드인 (기록한 웹소켓 프레임 재생 + REST 스냅샷, 연결 끊김/공백 주입)
+사용법:
+- python3 standin_mexc.py                                                  # fixtures/mexc_frames.jsonl 재생, 포트 8767
+- python3 standin_mexc.py --drop-after 30 --skip 10                        # 30프레임마다 연결 끊고, 끊긴 동안 10프레임 유실
+- python3 standin_mexc.py --stall-after 50 --stall 40 --loop               # 50프레임 뒤 40초 무응답 (gap_timeout 초과)
+- python3 mexc_stream.py --url ws://127.0.0.1:8767/edge --rest-url http://127.0.0.1:8767
+
+/edge: sub.tickers 구독을 받은 뒤 프레임 전송, ping에는 pong
+/api/v1/contract/ticker, /api/v1/contract/funding_rate: 지금까지 재생(유실 포함)한 프레임을 반영한 상태
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+FRAMES_FILE = "fixtures/mexc_frames.jsonl"
+DEFAULT_PORT = 8767  # read_api(8765), work_queue 서버(8766)와 겹치지 않게
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def load_frames(path: str) -> List[Dict]:
+    """Frames written by mexc_stream.py --record ({"t": epoch, "frame": raw})"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayState:
+    """재생 위치와 REST로 내줄 현재 상태 (클라이언트가 받지 못한 프레임도 반영)"""
+
+    def __init__(self, frames: List[Dict], loop: bool = False):
+        self.frames = frames
+        self.loop = loop
+        self.cursor = 0
+        self.tickers: Dict[str, Dict] = {}
+        self.funding: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.stats = {"connections": 0, "subscriptions": 0, "sent": 0, "skipped": 0, "drops": 0, "stalls": 0,
+                      "rest": 0}
+
+    def next_frame(self) -> Optional[Dict]:
+        """Advance the cursor and apply the frame to the REST state"""
+        with self.lock:
+            if self.cursor >= len(self.frames):
+                if not self.loop:
+                    return None
+                self.cursor = 0
+            entry = self.frames[self.cursor]
+            self.cursor += 1
+            message = json.loads(entry["frame"])
+            data = message.get("data")
+            if message.get("channel") in ("push.tickers", "push.ticker"):
+                for ticker in (data if isinstance(data, list) else [data]):
+                    self.tickers[ticker["symbol"]] = ticker
+            elif message.get("channel") == "push.funding.rate":
+                self.funding[data["symbol"]] = {"symbol": data["symbol"], "fundingRate": data.get("rate"),
+                                                "nextSettleTime": data.get("nextSettleTime")}
+            return entry
+
+    def count(self, name: str):
+        with self.lock:
+            self.stats[name] += 1
+
+
+class StandinMexcHandler(BaseHTTPRequestHandler):
+    """웹소켓 업그레이드(/edge)와 REST 엔드포인트"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        state: ReplayState = self.server.state
+        path = self.path.split("?")[0]
+        if path == "/edge" and self.headers.get("Upgrade", "").lower() == "websocket":
+            return self.websocket(state)
+        if path in ("/api/v1/contract/ticker", "/api/v1/contract/funding_rate"):
+            state.count("rest")
+            with state.lock:
+                data = list((state.tickers if path.endswith("ticker") else state.funding).values())
+            body = json.dumps({"success": True, "code": 0, "data": data}).encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_error(404)
+
+    # --- 웹소켓 (RFC 6455 최소 구현: 텍스트/ping/close) ---
+
+    def send_frame(self, payload: bytes, opcode: int = 0x1):
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([len(payload)])
+        elif len(payload) < 1 << 16:
+            header += bytes([126]) + struct.pack(">H", len(payload))
+        else:
+            header += bytes([127]) + struct.pack(">Q", len(payload))
+        with self.send_lock:
+            self.wfile.write(header + payload)
+            self.wfile.flush()
+
+    def read_frame(self):
+        """(opcode, payload) from the client (client frames are always masked)"""
+        head = self.rfile.read(2)
+        if len(head) < 2:
+            return 0x8, b""
+        opcode, length = head[0] & 0x0F, head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", self.rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self.rfile.read(8))[0]
+        mask = self.rfile.read(4) if head[1] & 0x80 else b"\0\0\0\0"
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self.rfile.read(length)))
+        return opcode, payload
+
+    def read_loop(self, state: ReplayState):
+        """Client messages: sub.tickers starts the replay, ping gets a pong"""
+        try:
+            while not self.closed.is_set():
+                opcode, payload = self.read_frame()
+                if opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    self.send_frame(payload, 0xA)
+                    continue
+                if opcode != 0x1:
+                    continue
+                method = json.loads(payload).get("method")
+                if method == "sub.tickers":
+                    state.count("subscriptions")
+                    self.send_frame(json.dumps({"channel": "rs.sub.tickers", "data": "success"}).encode('utf-8'))
+                    self.subscribed.set()
+                elif method == "ping":
+                    self.send_frame(json.dumps({"channel": "pong", "data": int(time.time() * 1000)}).encode('utf-8'))
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.closed.set()
+            self.subscribed.set()
+
+    def websocket(self, state: ReplayState):
+        server = self.server
+        accept = base64.b64encode(hashlib.sha1((self.headers["Sec-WebSocket-Key"] + WS_GUID).encode()).digest())
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept.decode())
+        self.end_headers()
+        self.close_connection = True
+        self.send_lock = threading.Lock()
+        self.closed = threading.Event()
+        self.subscribed = threading.Event()
+        state.count("connections")
+        threading.Thread(target=self.read_loop, args=(state,), daemon=True).start()
+
+        # 구독 전에는 아무것도 보내지 않음 (재연결 후 재구독을 확인하기 위해)
+        self.subscribed.wait()
+        sent = 0
+        previous = None
+        try:
+            while not self.closed.is_set():
+                if server.drop_after and sent >= server.drop_after:
+                    state.count("drops")
+                    # 끊긴 동안 흘러간 프레임 (클라이언트는 REST 보정으로만 따라잡을 수 있음)
+                    for _ in range(server.skip):
+                        if state.next_frame() is not None:
+                            state.count("skipped")
+                    if server.abrupt:
+                        self.connection.shutdown(2)
+                    else:
+                        self.send_frame(struct.pack(">H", 1001), 0x8)
+                    break
+                if server.stall_after and sent == server.stall_after:
+                    state.count("stalls")
+                    self.closed.wait(server.stall)
+                entry = state.next_frame()
+                if entry is None:
+                    self.closed.wait()  # 다 보냈으면 연결만 유지
+                    break
+                if server.speed and previous is not None:
+                    time.sleep(max(0.0, entry["t"] - previous) / server.speed)
+                previous = entry["t"]
+                self.send_frame(entry["frame"].encode('utf-8'))
+                state.count("sent")
+                sent += 1
+        except OSError:
+            pass
+        finally:
+            self.closed.set()
+
+
+def start_server(port: int = DEFAULT_PORT, frames_file: str = FRAMES_FILE, loop: bool = False,
+                 speed: float = 20.0, drop_after: int = 0, skip: int = 0, abrupt: bool = False,
+                 stall_after: int = 0, stall: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stand-in in a background thread (port 0 picks a free port); server.state holds the stats"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandinMexcHandler)
+    server.daemon_threads = True
+    server.state = ReplayState(load_frames(frames_file), loop)
+    server.speed = speed
+    server.drop_after = drop_after
+    server.skip = skip
+    server.abrupt = abrupt
+    server.stall_after = stall_after
+    server.stall = stall
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MEXC 웹소켓/REST 로컬 스탠드인 (기록 프레임 재생)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--frames", default=FRAMES_FILE, help="mexc_stream.py --record로 기록한 파일")
+    parser.add_argument("--loop", action="store_true", help="끝까지 재생하면 처음부터 다시")
+    parser.add_argument("--speed", type=float, default=20.0, help="재생 속도 배율 (0 = 최대)")
+    parser.add_argument("--drop-after", type=int, default=0, help="연결마다 n프레임 뒤 끊기")
+    parser.add_argument("--skip", type=int, default=0, help="끊긴 동안 유실시킬 프레임 수")
+    parser.add_argument("--abrupt", action="store_true", help="close 프레임 없이 TCP를 끊음")
+    parser.add_argument("--stall-after", type=int, default=0, help="연결마다 n프레임 뒤 무응답")
+    parser.add_argument("--stall", type=float, default=0.0, help="무응답 시간 (초)")
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.frames, args.loop, args.speed, args.drop_after, args.skip,
+                          args.abrupt, args.stall_after, args.stall)
+    print(f"📡 ws://127.0.0.1:{args.port}/edge, REST http://127.0.0.1:{args.port} "
+          f"({len(server.state.frames)} frames)")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"  {server.state.stats}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
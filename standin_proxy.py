@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+프록시 풀 테스트용 로컬 스탠드인 프록시 (지연/오류/Cloudflare challenge 주입)
+사용법:
+- python3 standin_proxy.py --ports 8901 8902 8903                       # 정상 프록시 3개
+- python3 standin_proxy.py --ports 8901 8902 --latency 0 5 --fail-rate 0 0.3
+- python3 standin_proxy.py --ports 8901 --challenge-rate 0.5           # 절반은 challenge 페이지
+- SCRAPER_PROXIES=http://127.0.0.1:8901,http://127.0.0.1:8902 python3 bench_extract.py --url-template ...
+
+포트마다 --latency/--fail-rate/--challenge-rate 값을 순서대로 적용 (값이 하나면 모든 포트에 적용)
+"""
+
+import argparse
+import random
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+CHALLENGE_PAGE = b"<html><head><title>Just a moment...</title></head><body>cf-browser-verification</body></html>"
+
+
+class StandinProxyHandler(BaseHTTPRequestHandler):
+    """GET은 그대로 전달, CONNECT는 터널 (server.latency/fail_rate/challenge_rate로 장애 주입)"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def inject(self) -> bool:
+        """Apply injected latency/failure/challenge; True when the request was answered here"""
+        server = self.server
+        time.sleep(server.latency)
+        server.stats["requests"] += 1
+        if random.random() < server.fail_rate:
+            server.stats["failed"] += 1
+            self.send_error(502, "injected failure")
+            return True
+        if random.random() < server.challenge_rate:
+            server.stats["challenged"] += 1
+            self.send_response(503)
+            self.send_header("Server", "cloudflare")
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(CHALLENGE_PAGE)))
+            self.end_headers()
+            self.wfile.write(CHALLENGE_PAGE)
+            return True
+        return False
+
+    def do_GET(self):
+        if self.inject():
+            return
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in ("proxy-connection", "connection")}
+        try:
+            with urlopen(Request(self.path, headers=headers), timeout=30) as response:
+                status, body, response_headers = response.status, response.read(), response.headers
+        except HTTPError as e:
+            status, body, response_headers = e.code, e.read(), e.headers
+        except Exception as e:
+            self.send_error(502, str(e))
+            return
+        self.send_response(status)
+        for name, value in response_headers.items():
+            if name.lower() not in ("transfer-encoding", "connection", "content-length"):
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_CONNECT(self):
+        if self.inject():
+            return
+        host, _, port = self.path.partition(":")
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=30)
+        except OSError as e:
+            self.send_error(502, str(e))
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, _ = select.select(sockets, [], [], 60)
+                if not readable:
+                    break
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is self.connection else self.connection).sendall(data)
+        finally:
+            upstream.close()
+
+
+def start_proxy(port: int, latency: float = 0.0, fail_rate: float = 0.0,
+                challenge_rate: float = 0.0) -> ThreadingHTTPServer:
+    """Start one stand-in proxy in a background thread (port 0 picks a free port)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandinProxyHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.challenge_rate = challenge_rate
+    server.stats = {"requests": 0, "failed": 0, "challenged": 0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="장애 주입 로컬 스탠드인 프록시")
+    parser.add_argument("--ports", type=int, nargs="+", default=[8901, 8902, 8903])
+    parser.add_argument("--latency", type=float, nargs="+", default=[0.0], help="요청당 추가 지연 (초)")
+    parser.add_argument("--fail-rate", type=float, nargs="+", default=[0.0], help="502로 끊을 비율")
+    parser.add_argument("--challenge-rate", type=float, nargs="+", default=[0.0], help="challenge 페이지 비율")
+    args = parser.parse_args()
+
+    def value(values, i):
+        return values[i] if i < len(values) else values[-1]
+
+    servers = []
+    for i, port in enumerate(args.ports):
+        servers.append(start_proxy(port, value(args.latency, i), value(args.fail_rate, i),
+                                   value(args.challenge_rate, i)))
+        print(f"🌍 http://127.0.0.1:{port} latency {value(args.latency, i)}s, "
+              f"fail {value(args.fail_rate, i):.0%}, challenge {value(args.challenge_rate, i):.0%}")
+    print(f"SCRAPER_PROXIES={','.join(f'http://127.0.0.1:{port}' for port in args.ports)}")
+    try:
+        while True:
+            time.sleep(30)
+            print("  " + "  ".join(f"{s.server_port}: {s.stats}" for s in servers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from blacklist_store import file_lock
+
+QUARANTINE_FILE = "quarantine.json"
+
+
+class SymbolHealthTracker:
+    """심볼별 실패 통계를 유지하고 계속 실패하는 심볼을 지수 백오프로 자동 격리"""
+
+    def __init__(self, path: Optional[str] = QUARANTINE_FILE, failure_threshold: int = 3,
+                 base_backoff: int = 3600, max_backoff: int = 7 * 86400):
+        self.path = path
+        self.failure_threshold = failure_threshold  # 연속 실패 n회 시 격리
+        self.base_backoff = base_backoff            # 첫 격리 1시간, 이후 2배씩
+        self.max_backoff = max_backoff              # 최대 7일
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        self.symbols: Dict[str, Dict] = {}
+        self._dirty = set()     # 마지막 동기화 이후 이 프로세스가 바꾼 심볼
+        self._synced = set()    # 마지막 동기화 때 파일에 있던 심볼 (외부에서 지운 심볼 판별용)
+        self._signature = None
+        self.load()
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size, stat.st_ino
+        except FileNotFoundError:
+            return None
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("symbols", {})
+        except FileNotFoundError:
+            return {}
+
+    def load(self):
+        """Load failure statistics from disk (path=None keeps them in memory only)"""
+        if self.path is None:
+            self.symbols = {}
+            return
+        try:
+            with file_lock(self.path, exclusive=False):
+                symbols = self._read()
+                signature = self._stat_signature()
+        except Exception as e:
+            self.logger.error(f"Error reading quarantine file: {e}")
+            symbols, signature = {}, None
+        with self.lock:
+            self.symbols = symbols
+            self._synced = set(symbols)
+            self._dirty.clear()
+            self._signature = signature
+
+    def _merge(self, disk: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Disk state plus this process's changes (manage_blacklist.py edits win for symbols we did not touch)"""
+        merged = dict(disk)
+        for symbol in self._dirty:
+            ours = self.symbols.get(symbol)
+            if ours is None:
+                # 이 프로세스에서 forget
+                merged.pop(symbol, None)
+                continue
+            theirs = disk.get(symbol)
+            if theirs is None and symbol in self._synced:
+                # 다른 프로세스가 지움 (예: promote로 블랙리스트 이동)
+                continue
+            if theirs and theirs.get("released_at", 0) > ours.get("released_at", 0):
+                # 수집 중에 CLI로 격리 해제됨: 누적 통계는 유지하고 격리 상태만 초기화
+                ours.update(consecutive_failures=0, quarantine_count=0, quarantined_until=0,
+                            released_at=theirs["released_at"])
+            merged[symbol] = ours
+        return merged
+
+    def sync(self):
+        """Locked read-merge-write with the file, so daemon saves and CLI edits do not overwrite each other"""
+        if self.path is None:
+            return
+        with self.lock:
+            try:
+                with file_lock(self.path):
+                    merged = self._merge(self._read())
+                    if self._dirty:
+                        data = {
+                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            "symbols": merged
+                        }
+                        tmp_path = f"{self.path}.tmp"
+                        with open(tmp_path, 'w', encoding='utf-8') as f:
+                            json.dump(data, f, indent=2, ensure_ascii=False)
+                        os.replace(tmp_path, self.path)
+                    self._signature = self._stat_signature()
+            except Exception as e:
+                self.logger.error(f"Error saving quarantine file: {e}")
+                return
+            self.symbols = merged
+            self._synced = set(merged)
+            self._dirty.clear()
+
+    def save(self):
+        """Persist failure statistics atomically (merged with edits made by other processes)"""
+        self.sync()
+
+    def refresh(self):
+        """Pick up edits made by other processes since the last sync (cheap stat when nothing changed)"""
+        if self.path is not None and self._stat_signature() != self._signature:
+            self.sync()
+
+    def _entry(self, symbol: str) -> Dict:
+        self._dirty.add(symbol)
+        return self.symbols.setdefault(symbol, {
+            "successes": 0,
+            "failures": 0,
+            "consecutive_failures": 0,
+            "quarantine_count": 0,
+            "quarantined_until": 0,
+            "last_success": None,
+            "last_failure": None,
+            "last_error": None,
+            "released_at": 0
+        })
+
+    def record_success(self, symbol: str):
+        with self.lock:
+            entry = self._entry(symbol)
+            entry["successes"] += 1
+            entry["consecutive_failures"] = 0
+            entry["quarantine_count"] = 0
+            entry["quarantined_until"] = 0
+            entry["last_success"] = int(time.time())
+
+    def record_failure(self, symbol: str, error: str = ""):
+        """Count a failure and quarantine the symbol once it fails repeatedly"""
+        with self.lock:
+            now = int(time.time())
+            entry = self._entry(symbol)
+            entry["failures"] += 1
+            entry["consecutive_failures"] += 1
+            entry["last_failure"] = now
+            entry["last_error"] = error or None
+
+            if entry["consecutive_failures"] >= self.failure_threshold:
+                # 격리 해제 후에도 다시 실패하면 대기 시간을 두 배로
+                backoff = min(self.base_backoff * 2 ** entry["quarantine_count"], self.max_backoff)
+                entry["quarantine_count"] += 1
+                entry["quarantined_until"] = now + backoff
+                self.logger.warning(
+                    f"🔒 Quarantined {symbol} for {backoff // 60} min "
+                    f"({entry['consecutive_failures']} consecutive failures)"
+                )
+
+    def is_quarantined(self, symbol: str, now: Optional[float] = None) -> bool:
+        entry = self.symbols.get(symbol)
+        if not entry:
+            return False
+        return entry.get("quarantined_until", 0) > (now or time.time())
+
+    def quarantined(self, now: Optional[float] = None) -> List[str]:
+        """Symbols currently held back from collection"""
+        now = now or time.time()
+        # read API 스레드에서도 호출되므로 수집 스레드의 갱신과 겹치지 않게 복사본으로 순회
+        with self.lock:
+            entries = list(self.symbols.items())
+        return sorted(symbol for symbol, entry in entries if entry.get("quarantined_until", 0) > now)
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        return self.symbols.get(symbol)
+
+    def release(self, symbol: str) -> bool:
+        """Lift a quarantine and reset the failure streak"""
+        with self.lock:
+            entry = self.symbols.get(symbol)
+            if not entry:
+                return False
+            self._dirty.add(symbol)
+            entry["consecutive_failures"] = 0
+            entry["quarantine_count"] = 0
+            entry["quarantined_until"] = 0
+            entry["released_at"] = time.time()
+            return True
+
+    def forget(self, symbol: str) -> bool:
+        """Drop all statistics for a symbol (e.g. after promoting it to the blacklist)"""
+        with self.lock:
+            self._dirty.add(symbol)
+            return self.symbols.pop(symbol, None) is not None
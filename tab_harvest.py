@@ -0,0 +1,148 @@
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from cf_session import is_cloudflare_challenge
+
+logger = logging.getLogger(__name__)
+
+WAIT = object()  # next_item 반환값: 지금은 시작할 로드가 없음 (다음 폴링에서 다시 요청)
+
+
+class TabSlot:
+    """탭 1개에서 진행 중인 페이지 로드"""
+
+    def __init__(self, handle: str):
+        self.handle = handle
+        self.symbol: Optional[str] = None
+        self.started = 0.0
+        self.deadline = 0.0
+        self.challenged = False
+        self.reload_at: Optional[float] = None  # challenge 통과 대기 후 새로고침할 시각
+
+
+class TabHarvester:
+    """드라이버 1개 안의 탭 M개에 페이지 로드를 걸어두고 (기다리지 않음), 값이 나타난 탭부터 수거해 다음 심볼을 로드
+
+    드라이버는 스레드 안전하지 않으므로 하나의 TabHarvester는 한 스레드에서만 사용.
+    """
+
+    def __init__(self, driver, tabs: int, probe_js: str, timeout: float, challenge_wait: float,
+                 poll_interval: float = 0.2):
+        self.driver = driver
+        self.tabs = tabs
+        self.probe_js = probe_js            # {title, found}를 바로 반환하는 스크립트 (found가 있으면 수거)
+        self.timeout = timeout              # 로드 시작(또는 challenge 후 새로고침)부터 값이 나타날 때까지 최대 대기
+        self.challenge_wait = challenge_wait  # challenge 감지 후 새로고침까지 대기
+        self.poll_interval = poll_interval
+        self.slots: List[TabSlot] = []
+
+    def open_tabs(self):
+        """Reuse the driver's current window and open the remaining tabs"""
+        self.slots = [TabSlot(self.driver.current_window_handle)]
+        for _ in range(self.tabs - 1):
+            self.driver.switch_to.new_window('tab')
+            self.slots.append(TabSlot(self.driver.current_window_handle))
+
+    def close_tabs(self):
+        """Close the extra tabs, leaving the first window on a blank page (the driver may be reused)"""
+        for slot in self.slots[1:]:
+            try:
+                self.driver.switch_to.window(slot.handle)
+                self.driver.close()
+            except Exception as e:
+                logger.debug(f"Error closing tab: {e}")
+        if self.slots:
+            try:
+                self.driver.switch_to.window(self.slots[0].handle)
+                self.driver.execute_script("window.location.href = 'about:blank'")
+            except Exception as e:
+                logger.debug(f"Error resetting first tab: {e}")
+        self.slots = []
+
+    def start(self, slot: TabSlot, symbol: str, url: str):
+        """Start a load without waiting for it (navigation runs in the page while other tabs are probed)"""
+        self.driver.switch_to.window(slot.handle)
+        self.driver.execute_script("window.location.href = arguments[0]", url)
+        slot.symbol = symbol
+        slot.started = time.time()
+        slot.deadline = slot.started + self.timeout
+        slot.challenged = False
+        slot.reload_at = None
+
+    def probe(self, slot: TabSlot) -> Optional[Dict]:
+        """Current {title, found} of a tab, or None while it is still navigating"""
+        try:
+            self.driver.switch_to.window(slot.handle)
+            return self.driver.execute_script(self.probe_js)
+        except Exception as e:
+            # 탐색 중인 문서에서는 스크립트가 실패할 수 있음: 다음 폴링에서 다시 확인
+            logger.debug(f"Probe failed for {slot.symbol}: {e}")
+            return None
+
+    def run(self, next_item: Callable[[bool], object],
+            on_result: Callable[[str, Optional[Dict], Optional[str], bool, float], None]):
+        """Keep every tab busy until next_item() returns None and all loads are harvested
+
+        next_item(busy) -> (symbol, url), WAIT (nothing to start yet) or None when there is no more work;
+        busy tells it other tabs are in flight, so it should not block.
+        on_result(symbol, found, error, challenged, seconds) is called once per started load.
+        """
+        self.open_tabs()
+        exhausted = False
+        try:
+            while True:
+                # 빈 탭마다 다음 로드 시작
+                for slot in self.slots:
+                    if slot.symbol is not None or exhausted:
+                        continue
+                    item = next_item(any(other.symbol is not None for other in self.slots))
+                    if item is None:
+                        exhausted = True
+                    elif item is WAIT:
+                        break
+                    else:
+                        try:
+                            self.start(slot, *item)
+                        except Exception as e:
+                            on_result(item[0], None, str(e), False, 0.0)
+                active = [slot for slot in self.slots if slot.symbol is not None]
+                if not active and exhausted:
+                    return
+
+                for slot in active:
+                    self.check(slot, on_result)
+                time.sleep(self.poll_interval)
+        finally:
+            # 중단된 로드도 결과로 알림 (호출 쪽이 끝을 알 수 있도록)
+            for slot in self.slots:
+                if slot.symbol is not None:
+                    on_result(slot.symbol, None, "tab harvest aborted", slot.challenged, time.time() - slot.started)
+                    slot.symbol = None
+            self.close_tabs()
+
+    def check(self, slot: TabSlot, on_result: Callable):
+        now = time.time()
+        state = self.probe(slot)
+        if state and state.get("found"):
+            self.finish(slot, on_result, state["found"], None)
+            return
+        if state and not slot.challenged and is_cloudflare_challenge(state.get("title") or ""):
+            # challenge는 탭 안에서 통과되기를 기다렸다가 한 번 새로고침
+            slot.challenged = True
+            slot.reload_at = now + self.challenge_wait
+            slot.deadline = slot.reload_at + self.timeout
+            logger.info(f"Cloudflare protection detected for {slot.symbol}, waiting in tab...")
+        if slot.reload_at is not None and now >= slot.reload_at:
+            slot.reload_at = None
+            try:
+                self.driver.switch_to.window(slot.handle)
+                self.driver.execute_script("window.location.reload()")
+            except Exception as e:
+                logger.debug(f"Reload failed for {slot.symbol}: {e}")
+        if now >= slot.deadline:
+            self.finish(slot, on_result, None, "funding rate not found")
+
+    def finish(self, slot: TabSlot, on_result: Callable, found: Optional[Dict], error: Optional[str]):
+        symbol, slot.symbol = slot.symbol, None
+        on_result(symbol, found, error, slot.challenged, time.time() - slot.started)
@@ -1,9 +1,11 @@
 import requests
+import csv
 import json
 import logging
+from log_setup import setup_logging
+from profiler import get_profiler
 import time
 from datetime import datetime
-import pandas as pd
 import os
 
 class TelegramSender:
@@ -30,26 +32,28 @@ class TelegramSender:
         except Exception as e:
             self.logger.error(f"메시지 전송 실패: {e}")
 
-    def format_comparison_message(self, df: pd.DataFrame, top_n: int = 5) -> str:
+    def read_comparison_rows(self) -> list:
+        """Read the comparison CSV (csv 모듈로 충분하므로 pandas를 로드하지 않음)"""
+        with open(self.comparison_file, 'r', encoding='utf-8', newline='') as f:
+            return list(csv.DictReader(f))
+
+    def format_comparison_message(self, rows: list, top_n: int = 5) -> str:
         """Format comparison data into a readable message"""
         try:
             # 상위 N개 펀딩비 차이만 선택
-            top_df = df.head(top_n)
+            top_rows = rows[:top_n]
             
             message = "<b>🔔 거래소 펀딩비 비교 결과</b>\n\n"
             message += f"📊 비교 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
             
-            for _, row in top_df.iterrows():
+            for row in top_rows:
                 symbol = row['symbol']
-                lbank_rate = row['funding_rate_lbank']
-                mexc_rate = row['funding_rate_mexc']
-                diff = row['funding_rate_diff']
-                lbank_countdown = row['countdown_lbank']
-                mexc_countdown = row['countdown_mexc']
+                high, low = row['max_exchange'], row['min_exchange']
+                diff = float(row['funding_rate_diff'] or 0)
                 
                 message += f"<b>{symbol}</b>\n"
-                message += f"LBank: {lbank_rate} (남은시간: {lbank_countdown})\n"
-                message += f"MEXC: {mexc_rate} (주기: {mexc_countdown})\n"
+                message += f"{high}: {row['max_rate']} (남은시간: {row.get(f'countdown_{high}', 'N/A')})\n"
+                message += f"{low}: {row['min_rate']} (남은시간: {row.get(f'countdown_{low}', 'N/A')})\n"
                 message += f"차이: {diff:.4f}%\n\n"
             
             return message
@@ -61,10 +65,10 @@ class TelegramSender:
         """Send comparison results to Telegram"""
         try:
             # CSV 파일 읽기
-            df = pd.read_csv(self.comparison_file)
+            rows = self.read_comparison_rows()
             
             # 메시지 포맷팅
-            message = self.format_comparison_message(df)
+            message = self.format_comparison_message(rows)
             
             # 메시지 전송
             if self.send_message(message):
@@ -82,22 +86,18 @@ class TelegramSender:
             # 결과를 메시지로 포맷팅
             message = "<b>펀딩 레이트 비교 결과</b>\n\n"
             
-            # 차이가 큰 순서대로 정렬
-            sorted_results = sorted(comparison_results, 
-                                 key=lambda x: abs(x['difference']), 
-                                 reverse=True)
-            
-            for result in sorted_results[:10]:  # 상위 10개만 표시
+            # SpreadIndex 순위 그대로 (차이가 큰 순서), 다시 정렬하지 않음
+            for result in comparison_results[:10]:  # 상위 10개만 표시
                 symbol = result['symbol']
-                lbank_rate = result['lbank_rate']
-                mexc_rate = result['mexc_rate']
-                difference = result['difference']
+                high = f"{result['max_exchange']} {result['max_rate']:.4f}%"
+                low = f"{result['min_exchange']} {result['min_rate']:.4f}%"
+                spread = result['spread']
                 
                 message += (
                     f"<b>{symbol}</b>\n"
-                    f"LBank: {lbank_rate:.4f}%\n"
-                    f"MEXC: {mexc_rate:.4f}%\n"
-                    f"차이: {difference:.4f}%\n\n"
+                    f"최고: {high}\n"
+                    f"최저: {low}\n"
+                    f"차이: {spread:.4f}%\n\n"
                 )
             
             # 메시지 전송
@@ -106,6 +106,26 @@ class TelegramSender:
         except Exception as e:
             self.logger.error(f"비교 결과 전송 실패: {e}")
 
+    def send_alerts(self, alerts: list):
+        """이동 통계 알림 규칙에 걸린 심볼 전송"""
+        try:
+            message = "<b>⚠️ 펀딩 레이트 이상 변동</b>\n\n"
+            
+            for alert in alerts[:10]:  # 상위 10개만 표시
+                comparison = alert.get('comparison') or {}
+                
+                message += f"<b>{alert['symbol']}</b> ({alert['rule']})\n"
+                if alert['series'] == 'spread' and comparison:
+                    message += f"최고: {comparison['max_exchange']} {comparison['max_rate']:.4f}%\n"
+                    message += f"최저: {comparison['min_exchange']} {comparison['min_rate']:.4f}%\n"
+                message += f"{alert['series']}: {alert['value']:.4f}% "
+                message += f"(z={alert['zscore']:.1f}, {alert['percentile']:.0f}백분위)\n\n"
+            
+            self.send_message(message)
+            
+        except Exception as e:
+            self.logger.error(f"알림 전송 실패: {e}")
+
     def monitor_and_send(self, interval_minutes: int = 5):
         """Monitor comparison file and send updates"""
         self.logger.info("텔레그램 전송 시작")
@@ -118,7 +138,8 @@ class TelegramSender:
                 # 첫 실행이거나 지정된 간격이 지났을 때만 전송
                 if (self.last_sent_time is None or 
                     (current_time - self.last_sent_time).total_seconds() >= interval_minutes * 60):
-                    self.send_comparison()
+                    with get_profiler().cycle("notify"):
+                        self.send_comparison()
                 
                 time.sleep(60)  # 1분마다 체크
                 
@@ -130,7 +151,9 @@ class TelegramSender:
                 time.sleep(60)
 
 def main():
+    setup_logging()
     sender = TelegramSender()
+    get_profiler().install_signal()
     sender.monitor_and_send()
 
 if __name__ == "__main__":
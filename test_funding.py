@@ -8,6 +8,7 @@ from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 import logging
+from log_setup import setup_logging
 
 class LBankFundingTest:
     def __init__(self):
@@ -16,15 +17,6 @@ class LBankFundingTest:
         self.log_file = "lbank_funding.log"
         self.driver = None
         self.driver_lock = threading.Lock()
-        
-        # 로깅 설정
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler()  # 콘솔 출력만 사용
-            ]
-        )
         self.logger = logging.getLogger(__name__)
 
     def setup_selenium(self):
@@ -239,6 +231,7 @@ class LBankFundingTest:
             self.logger.info("Process completed")
 
 def main():
+    setup_logging()
     test = LBankFundingTest()
     test.fetch_all_funding_rates()
 
@@ -0,0 +1,326 @@
+import hmac
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+import os
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from funding_record import FundingRecord
+
+QUEUE_FILE = "work_queue.db"
+QUEUE_PORT = 8766  # read_api(8765) 다음 포트
+REMOTE_METHODS = ("heartbeat", "lease", "complete", "fail", "live_workers")  # 원격 워커에 여는 메서드
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cycles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    deadline REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open'
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cycle_id INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker_id TEXT,
+    leased_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, cycle_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_worker ON tasks (worker_id, status);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    host TEXT,
+    pid INTEGER,
+    started_at REAL,
+    last_heartbeat REAL,
+    tasks_done INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def make_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """SQLite 기반 내구성 작업 큐 (코디네이터가 심볼 작업을 발행하고 워커가 가져감)
+
+    WAL과 파일 잠금은 네트워크 파일시스템(NFS/SMB)에서 믿을 수 없으므로 큐 파일은 로컬 디스크의 한 호스트에만 둠.
+    다른 호스트의 워커는 QueueServer/RemoteWorkQueue로 접속.
+    """
+
+    def __init__(self, path: str = QUEUE_FILE, max_attempts: int = 2):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite 연결은 스레드마다 따로 사용
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """BEGIN IMMEDIATE so concurrent leases never hand out the same task twice"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # 코디네이터 측
+
+    def publish_cycle(self, symbols: List[str], deadline: float) -> int:
+        """Open a cycle and enqueue one task per symbol"""
+        now = time.time()
+        with self.transaction() as conn:
+            cur = conn.execute("INSERT INTO cycles (created_at, deadline) VALUES (?, ?)", (now, deadline))
+            cycle_id = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO tasks (cycle_id, symbol, updated_at) VALUES (?, ?, ?)",
+                [(cycle_id, symbol, now) for symbol in symbols]
+            )
+        return cycle_id
+
+    def requeue_dead(self, heartbeat_timeout: float) -> int:
+        """Return tasks leased by workers whose heartbeat went stale"""
+        cutoff = time.time() - heartbeat_timeout
+        with self.transaction() as conn:
+            cur = conn.execute(
+                """UPDATE tasks SET status = 'pending', worker_id = NULL, updated_at = ?
+                   WHERE status = 'leased' AND worker_id IN (
+                       SELECT worker_id FROM workers WHERE last_heartbeat < ?
+                   )""",
+                (time.time(), cutoff)
+            )
+            return cur.rowcount
+
+    def cycle_counts(self, cycle_id: int) -> Dict[str, int]:
+        rows = self._conn().execute(
+            "SELECT status, COUNT(*) AS n FROM tasks WHERE cycle_id = ? GROUP BY status", (cycle_id,)
+        ).fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def close_cycle(self, cycle_id: int) -> List[str]:
+        """Close a cycle, expiring unfinished tasks; returns the expired symbols"""
+        with self.transaction() as conn:
+            expired = [row["symbol"] for row in conn.execute(
+                "SELECT symbol FROM tasks WHERE cycle_id = ? AND status IN ('pending', 'leased')", (cycle_id,)
+            )]
+            conn.execute(
+                "UPDATE tasks SET status = 'expired', updated_at = ? "
+                "WHERE cycle_id = ? AND status IN ('pending', 'leased')",
+                (time.time(), cycle_id)
+            )
+            conn.execute("UPDATE cycles SET status = 'closed' WHERE id = ?", (cycle_id,))
+        return expired
+
+    def results(self, cycle_id: int) -> List[FundingRecord]:
+        rows = self._conn().execute(
+            "SELECT result FROM tasks WHERE cycle_id = ? AND status = 'done'", (cycle_id,)
+        ).fetchall()
+        return [FundingRecord.from_dict(json.loads(row["result"])) for row in rows]
+
+    def failures(self, cycle_id: int) -> Dict[str, str]:
+        rows = self._conn().execute(
+            "SELECT symbol, error FROM tasks WHERE cycle_id = ? AND status = 'failed'", (cycle_id,)
+        ).fetchall()
+        return {row["symbol"]: row["error"] for row in rows}
+
+    def live_workers(self, heartbeat_timeout: float) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT * FROM workers WHERE last_heartbeat >= ?", (time.time() - heartbeat_timeout,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def purge(self, keep_cycles: int = 10):
+        """Delete tasks from old closed cycles so the queue file stays small"""
+        with self.transaction() as conn:
+            conn.execute(
+                """DELETE FROM tasks WHERE cycle_id IN (
+                       SELECT id FROM cycles WHERE status = 'closed'
+                       ORDER BY id DESC LIMIT -1 OFFSET ?
+                   )""",
+                (keep_cycles,)
+            )
+
+    # 워커 측
+
+    def heartbeat(self, worker_id: str):
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                """INSERT INTO workers (worker_id, host, pid, started_at, last_heartbeat)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(worker_id) DO UPDATE SET last_heartbeat = excluded.last_heartbeat""",
+                (worker_id, socket.gethostname(), os.getpid(), now, now)
+            )
+
+    def lease(self, worker_id: str, limit: int) -> List[Dict]:
+        """Claim up to `limit` pending tasks from open cycles that are still before their deadline"""
+        now = time.time()
+        with self.transaction() as conn:
+            rows = conn.execute(
+                """SELECT t.id, t.symbol, t.cycle_id FROM tasks t JOIN cycles c ON c.id = t.cycle_id
+                   WHERE t.status = 'pending' AND c.status = 'open' AND c.deadline > ?
+                   ORDER BY t.cycle_id, t.id LIMIT ?""",
+                (now, limit)
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE tasks SET status = 'leased', worker_id = ?, leased_at = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [(worker_id, now, now, row["id"]) for row in rows]
+                )
+        return [dict(row) for row in rows]
+
+    # 완료/실패 보고는 아직 임대를 가진 워커만 반영 (하트비트가 끊겨 재할당된 뒤의 늦은 보고는 무시)
+
+    def complete(self, task_id: int, worker_id: str, result: FundingRecord) -> bool:
+        """Store a result; False when the lease was already taken away from this worker"""
+        with self.transaction() as conn:
+            cur = conn.execute(
+                """UPDATE tasks SET status = 'done', result = ?, updated_at = ?
+                   WHERE id = ? AND status = 'leased' AND worker_id = ?""",
+                (json.dumps(result.to_dict(), ensure_ascii=False), time.time(), task_id, worker_id)
+            )
+            if not cur.rowcount:
+                logger.info(f"Ignored late result for task {task_id} from {worker_id} (lease lost)")
+                return False
+            conn.execute("UPDATE workers SET tasks_done = tasks_done + 1 WHERE worker_id = ?", (worker_id,))
+        return True
+
+    def fail(self, task_id: int, worker_id: str, error: str) -> bool:
+        """Put a failed task back for another worker, or mark it failed after max_attempts"""
+        with self.transaction() as conn:
+            cur = conn.execute(
+                """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                   worker_id = NULL, error = ?, updated_at = ?
+                   WHERE id = ? AND status = 'leased' AND worker_id = ?""",
+                (self.max_attempts, error, time.time(), task_id, worker_id)
+            )
+        if not cur.rowcount:
+            logger.info(f"Ignored late failure for task {task_id} from {worker_id} (lease lost)")
+            return False
+        return True
+
+
+class QueueServer:
+    """큐 호스트의 WorkQueue를 다른 호스트 워커에 HTTP(JSON)로 제공 (워커 측 메서드만, 선택적 토큰)"""
+
+    def __init__(self, queue: WorkQueue, host: str = "127.0.0.1", port: int = QUEUE_PORT,
+                 token: Optional[str] = None):
+        self.queue = queue
+        self.host = host
+        self.port = port
+        self.token = token
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> ThreadingHTTPServer:
+        self._server = ThreadingHTTPServer((self.host, self.port), _QueueHandler)
+        self._server.daemon_threads = True
+        self._server.queue_server = self
+        threading.Thread(target=self._server.serve_forever, name="queue-server", daemon=True).start()
+        logger.info(f"📮 Work queue served on http://{self.host}:{self._server.server_port} ({self.queue.path})")
+        return self._server
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def call(self, method: str, kwargs: Dict):
+        if method not in REMOTE_METHODS:
+            raise KeyError(method)
+        if method == "complete":
+            kwargs["result"] = FundingRecord.from_dict(kwargs["result"])
+        return getattr(self.queue, method)(**kwargs)
+
+
+class _QueueHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def send_json(self, status: int, value):
+        body = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server.queue_server
+        if server.token and not hmac.compare_digest(self.headers.get("X-Queue-Token", ""), server.token):
+            return self.send_json(403, {"error": "bad token"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            kwargs = json.loads(self.rfile.read(length) or b"{}")
+            result = server.call(self.path.strip("/"), kwargs)
+        except KeyError as e:
+            return self.send_json(404, {"error": f"unknown method {e}"})
+        except Exception as e:
+            logger.error(f"Queue request {self.path} failed: {e}")
+            return self.send_json(500, {"error": str(e)})
+        self.send_json(200, {"result": result})
+
+
+class RemoteWorkQueue:
+    """다른 호스트에서 QueueServer에 접속하는 워커 측 큐 (WorkQueue의 워커 메서드와 같은 인터페이스)"""
+
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 30):
+        self.url = url.rstrip("/")
+        self.path = self.url
+        self.token = token
+        self.timeout = timeout
+
+    def _call(self, method: str, **kwargs):
+        request = Request(f"{self.url}/{method}", data=json.dumps(kwargs).encode('utf-8'),
+                          headers={"Content-Type": "application/json"})
+        if self.token:
+            request.add_header("X-Queue-Token", self.token)
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())["result"]
+        except HTTPError as e:
+            raise RuntimeError(f"queue {method} failed ({e.code}): {e.read().decode('utf-8', 'replace')}") from None
+
+    def heartbeat(self, worker_id: str):
+        self._call("heartbeat", worker_id=worker_id)
+
+    def lease(self, worker_id: str, limit: int) -> List[Dict]:
+        return self._call("lease", worker_id=worker_id, limit=limit)
+
+    def complete(self, task_id: int, worker_id: str, result: FundingRecord) -> bool:
+        return self._call("complete", task_id=task_id, worker_id=worker_id, result=result.to_dict())
+
+    def fail(self, task_id: int, worker_id: str, error: str) -> bool:
+        return self._call("fail", task_id=task_id, worker_id=worker_id, error=error)
+
+    def live_workers(self, heartbeat_timeout: float) -> List[Dict]:
+        return self._call("live_workers", heartbeat_timeout=heartbeat_timeout)
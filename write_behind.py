@@ -0,0 +1,182 @@
+import atexit
+import csv
+import io
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_writer: Optional["WriteBehindWriter"] = None
+_writer_lock = threading.Lock()
+
+
+def encode_json(data, pretty: bool = False) -> bytes:
+    """Compact JSON by default (indent=None keeps the C encoder; indent falls back to pure Python)"""
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def encode_csv(rows: List[Dict], fieldnames: List[str]) -> bytes:
+    buffer = io.StringIO(newline='')
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def write_atomic(path: str, data: bytes):
+    """Publish a file atomically: temp file, fsync, rename (readers never see a partial file)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class WriteBehindWriter:
+    """백그라운드 스레드가 파일 쓰기를 담당 (경로별 최신 스냅샷만 남기고 합쳐서 씀)"""
+
+    def __init__(self, coalesce_delay: float = 0.5):
+        # coalesce_delay: 첫 요청 후 이 시간 동안 들어온 같은 경로의 요청은 마지막 것만 기록
+        self.coalesce_delay = coalesce_delay
+        self._pending: "OrderedDict[str, tuple]" = OrderedDict()  # path -> (스냅샷, 인코더, 요청 시각)
+        self._cond = threading.Condition()
+        self._busy = False
+        self._hurry = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.metrics = {
+            "submitted": 0, "written": 0, "coalesced": 0, "errors": 0, "bytes": 0,
+            "max_queue_depth": 0, "last_write_ms": 0.0, "max_write_ms": 0.0,
+            "total_write_ms": 0.0, "max_lag_ms": 0.0
+        }
+
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+
+    def submit(self, path: str, snapshot, encode: Callable[[object], bytes] = encode_json):
+        """Queue a snapshot for path and return immediately; the snapshot must not be mutated afterwards"""
+        with self._cond:
+            if self._closed:
+                # 종료 후 요청은 바로 씀 (데이터 유실 방지)
+                self._write(path, snapshot, encode, time.time())
+                return
+            if path in self._pending:
+                self.metrics["coalesced"] += 1
+                submitted_at = self._pending.pop(path)[2]
+            else:
+                submitted_at = time.time()
+            self._pending[path] = (snapshot, encode, submitted_at)
+            self.metrics["submitted"] += 1
+            self.metrics["max_queue_depth"] = max(self.metrics["max_queue_depth"], len(self._pending))
+            self._cond.notify_all()
+        if self._thread is None:
+            self.start()
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            stats = dict(self.metrics, queue_depth=len(self._pending))
+        written = stats["written"]
+        stats["avg_write_ms"] = stats["total_write_ms"] / written if written else 0.0
+        return stats
+
+    def _write(self, path: str, snapshot, encode: Callable[[object], bytes], submitted_at: float):
+        start = time.time()
+        try:
+            data = encode(snapshot)
+            write_atomic(path, data)
+        except Exception as e:
+            self.metrics["errors"] += 1
+            logger.error(f"Error writing {path}: {e}")
+            return
+        elapsed_ms = (time.time() - start) * 1000
+        self.metrics["written"] += 1
+        self.metrics["bytes"] += len(data)
+        self.metrics["last_write_ms"] = elapsed_ms
+        self.metrics["max_write_ms"] = max(self.metrics["max_write_ms"], elapsed_ms)
+        self.metrics["total_write_ms"] += elapsed_ms
+        self.metrics["max_lag_ms"] = max(self.metrics["max_lag_ms"], (time.time() - submitted_at) * 1000)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                # 연속된 저장 요청이 합쳐지도록 잠시 대기 (flush/종료 요청이 오면 바로 씀)
+                deadline = time.time() + self.coalesce_delay
+                while not (self._closed or self._hurry):
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = list(self._pending.items())
+                self._pending.clear()
+                self._hurry = False
+                self._busy = True
+            for path, (snapshot, encode, submitted_at) in batch:
+                self._write(path, snapshot, encode, submitted_at)
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted so far is on disk"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                # 스레드가 없으면 호출한 스레드에서 직접 씀
+                batch = list(self._pending.items())
+                self._pending.clear()
+                for path, (snapshot, encode, submitted_at) in batch:
+                    self._write(path, snapshot, encode, submitted_at)
+                return True
+            self._hurry = bool(self._pending)
+            self._cond.notify_all()
+            while self._pending or self._busy:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 30):
+        """Flush pending writes and stop the thread (safe to call more than once)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+        stats = self.stats()
+        if stats["submitted"]:
+            logger.info(f"💾 Write-behind closed: {stats['written']} writes, {stats['coalesced']} coalesced, "
+                        f"avg {stats['avg_write_ms']:.1f}ms, max lag {stats['max_lag_ms']:.0f}ms")
+
+
+def get_writer() -> WriteBehindWriter:
+    """Process-wide writer, flushed automatically at interpreter exit"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = WriteBehindWriter()
+            _writer.start()
+            atexit.register(_writer.close)
+        return _writer